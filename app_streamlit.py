@@ -7,6 +7,8 @@ from cProfile import label
 import pandas as pd
 import streamlit as st
 
+from jadewa.dataset import DatasetStore
+from jadewa.metadata import MetadataStore
 from jadewa.plotter import select_visible_libs
 from jadewa.processor import Processor
 from jadewa.status import Status
@@ -19,12 +21,15 @@ from jadewa.utils import (
 )
 
 
-# Initialize status and processor
-@st.cache_data
+# Initialize status and processor. They are shared across sessions so that
+# the cache of the downloaded results is reused.
+@st.cache_resource
 def get_status_processor() -> tuple[Status, Processor]:
     """Get the status and processor objects"""
-    session_status = Status.from_github()
-    session_processor = Processor(session_status)
+    # the metadata already retrieved are persisted in the cache directory
+    session_status = Status.from_github(metadata_store=MetadataStore())
+    # the csv files of the plotted benchmarks are compiled into datasets
+    session_processor = Processor(session_status, datasets=DatasetStore())
     return session_status, session_processor
 
 
@@ -55,6 +60,29 @@ def select_benchmark(available_benchmarks: list[str]) -> str:
     return selected_benchmark
 
 
+def update_prefetch(selected_benchmark: str | None, processor: Processor) -> None:
+    """Start fetching the results of the selected benchmark in the background,
+    so that they are ready when the remaining options are chosen. The prefetch
+    of a benchmark that is no longer selected is cancelled.
+
+    Parameters
+    ----------
+    selected_benchmark : str | None
+        selected benchmark
+    processor : Processor
+        processor producing the plots
+    """
+    prefetch = st.session_state.get("prefetch")
+    if prefetch is not None:
+        if prefetch.benchmark == selected_benchmark:
+            return
+        prefetch.cancel()
+    if selected_benchmark:
+        st.session_state.prefetch = processor.prefetch(selected_benchmark)
+    else:
+        st.session_state.prefetch = None
+
+
 def select_ref_lib(selected_benchmark: str, status: Status) -> str:
     """Create a selectbox for the reference library selection and return the selected library.
     In case of an experimental benchmark, the reference library is set to "exp" by default,
@@ -378,6 +406,7 @@ def main():
         with col1:
             # first select the benchmark
             selected_benchmark = select_benchmark(available_benchmarks)
+            update_prefetch(selected_benchmark, processor)
 
             # select the libraries for the selected benchmark
             if selected_benchmark:
@@ -466,6 +495,9 @@ def main():
                     plotly_chart.plotly_chart(fig)
 
     with tab_info:
+        # A persisted metadata table that is up to date requires no request
+        if not st.session_state.metadata_available and status.metadata_cached():
+            st.session_state.metadata_available = True
         # If the metadata is not available, show the button to compute it
         if not st.session_state.metadata_available:
             # If information have not been computed yet, do it
@@ -476,14 +508,29 @@ def main():
                 disabled=st.session_state.metadata_available,
             ):
                 # If the button is pressed, compute the metadata
-                st.write("Computing metadata on available results...")
-                status.get_metadata_df()
+                progress_bar = st.progress(
+                    0.0, text="Computing metadata on available results..."
+                )
+
+                def _update_progress(completed: int, total: int) -> None:
+                    progress_bar.progress(
+                        completed / total,
+                        text=f"Computing metadata on available results ({completed}/{total})...",
+                    )
+
+                status.get_metadata_df(progress_callback=_update_progress)
+                progress_bar.empty()
+                if status.metadata_errors:
+                    st.warning(
+                        f"Metadata of {len(status.metadata_errors)} results could not be retrieved."
+                    )
                 st.session_state.metadata_available = True
                 st.session_state.metadata_df = status.metadata_df
 
         if st.session_state.metadata_available:
+            # the table is loaded only when displayed
             sorted_df, pivot_sddr, pivot_no_sddr = get_info_dfs(
-                st.session_state.metadata_df
+                status.load_metadata_df
             )
             display_metadata(pivot_no_sddr, pivot_sddr, sorted_df)
 
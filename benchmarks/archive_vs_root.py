@@ -0,0 +1,121 @@
+"""Benchmark an archive-backed Status against Status.from_root on the same
+synthetic results tree: time to index the results and time to read all the
+.csv files through the Processor.
+
+Usage:
+    python benchmarks/archive_vs_root.py [--folders 10] [--benchmarks 10]
+        [--files 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from jadewa.archive import ResultsArchive  # noqa: E402
+from jadewa.cache import CSVCache  # noqa: E402
+from jadewa.processor import Processor  # noqa: E402
+from jadewa.scanner import LocalScanner  # noqa: E402
+from jadewa.status import Status  # noqa: E402
+
+CSV_CONTENT = "Energy,Value,Error\n" + "".join(
+    f"{i * 0.1},{i * 1.5},0.01\n" for i in range(200)
+)
+
+
+def make_tree(root: str, n_folders: int, n_benchmarks: int, n_files: int) -> None:
+    for i in range(n_folders):
+        for j in range(n_benchmarks):
+            directory = os.path.join(root, f"_code{i}_-_lib{i}_", f"bench{j}")
+            os.makedirs(directory)
+            for k in range(n_files):
+                path = os.path.join(directory, f"bench{j} tally {k}.csv")
+                with open(path, "w", encoding="utf-8") as outfile:
+                    outfile.write(CSV_CONTENT)
+
+
+def make_archives(root: str, outdir: str) -> dict[str, str]:
+    archives = {}
+    for kind, mode in [("tar", "w"), ("tar.gz", "w:gz")]:
+        archives[kind] = os.path.join(outdir, f"results.{kind}")
+        with tarfile.open(archives[kind], mode) as archive:
+            archive.add(root, arcname="results")
+    archives["zip"] = os.path.join(outdir, "results.zip")
+    with zipfile.ZipFile(archives["zip"], "w", zipfile.ZIP_DEFLATED) as archive:
+        for path, _, filenames in os.walk(root):
+            for file in filenames:
+                full_path = os.path.join(path, file)
+                name = os.path.relpath(full_path, root).replace(os.sep, "/")
+                archive.write(full_path, f"results/{name}")
+    return archives
+
+
+def read_all(status: Status) -> int:
+    processor = Processor(status, cache=CSVCache(cache_dir=None))
+    files = [
+        (path, csv)
+        for benchmark in status.get_benchmarks()
+        for library in status.get_libraries(benchmark)
+        for code in status.get_codes(benchmark, library)
+        for path, csvs in [status.get_results(benchmark, library, code)]
+        for csv in csvs
+    ]
+    dfs = processor._fetch_csvs(files)
+    assert all(df is not None for df in dfs.values())
+    return len(dfs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--folders", type=int, default=10)
+    parser.add_argument("--benchmarks", type=int, default=10)
+    parser.add_argument("--files", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = os.path.join(tmpdir, "root")
+        make_tree(root, args.folders, args.benchmarks, args.files)
+        archives = make_archives(root, tmpdir)
+
+        loaders = {
+            "from_root": lambda: Status.from_root(
+                root, scanner=LocalScanner(cache_dir=None)
+            )
+        }
+        for kind, path in archives.items():
+            loaders[kind] = lambda path=path: Status.from_archive(
+                ResultsArchive(path)
+            )
+
+        print(f"{'source':>10} {'size':>10} {'index':>9} {'read all':>9}")
+        for name, loader in loaders.items():
+            start = time.perf_counter()
+            status = loader()
+            indexed = time.perf_counter()
+            n_files = read_all(status)
+            done = time.perf_counter()
+            size = (
+                sum(
+                    os.path.getsize(os.path.join(path, file))
+                    for path, _, filenames in os.walk(root)
+                    for file in filenames
+                )
+                if name == "from_root"
+                else os.path.getsize(archives[name])
+            )
+            print(
+                f"{name:>10} {size / 1024**2:>8.1f}MB {indexed - start:>8.3f}s "
+                f"{done - indexed:>8.3f}s"
+            )
+        print(f"files: {n_files}")
+
+
+if __name__ == "__main__":
+    main()
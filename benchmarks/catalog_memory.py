@@ -0,0 +1,88 @@
+"""Benchmark the memory used to store the status of a synthetic tree of
+results: nested dictionary + blob SHAs against the compact Catalog.
+
+Usage:
+    python benchmarks/catalog_memory.py [--files 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import hashlib
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from jadewa.catalog import Catalog  # noqa: E402
+from jadewa.status import Status  # noqa: E402
+
+LIBRARIES = [
+    "FENDL 2.1",
+    "FENDL 3.1d",
+    "FENDL 3.2b",
+    "FENDL 3.2c",
+    "ENDFB-VIII.0",
+    "JEFF-3.3",
+    "D1SUNED (FENDL 3.2b+TENDL2017)",
+]
+CODES = ["mcnp", "openmc", "serpent"]
+
+
+def synthetic_tree(n_files: int) -> list[dict]:
+    """Entries of a GitHub tree with about n_files .csv files"""
+    n_folders_per_benchmark = len(LIBRARIES) * len(CODES)
+    files_per_folder = 250
+    n_benchmarks = max(1, n_files // (n_folders_per_benchmark * files_per_folder))
+    tree = []
+    for b in range(n_benchmarks):
+        for library in LIBRARIES:
+            for code in CODES:
+                for f in range(files_per_folder):
+                    path = (
+                        f"_{code}_-_{library}_/Benchmark{b}/"
+                        f"Benchmark{b}_{f}_Case-{f} Leakage neutron flux.csv"
+                    )
+                    sha = hashlib.sha1(path.encode()).hexdigest()
+                    tree.append({"path": path, "type": "blob", "sha": sha})
+    return tree
+
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=100_000)
+    args = parser.parse_args()
+
+    tree = synthetic_tree(args.files)
+    (status, _, blob_shas), nested_size, _ = _measure(
+        lambda: Status._parse_github_tree("o", "r", "main", tree)
+    )
+    del tree
+    catalog, catalog_size, elapsed = _measure(
+        lambda: Catalog.from_nested(status, blob_shas)
+    )
+    print(f"files: {len(catalog)}")
+    print(f"nested dict + blob shas: {nested_size / 1024**2:8.1f} MB")
+    print(
+        f"catalog:                 {catalog_size / 1024**2:8.1f} MB "
+        f"(built in {elapsed:.2f} s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
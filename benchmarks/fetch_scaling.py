@@ -0,0 +1,102 @@
+"""Benchmark the wall time of Processor._get_graph_data against the number of
+libraries to be plotted.
+
+A local HTTP server with an artificial latency stands in for GitHub so that the
+results only depend on the number of round-trips and on the concurrency limit.
+
+Usage:
+    python benchmarks/fetch_scaling.py [--latency 0.05] [--workers 1 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from jadewa.cache import CSVCache  # noqa: E402
+from jadewa.network import Transport  # noqa: E402
+from jadewa.processor import Processor  # noqa: E402
+from jadewa.status import Status  # noqa: E402
+from jadewa.storage import HTTPBackend  # noqa: E402
+
+BENCHMARK = "ITER_1D"
+TALLY = "Neutron flux"
+CSV_NAME = "ITER_1D Total neutron flux.csv"
+CSV_CONTENT = "Cells,Value,Error\n" + "".join(
+    f"{i},{i * 1.5},0.01\n" for i in range(100)
+)
+
+
+def _handler(latency: float) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802
+            time.sleep(latency)
+            body = CSV_CONTENT.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def _fake_status(url: str, n_libs: int, n_codes: int) -> Status:
+    libraries = {}
+    for i in range(n_libs):
+        libraries[f"lib{i}"] = {
+            f"code{j}": (f"{url}/lib{i}/code{j}", [CSV_NAME])
+            for j in range(n_codes)
+        }
+    return Status({BENCHMARK: libraries}, backend=HTTPBackend(Transport()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--codes", type=int, default=3)
+    parser.add_argument("--libraries", type=int, nargs="+", default=[1, 2, 5, 10])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8, 16])
+    args = parser.parse_args()
+
+    server = _Server(("127.0.0.1", 0), _handler(args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    print(f"latency per request: {args.latency} s, codes per library: {args.codes}")
+    print(f"{'libraries':>10} {'files':>6}" + "".join(
+        f" {f'workers={w}':>12}" for w in args.workers
+    ))
+    for n_libs in args.libraries:
+        status = _fake_status(url, n_libs, args.codes)
+        timings = []
+        for workers in args.workers:
+            processor = Processor(
+                status, cache=CSVCache(cache_dir=None), max_workers=workers
+            )
+            start = time.perf_counter()
+            processor._get_graph_data(BENCHMARK, "lib0", TALLY, refcode="code0")
+            timings.append(time.perf_counter() - start)
+        print(
+            f"{n_libs:>10} {n_libs * args.codes:>6}"
+            + "".join(f" {t:>11.3f}s" for t in timings)
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
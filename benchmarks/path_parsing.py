@@ -0,0 +1,103 @@
+"""Benchmark the throughput of the parser of the GitHub tree paths against
+the previous per-path Python loop, checking that the results are identical.
+
+Usage:
+    python benchmarks/path_parsing.py [--files 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from catalog_memory import synthetic_tree  # noqa: E402
+
+from jadewa.status import Status  # noqa: E402
+
+
+def loop_parse(owner: str, repo: str, branch: str, tree: list[dict]):
+    """Previous implementation of Status._parse_github_tree"""
+    allfiles = []
+    shas = {}
+    for i in tree:
+        path = i["path"]
+        filename = os.path.basename(path)
+        if filename.endswith(".csv") or filename == "metadata.json":
+            allfiles.append(path)
+            shas[path] = i.get("sha")
+
+    status = {}
+    metadata_paths = []
+    blob_shas = {}
+    start_url = f"https://github.com/{owner}/{repo}/raw/{branch}/"
+    for path in allfiles:
+        pieces = path.split("/")
+        if len(pieces[-3].split("-")) > 2:
+            library = (
+                pieces[-3].split("-")[-2] + "-" + pieces[-3].split("-")[-1]
+            ).replace("_", "")
+        else:
+            library = (
+                pieces[-3]
+                .split("-")[-1]
+                .replace("_", "")
+                .replace("%20", " ")
+                .replace("%2B", "+")
+            )
+        benchmark = pieces[-2]
+        code = pieces[-3].split("-")[0].replace("_", "")
+        file = pieces[-1]
+        if file.endswith(".csv"):
+            if benchmark not in status:
+                status[benchmark] = {}
+            if library not in status[benchmark]:
+                status[benchmark][library] = {}
+            if code not in status[benchmark][library]:
+                rel_path = start_url + os.path.dirname(path)
+                status[benchmark][library][code] = (rel_path, [])
+            status[benchmark][library][code][1].append(file)
+            blob_shas[status[benchmark][library][code][0] + "/" + file] = shas[path]
+        if file == "metadata.json":
+            metadata_paths.append(
+                start_url + os.path.dirname(path) + r"/metadata.json?raw=true"
+            )
+    return status, metadata_paths, blob_shas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tree = synthetic_tree(args.files)
+    # the real trees also list the folders and a metadata.json per benchmark
+    folders = {os.path.dirname(entry["path"]) for entry in tree}
+    for i, folder in enumerate(sorted(folders)):
+        tree.append({"path": folder, "type": "tree", "sha": f"t{i}"})
+        tree.append({"path": folder + "/metadata.json", "sha": f"m{i}"})
+
+    timings = {}
+    results = {}
+    for name, parse in [("loop", loop_parse), ("batch", Status._parse_github_tree)]:
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results[name] = parse("o", "r", "main", tree)
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+
+    assert results["loop"] == results["batch"], "the parsers disagree"
+    print(f"paths: {len(tree)}")
+    for name, elapsed in timings.items():
+        print(
+            f"{name:>5}: {elapsed:.3f} s ({len(tree) / elapsed / 1e6:.2f} M paths/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark the per-file latency of bare requests.get calls against the
+pooled Transport shared by Status and Processor.
+
+By default a local HTTP server serves the files. Real urls (e.g. raw files of
+JADE-RAW-RESULTS) can be given instead to include the TLS handshakes.
+
+Usage:
+    python benchmarks/transport_latency.py [--files 50] [--url URL ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from jadewa.network import Transport  # noqa: E402
+
+CSV_CONTENT = ("Energy,Value,Error\n" + "1e-3,1.5,0.01\n" * 2000).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # noqa: N802
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(CSV_CONTENT)))
+        self.end_headers()
+        self.wfile.write(CSV_CONTENT)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def _time_per_file(get, urls: list[str]) -> float:
+    start = time.perf_counter()
+    for url in urls:
+        get(url).raise_for_status()
+    return (time.perf_counter() - start) / len(urls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--url", nargs="+", default=None)
+    args = parser.parse_args()
+
+    server = None
+    if args.url is None:
+        server = _Server(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        urls = [
+            f"http://127.0.0.1:{server.server_port}/file{i}.csv"
+            for i in range(args.files)
+        ]
+    else:
+        urls = args.url
+
+    bare = _time_per_file(lambda url: requests.get(url, timeout=10), urls)
+    transport = Transport()
+    pooled = _time_per_file(transport.get, urls)
+    print(f"files: {len(urls)}")
+    print(f"requests.get: {bare * 1000:.2f} ms/file")
+    print(f"Transport:    {pooled * 1000:.2f} ms/file")
+    transport.close()
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""Read the raw results straight from an archive of the results repository.
+
+A single archive (e.g. the tarball of JADE-RAW-RESULTS that GitHub serves for
+any branch or commit) replaces thousands of single file requests and allows
+deployments without network access. The archive members are indexed in one
+streaming pass and then read directly, nothing is extracted to disk:
+
+- zip archives and uncompressed tarballs are random access, only the
+  position of each member is kept;
+- compressed tarballs can only be read sequentially, so the content of the
+  results files is kept in memory (compressed) during the indexing pass.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tarfile
+import threading
+import zipfile
+import zlib
+
+from jadewa.network import Transport, get_transport
+from jadewa.utils import CachePath
+
+ARCHIVE_DIR = CachePath("archives")
+# members of the archive that are indexed
+MEMBER_SUFFIXES = (".csv", "/metadata.json")
+# magic numbers of the compressed tarballs
+_COMPRESSED_MAGIC = (b"\x1f\x8b", b"BZh", b"\xfd7zXZ\x00")
+DOWNLOAD_CHUNK_SIZE = 1024**2
+
+
+class ResultsArchive:
+    def __init__(self, path: os.PathLike) -> None:
+        """Index the results files contained in a tar (optionally compressed)
+        or zip archive.
+
+        Parameters
+        ----------
+        path : os.PathLike
+            path to the archive
+
+        Attributes
+        ----------
+        kind : str
+            "zip", "tar" or "compressed tar"
+        """
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        # member name -> (offset, size) in the archive
+        self._members: dict[str, tuple[int, int]] = {}
+        # compressed content of the members of compressed tarballs
+        self._contents: dict[str, bytes] = {}
+        if zipfile.is_zipfile(self.path):
+            self.kind = "zip"
+            self._file = zipfile.ZipFile(self.path)
+            for info in self._file.infolist():
+                if not info.is_dir() and info.filename.endswith(MEMBER_SUFFIXES):
+                    self._members[info.filename] = (
+                        info.header_offset,
+                        info.file_size,
+                    )
+        else:
+            with open(self.path, "rb") as infile:
+                magic = infile.read(6)
+            if magic.startswith(_COMPRESSED_MAGIC):
+                self.kind = "compressed tar"
+            else:
+                self.kind = "tar"
+            self._file = open(self.path, "rb")
+            self._index_tar()
+
+    def _index_tar(self) -> None:
+        # streaming mode: the archive is read (and decompressed) only once
+        with tarfile.open(fileobj=self._file, mode="r|*") as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                if not member.name.endswith(MEMBER_SUFFIXES):
+                    continue
+                self._members[member.name] = (member.offset_data, member.size)
+                if self.kind != "tar":
+                    content = tar.extractfile(member).read()
+                    self._contents[member.name] = zlib.compress(content, 1)
+        if self.kind != "tar":
+            self._file.close()
+            self._file = None
+
+    @classmethod
+    def download(
+        cls,
+        url: str,
+        archive_dir: os.PathLike = ARCHIVE_DIR,
+        transport: Transport = None,
+    ) -> ResultsArchive:
+        """Download an archive with a single streamed request and index it.
+
+        Parameters
+        ----------
+        url : str
+            url of the archive, e.g.
+            https://github.com/{owner}/{repo}/archive/refs/heads/{branch}.tar.gz
+        archive_dir : os.PathLike, optional
+            directory where the archive is stored, by default ARCHIVE_DIR
+        transport : Transport, optional
+            transport used for the request, by default the shared one
+
+        Returns
+        -------
+        ResultsArchive
+            the downloaded archive
+        """
+        if transport is None:
+            transport = get_transport()
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        path = os.path.join(archive_dir, name)
+        os.makedirs(archive_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with transport.get(url, stream=True) as r:
+            r.raise_for_status()
+            with open(tmp_path, "wb") as outfile:
+                for chunk in r.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    outfile.write(chunk)
+        os.replace(tmp_path, path)
+        return cls(path)
+
+    def names(self) -> list[str]:
+        """Names of the indexed members (results and metadata files)"""
+        return list(self._members)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._members
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def read(self, name: str) -> bytes:
+        """Read the content of a member.
+
+        Parameters
+        ----------
+        name : str
+            name of the member
+
+        Returns
+        -------
+        bytes
+            content of the member
+
+        Raises
+        ------
+        KeyError
+            if the member is not in the archive
+        """
+        offset, size = self._members[name]
+        if self.kind == "compressed tar":
+            return zlib.decompress(self._contents[name])
+        if self.kind == "zip":
+            # zipfile supports concurrent reads of different members
+            return self._file.read(name)
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(size)
+
+    def read_many(self, names: list[str]) -> dict[str, bytes | None]:
+        """Read a batch of members in the order they are stored, so that the
+        archive is read sequentially.
+
+        Parameters
+        ----------
+        names : list[str]
+            names of the members
+
+        Returns
+        -------
+        dict[str, bytes | None]
+            content of each member, None if it is not in the archive
+        """
+        contents = {name: None for name in names}
+        found = sorted(
+            (name for name in contents if name in self._members),
+            key=lambda name: self._members[name][0],
+        )
+        for name in found:
+            contents[name] = self.read(name)
+        return contents
+
+    def size(self, name: str) -> int:
+        """Size in bytes of a member"""
+        return self._members[name][1]
+
+    def close(self) -> None:
+        """Close the archive file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> ResultsArchive:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
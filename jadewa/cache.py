@@ -0,0 +1,380 @@
+"""Caches for the raw .csv results and the figures.
+
+The first tier of the .csv cache is an in-memory LRU of parsed DataFrames
+bounded by their size in bytes. The second tier is an on-disk store of the
+raw .csv contents keyed by the git blob SHA of the file, which makes it
+content-addressed: a file that did not change in the repository is never
+downloaded twice.
+
+The figures already built are kept in a small in-memory LRU, so that a plot
+is drawn again at almost no cost when the app reruns after an unrelated
+interaction.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from io import BytesIO
+from typing import Callable
+
+import pandas as pd
+from plotly.graph_objects import Figure
+
+from jadewa.utils import CACHE_DIR
+
+DEFAULT_MAX_BYTES = 256 * 1024**2
+DEFAULT_MAX_FIGURES = 64
+
+
+class CSVCache:
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        cache_dir: os.PathLike | None = CACHE_DIR,
+    ) -> None:
+        """Cache parsed .csv results in memory and their raw content on disk.
+
+        Parameters
+        ----------
+        max_bytes : int, optional
+            maximum size in bytes of the DataFrames kept in memory, by default
+            256 MB.
+        cache_dir : os.PathLike | None, optional
+            directory where the raw content of the files is stored, by default
+            CACHE_DIR. If None, only the in-memory tier is used.
+
+        Attributes
+        ----------
+        hits : int
+            number of requests served from memory
+        disk_hits : int
+            number of requests served from the disk store
+        misses : int
+            number of requests that required loading the file
+        """
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[Hashable, tuple[pd.DataFrame, int]] = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        """Current size in bytes of the in-memory tier"""
+        return self._nbytes
+
+    def stats(self) -> dict[str, int]:
+        """Get the cache counters, useful to size the cache.
+
+        Returns
+        -------
+        dict[str, int]
+            hits, disk_hits, misses, number of entries and bytes in memory
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._memory),
+                "nbytes": self._nbytes,
+            }
+
+    def clear(self) -> None:
+        """Empty the in-memory tier and reset the counters. The disk store is
+        left untouched."""
+        with self._lock:
+            self._memory.clear()
+            self._nbytes = 0
+            self.hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+
+    def contains(self, key: str, sha: str | None = None) -> bool:
+        """Check if a file is cached, in memory or on disk.
+
+        Parameters
+        ----------
+        key : str
+            key of the memory tier
+        sha : str | None, optional
+            git blob SHA of the file, to look it up in the disk tier, by
+            default None
+
+        Returns
+        -------
+        bool
+            True if the file does not need to be loaded
+        """
+        with self._lock:
+            if key in self._memory:
+                return True
+        if sha is None or self.cache_dir is None:
+            return False
+        return os.path.exists(self._disk_path(sha))
+
+    def get_or_load(
+        self, key: str, loader: Callable[[], bytes], sha: str | None = None
+    ) -> pd.DataFrame:
+        """Get the DataFrame associated to a key, loading it if needed.
+
+        Parameters
+        ----------
+        key : str
+            key of the memory tier (e.g. the sha or the path of the file)
+        loader : Callable[[], bytes]
+            function returning the raw content of the .csv file
+        sha : str | None, optional
+            git blob SHA of the file. Only if provided the raw content is
+            looked up and stored in the disk tier, by default None.
+
+        Returns
+        -------
+        pd.DataFrame
+            a copy of the cached DataFrame, safe to be modified by the caller
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key][0].copy()
+
+        raw = self._read_disk(sha)
+        if raw is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            raw = loader()
+            with self._lock:
+                self.misses += 1
+            self._write_disk(sha, raw)
+
+        df = pd.read_csv(BytesIO(raw))
+        self._put(key, df)
+        return df.copy()
+
+    def get_many(
+        self,
+        entries: dict[str, str | None],
+        loader: Callable[[list[str]], dict[str, bytes | None]],
+        parser: Callable[[dict[str, bytes]], dict[str, pd.DataFrame | None]] = None,
+        variant: Hashable = None,
+    ) -> dict[str, pd.DataFrame | None]:
+        """Get the DataFrames associated to several keys, loading and parsing
+        all the missing ones together.
+
+        Parameters
+        ----------
+        entries : dict[str, str | None]
+            git blob SHA of each key, None if not known (see get_or_load)
+        loader : Callable[[list[str]], dict[str, bytes | None]]
+            function returning the raw content of the given keys, None for the
+            ones that could not be loaded
+        parser : Callable[[dict[str, bytes]], dict[str, pd.DataFrame | None]], optional
+            function parsing the raw contents, e.g. TallySchema.parse_many. By
+            default each file is parsed on its own with type inference.
+        variant : Hashable, optional
+            identity of the DataFrames returned by the parser when they are
+            not the plain content of the files (e.g. a Coercion), they are
+            kept apart in memory. By default None.
+
+        Returns
+        -------
+        dict[str, pd.DataFrame | None]
+            a copy of each cached DataFrame, None if it could not be loaded or
+            parsed
+        """
+        memory_keys = {
+            key: key if variant is None else (key, variant) for key in entries
+        }
+        results = {}
+        with self._lock:
+            for key, memory_key in memory_keys.items():
+                if memory_key in self._memory:
+                    self._memory.move_to_end(memory_key)
+                    self.hits += 1
+                    results[key] = self._memory[memory_key][0].copy()
+
+        raws = {}
+        to_load = []
+        for key, sha in entries.items():
+            if key in results:
+                continue
+            raw = self._read_disk(sha)
+            if raw is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                raws[key] = raw
+            else:
+                to_load.append(key)
+        if to_load:
+            loaded = loader(to_load)
+            for key in to_load:
+                raw = loaded.get(key)
+                if raw is None:
+                    results[key] = None
+                    continue
+                with self._lock:
+                    self.misses += 1
+                self._write_disk(entries[key], raw)
+                raws[key] = raw
+
+        if parser is None:
+            parser = _parse_each
+        for key, df in parser(raws).items():
+            if df is not None:
+                self._put(memory_keys[key], df)
+                df = df.copy()
+            results[key] = df
+        return {key: results.get(key) for key in entries}
+
+    def _put(self, key: Hashable, df: pd.DataFrame) -> None:
+        size = int(df.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._memory:
+                self._nbytes -= self._memory.pop(key)[1]
+            self._memory[key] = (df, size)
+            self._nbytes += size
+            # evict the least recently used entries
+            while self._nbytes > self.max_bytes:
+                _, (_, old_size) = self._memory.popitem(last=False)
+                self._nbytes -= old_size
+
+    def _disk_path(self, sha: str) -> str:
+        return os.path.join(self.cache_dir, sha[:2], sha)
+
+    def _read_disk(self, sha: str | None) -> bytes | None:
+        if sha is None or self.cache_dir is None:
+            return None
+        try:
+            with open(self._disk_path(sha), "rb") as infile:
+                return infile.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, sha: str | None, raw: bytes) -> None:
+        if sha is None or self.cache_dir is None:
+            return
+        path = self._disk_path(sha)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # write to a temporary file first so that concurrent readers never
+            # see a partially written entry
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as outfile:
+                outfile.write(raw)
+            os.replace(tmp_path, path)
+        except OSError:
+            # the disk tier is only an optimization
+            pass
+
+
+class FigureCache:
+    def __init__(self, max_entries: int = DEFAULT_MAX_FIGURES) -> None:
+        """In-memory LRU of the plotly figures already built.
+
+        Figures are stored as plain dictionaries and each request gets a new
+        Figure built from them without validation, which is much cheaper than
+        building the figure again or deep-copying it.
+
+        Parameters
+        ----------
+        max_entries : int, optional
+            maximum number of figures kept, by default DEFAULT_MAX_FIGURES
+
+        Attributes
+        ----------
+        hits : int
+            number of requests served from the cache
+        misses : int
+            number of requests for figures not in the cache
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._figures: OrderedDict[tuple, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def stats(self) -> dict[str, int]:
+        """Get the cache counters.
+
+        Returns
+        -------
+        dict[str, int]
+            hits, misses and number of entries
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._figures),
+            }
+
+    def clear(self) -> None:
+        """Drop all the figures and reset the counters"""
+        with self._lock:
+            self._figures.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get(self, key: tuple) -> Figure | None:
+        """Get a copy of a cached figure.
+
+        Parameters
+        ----------
+        key : tuple
+            key of the figure, it must include everything the figure depends
+            on (e.g. the data version of the benchmark)
+
+        Returns
+        -------
+        Figure | None
+            a new figure, safe to be modified by the caller, None if the key
+            is not cached
+        """
+        with self._lock:
+            figure = self._figures.get(key)
+            if figure is None:
+                self.misses += 1
+                return None
+            self._figures.move_to_end(key)
+            self.hits += 1
+        # the stored dictionary was produced by a valid figure
+        return Figure(figure, _validate=False)
+
+    def put(self, key: tuple, figure: Figure) -> None:
+        """Store a figure, evicting the least recently used ones if needed.
+
+        Parameters
+        ----------
+        key : tuple
+            key of the figure
+        figure : Figure
+            figure to be stored, later changes to it do not affect the cache
+        """
+        if self.max_entries <= 0:
+            return
+        stored = figure.to_dict()
+        with self._lock:
+            self._figures[key] = stored
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+
+
+def _parse_each(raws: dict[str, bytes]) -> dict[str, pd.DataFrame | None]:
+    parsed = {}
+    for key, raw in raws.items():
+        try:
+            parsed[key] = pd.read_csv(BytesIO(raw))
+        except (ValueError, UnicodeDecodeError):
+            parsed[key] = None
+    return parsed
@@ -0,0 +1,389 @@
+"""Compact catalog of the available raw results.
+
+All identifiers (benchmarks, libraries, codes, file names, paths) are interned
+once and the catalog stores only integer ids in array-backed columns: one row
+per benchmark/library/code folder and one row per file. Files are grouped by
+folder so that the files of a folder are a contiguous slice of the file
+columns. Forward and reverse indexes allow to answer questions such as "which
+benchmarks have library X" without walking all the results.
+"""
+
+from __future__ import annotations
+
+import os
+from array import array
+from collections.abc import Iterator, Mapping
+
+SHA_SIZE = 20
+_NO_SHA = bytes(SHA_SIZE)
+
+
+class Catalog:
+    def __init__(self) -> None:
+        """Columnar catalog of the results files, see the module docstring.
+        Folders are added through add_folder or the whole catalog is built
+        with from_nested.
+        """
+        # interned strings
+        self._strings: list[str] = []
+        self._string_ids: dict[str, int] = {}
+        # folder columns
+        self._folder_benchmark = array("i")
+        self._folder_library = array("i")
+        self._folder_code = array("i")
+        self._folder_prefix = array("i")
+        self._folder_dir = array("i")
+        self._folder_start = array("q")
+        self._folder_stop = array("q")
+        # folder replaced by each folder, -1 if it is a new one
+        self._folder_replaced = array("i")
+        # file columns
+        self._file_name = array("i")
+        self._file_sha = bytearray()
+        # shas that are not 40 hex digits long are stored aside
+        self._odd_shas: dict[int, str] = {}
+        # forward indexes
+        self._folders: dict[int, dict[int, dict[int, int]]] = {}
+        self._folder_by_path: dict[tuple[int, int], int] = {}
+        # file name -> row of the folders looked up by blob_sha, built on
+        # first use, folders are never modified once added
+        self._file_rows: dict[int, dict[int, int]] = {}
+        # reverse indexes
+        self._benchmarks_by_library: dict[int, dict[int, None]] = {}
+        self._benchmarks_by_code: dict[int, dict[int, None]] = {}
+
+    @classmethod
+    def from_nested(
+        cls,
+        status: dict[str, dict[str, dict[str, tuple[str, list[str]]]]],
+        blob_shas: dict[str, str] = None,
+    ) -> Catalog:
+        """Build the catalog from the nested dictionary representation.
+
+        Parameters
+        ----------
+        status : dict[str, dict[str, dict[str, tuple[str, list[str]]]]]
+            benchmark -> library -> code -> (path, files)
+        blob_shas : dict[str, str], optional
+            git blob SHA of the files keyed by path + "/" + file, by default
+            None
+
+        Returns
+        -------
+        Catalog
+            catalog containing all the results
+        """
+        catalog = cls()
+        if blob_shas is None:
+            blob_shas = {}
+        for benchmark, libraries in status.items():
+            for library, codes in libraries.items():
+                for code, (path, files) in codes.items():
+                    shas = None
+                    if blob_shas:
+                        shas = [blob_shas.get(f"{path}/{file}") for file in files]
+                    catalog.add_folder(benchmark, library, code, path, files, shas)
+        return catalog
+
+    def intern(self, string: str) -> int:
+        """Get the id of a string, adding it to the table if needed"""
+        try:
+            return self._string_ids[string]
+        except KeyError:
+            idx = len(self._strings)
+            self._strings.append(string)
+            self._string_ids[string] = idx
+            return idx
+
+    def _id(self, string: str) -> int:
+        """Get the id of a string, -1 if it is unknown"""
+        return self._string_ids.get(string, -1)
+
+    @staticmethod
+    def _split_path(path: str) -> tuple[str, str]:
+        # the prefix (root folder or url) is shared by all the folders, the
+        # last two levels are _code_-_library_/benchmark
+        path = str(path)
+        cut = len(path)
+        for _ in range(2):
+            cut = max(path.rfind("/", 0, cut), path.rfind(os.sep, 0, cut))
+            if cut < 0:
+                return "", path
+        return path[: cut + 1], path[cut + 1 :]
+
+    def add_folder(
+        self,
+        benchmark: str,
+        library: str,
+        code: str,
+        path: str,
+        files: list[str],
+        shas: list[str | None] = None,
+    ) -> None:
+        """Add (or replace) the files of a benchmark/library/code folder.
+
+        Parameters
+        ----------
+        benchmark : str
+            benchmark name
+        library : str
+            library name
+        code : str
+            code name
+        path : str
+            path to the folder
+        files : list[str]
+            names of the files in the folder
+        shas : list[str | None], optional
+            git blob SHA of each file, by default None
+        """
+        bench_id = self.intern(benchmark)
+        lib_id = self.intern(library)
+        code_id = self.intern(code)
+        prefix, directory = self._split_path(path)
+        prefix_id = self.intern(prefix)
+        dir_id = self.intern(directory)
+
+        folder = len(self._folder_benchmark)
+        start = len(self._file_name)
+        self._folder_replaced.append(
+            self._folders.get(bench_id, {}).get(lib_id, {}).get(code_id, -1)
+        )
+        self._folder_benchmark.append(bench_id)
+        self._folder_library.append(lib_id)
+        self._folder_code.append(code_id)
+        self._folder_prefix.append(prefix_id)
+        self._folder_dir.append(dir_id)
+        self._folder_start.append(start)
+        self._folder_stop.append(start + len(files))
+
+        if shas is None:
+            shas = [None] * len(files)
+        for row, (file, sha) in enumerate(zip(files, shas), start=start):
+            self._file_name.append(self.intern(file))
+            raw = None
+            if sha is not None and len(sha) == 2 * SHA_SIZE:
+                try:
+                    raw = bytes.fromhex(sha)
+                except ValueError:
+                    pass
+            if raw is None:
+                raw = _NO_SHA
+                if sha is not None:
+                    self._odd_shas[row] = sha
+            self._file_sha.extend(raw)
+
+        # a replaced folder keeps its position in the forward index
+        libraries = self._folders.setdefault(bench_id, {})
+        libraries.setdefault(lib_id, {})[code_id] = folder
+        self._folder_by_path[prefix_id, dir_id] = folder
+        self._benchmarks_by_library.setdefault(lib_id, {})[bench_id] = None
+        self._benchmarks_by_code.setdefault(code_id, {})[bench_id] = None
+
+    @property
+    def revision(self) -> int:
+        """Counter increased every time a folder is added or replaced"""
+        return len(self._folder_benchmark)
+
+    def folder_version(self, benchmark: str, library: str, code: str) -> int:
+        """Token of the current content of a benchmark/library/code folder,
+        it changes when the folder is replaced"""
+        return self._folder(benchmark, library, code)
+
+    def changes(
+        self, since: int, until: int = None, benchmark: str = None
+    ) -> Iterator[tuple[str, str, str, list[str], list[str]]]:
+        """Changes of the catalog between two revisions.
+
+        Parameters
+        ----------
+        since : int
+            revision of the catalog the changes are computed from, 0 to get
+            all the results as changes
+        until : int, optional
+            revision of the catalog the changes lead to, by default the
+            current one
+        benchmark : str, optional
+            if given, only the changes of this benchmark are returned
+
+        Yields
+        ------
+        tuple[str, str, str, list[str], list[str]]
+            benchmark, library, code, added and removed file names of each
+            folder added or replaced, in the order of the changes
+        """
+        if until is None:
+            until = len(self._folder_benchmark)
+        bench_id = None
+        if benchmark is not None:
+            bench_id = self._string_ids.get(benchmark)
+            if bench_id is None:
+                return
+        for folder in range(since, until):
+            if bench_id is not None and self._folder_benchmark[folder] != bench_id:
+                continue
+            files = self._folder_files(folder)
+            old = self._folder_replaced[folder]
+            old_files = self._folder_files(old) if old >= 0 else []
+            kept = set(files).intersection(old_files)
+            yield (
+                self._strings[self._folder_benchmark[folder]],
+                self._strings[self._folder_library[folder]],
+                self._strings[self._folder_code[folder]],
+                [file for file in files if file not in kept],
+                [file for file in old_files if file not in kept],
+            )
+
+    def __len__(self) -> int:
+        """Number of files in the catalog"""
+        return sum(
+            self._folder_stop[folder] - self._folder_start[folder]
+            for folder in self._iter_folders()
+        )
+
+    def _iter_folders(self) -> Iterator[int]:
+        for libraries in self._folders.values():
+            for codes in libraries.values():
+                yield from codes.values()
+
+    def _folder(self, benchmark: str, library: str, code: str) -> int:
+        return self._folders[self._id(benchmark)][self._id(library)][self._id(code)]
+
+    def _folder_path(self, folder: int) -> str:
+        return (
+            self._strings[self._folder_prefix[folder]]
+            + self._strings[self._folder_dir[folder]]
+        )
+
+    def _folder_files(self, folder: int) -> list[str]:
+        strings = self._strings
+        start, stop = self._folder_start[folder], self._folder_stop[folder]
+        return [strings[idx] for idx in self._file_name[start:stop]]
+
+    def benchmarks(self) -> list[str]:
+        """All the benchmarks in the catalog"""
+        return [self._strings[idx] for idx in self._folders]
+
+    def libraries(self, benchmark: str) -> list[str]:
+        """All the libraries available for a benchmark"""
+        return [self._strings[idx] for idx in self._folders[self._id(benchmark)]]
+
+    def codes(self, benchmark: str, library: str) -> list[str]:
+        """All the codes available for a benchmark and library"""
+        codes = self._folders[self._id(benchmark)][self._id(library)]
+        return [self._strings[idx] for idx in codes]
+
+    def results(self, benchmark: str, library: str, code: str) -> tuple[str, list[str]]:
+        """Path and file names of a benchmark/library/code folder"""
+        folder = self._folder(benchmark, library, code)
+        return self._folder_path(folder), self._folder_files(folder)
+
+    def benchmarks_with_library(self, library: str) -> list[str]:
+        """All the benchmarks for which a library is available"""
+        benchmarks = self._benchmarks_by_library.get(self._id(library), {})
+        return [self._strings[idx] for idx in benchmarks]
+
+    def benchmarks_with_code(self, code: str) -> list[str]:
+        """All the benchmarks for which a code is available"""
+        benchmarks = self._benchmarks_by_code.get(self._id(code), {})
+        return [self._strings[idx] for idx in benchmarks]
+
+    def blob_sha(self, path: str, file: str) -> str | None:
+        """git blob SHA of a file, None if unknown"""
+        prefix, directory = self._split_path(path)
+        try:
+            folder = self._folder_by_path[self._id(prefix), self._id(directory)]
+        except KeyError:
+            return None
+        rows = self._file_rows.get(folder)
+        if rows is None:
+            start, stop = self._folder_start[folder], self._folder_stop[folder]
+            rows = {}
+            for row in range(start, stop):
+                rows.setdefault(self._file_name[row], row)
+            self._file_rows[folder] = rows
+        row = rows.get(self._id(file))
+        if row is None:
+            return None
+        if row in self._odd_shas:
+            return self._odd_shas[row]
+        sha = bytes(self._file_sha[row * SHA_SIZE : (row + 1) * SHA_SIZE])
+        if sha == _NO_SHA:
+            return None
+        return sha.hex()
+
+    def folder_shas(self, benchmark: str, library: str, code: str) -> list[str | None]:
+        """git blob SHA of all the files of a benchmark/library/code folder,
+        in the order of results"""
+        folder = self._folder(benchmark, library, code)
+        start, stop = self._folder_start[folder], self._folder_stop[folder]
+        shas = []
+        for row in range(start, stop):
+            if row in self._odd_shas:
+                shas.append(self._odd_shas[row])
+                continue
+            sha = bytes(self._file_sha[row * SHA_SIZE : (row + 1) * SHA_SIZE])
+            shas.append(None if sha == _NO_SHA else sha.hex())
+        return shas
+
+    def nbytes(self) -> int:
+        """Approximate memory used by the columns and the string table"""
+        columns = [
+            self._folder_benchmark,
+            self._folder_library,
+            self._folder_code,
+            self._folder_prefix,
+            self._folder_dir,
+            self._folder_start,
+            self._folder_stop,
+            self._file_name,
+        ]
+        size = sum(column.itemsize * len(column) for column in columns)
+        size += len(self._file_sha)
+        size += sum(len(string) for string in self._strings)
+        return size
+
+
+class CatalogView(Mapping):
+    """Read-only view of a Catalog with the same interface of the nested
+    dictionary benchmark -> library -> code -> (path, files)."""
+
+    def __init__(self, catalog: Catalog, keys: tuple[str, ...] = ()) -> None:
+        self._catalog = catalog
+        self._keys = keys
+
+    def _children(self) -> list[str]:
+        if len(self._keys) == 0:
+            return self._catalog.benchmarks()
+        if len(self._keys) == 1:
+            return self._catalog.libraries(*self._keys)
+        return self._catalog.codes(*self._keys)
+
+    def __getitem__(self, key: str) -> CatalogView | tuple[str, list[str]]:
+        if key not in self:
+            raise KeyError(key)
+        keys = self._keys + (key,)
+        if len(keys) == 3:
+            return self._catalog.results(*keys)
+        return CatalogView(self._catalog, keys)
+
+    def __contains__(self, key: object) -> bool:
+        catalog = self._catalog
+        node = catalog._folders
+        for level in self._keys + (key,):
+            if not isinstance(level, str):
+                return False
+            try:
+                node = node[catalog._id(level)]
+            except KeyError:
+                return False
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._children())
+
+    def __len__(self) -> int:
+        return len(self._children())
+
+    def __repr__(self) -> str:
+        return f"CatalogView({dict(self)!r})"
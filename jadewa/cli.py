@@ -0,0 +1,149 @@
+"""Command line interface to process the results without the web app.
+
+Usage:
+    python -m jadewa.cli [--root PATH | --archive PATH_OR_URL] export
+        BENCHMARK [BENCHMARK ...] -o OUTPUT [--format {parquet,csv}]
+    python -m jadewa.cli [--root PATH | --archive PATH_OR_URL] render
+        -o DIRECTORY [--benchmarks BENCHMARK ...] [--format {html,json}]
+        [--plot-types {absolute,ratio} ...] [--workers N]
+        [--shard-index I --shard-count N] [--plotlyjs {inline,cdn,directory}]
+
+By default the results are read from GitHub as in the web app.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from collections.abc import Callable
+from functools import partial
+
+from jadewa import render as renderer
+from jadewa.cache import FigureCache
+from jadewa.export import FORMATS
+from jadewa.processor import Processor
+from jadewa.scanner import SCAN_CACHE_DIR, LocalScanner
+from jadewa.status import Status
+
+PLOT_TYPES = {"absolute": False, "ratio": True}
+PLOTLYJS = {"inline": True, "cdn": "cdn", "directory": "directory"}
+
+
+def status_factory(args: argparse.Namespace) -> Callable[[], Status]:
+    """Get a picklable function building the status of the results selected
+    by the command line options"""
+    if args.root is not None:
+        scanner = LocalScanner(cache_dir=SCAN_CACHE_DIR)
+        return partial(Status.from_root, args.root, scanner=scanner)
+    if args.archive is not None:
+        return partial(Status.from_archive, args.archive)
+    return Status.from_github
+
+
+def get_status(args: argparse.Namespace) -> Status:
+    """Get the status of the results selected by the command line options"""
+    return status_factory(args)()
+
+
+def export(args: argparse.Namespace) -> int:
+    """Export the tallies of some benchmarks in long format"""
+    processor = Processor(get_status(args))
+    benchmarks = args.benchmarks
+    if benchmarks == ["all"]:
+        benchmarks = processor.get_available_benchmarks()
+    rows = processor.export(benchmarks, args.output, fmt=args.format)
+    print(f"{rows} rows of {len(benchmarks)} benchmarks written to {args.output}")
+    return 0
+
+
+def render(args: argparse.Namespace) -> int:
+    """Render the figures of the app to files"""
+    make_status = status_factory(args)
+    processor = Processor(make_status(), figures=FigureCache(0))
+    jobs = renderer.list_figures(
+        processor,
+        benchmarks=args.benchmarks,
+        ratios=[PLOT_TYPES[plot_type] for plot_type in args.plot_types],
+    )
+    jobs = renderer.shard(jobs, args.shard_index, args.shard_count)
+
+    def progress(done: int, total: int) -> None:
+        print(f"{done}/{total} figures", file=sys.stderr)
+
+    errors = renderer.render_figures(
+        make_status,
+        jobs,
+        args.output,
+        fmt=args.format,
+        max_workers=args.workers,
+        include_plotlyjs=PLOTLYJS[args.plotlyjs],
+        progress_callback=progress,
+    )
+    failed = {job: error for job, error in errors.items() if error is not None}
+    for job, error in failed.items():
+        print(f"{job.filename(args.format)}: {error}", file=sys.stderr)
+    print(
+        f"{len(jobs) - len(failed)} figures written to {args.output}, "
+        f"{len(failed)} failed"
+    )
+    return 1 if failed else 0
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--root", help="local folder of the results")
+    source.add_argument("--archive", help="archive of the results, path or url")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parser_export = commands.add_parser(
+        "export", help="export all the tallies of some benchmarks in long format"
+    )
+    parser_export.add_argument(
+        "benchmarks", nargs="+", help='benchmark names, "all" for all of them'
+    )
+    parser_export.add_argument("-o", "--output", required=True, help="output file")
+    parser_export.add_argument(
+        "--format",
+        choices=sorted(set(FORMATS.values())),
+        help="by default guessed from the extension of the output file",
+    )
+    parser_export.set_defaults(func=export)
+
+    parser_render = commands.add_parser(
+        "render", help="write the figures of the app to html or json files"
+    )
+    parser_render.add_argument(
+        "-o", "--output", required=True, help="output directory"
+    )
+    parser_render.add_argument(
+        "--benchmarks", nargs="+", help="by default all the available ones"
+    )
+    parser_render.add_argument("--format", choices=renderer.FORMATS, default="html")
+    parser_render.add_argument(
+        "--plot-types",
+        nargs="+",
+        choices=list(PLOT_TYPES),
+        default=list(PLOT_TYPES),
+    )
+    parser_render.add_argument(
+        "--workers", type=int, help="number of processes, by default the CPUs"
+    )
+    parser_render.add_argument("--shard-index", type=int, default=0)
+    parser_render.add_argument("--shard-count", type=int, default=1)
+    parser_render.add_argument(
+        "--plotlyjs",
+        choices=list(PLOTLYJS),
+        default="inline",
+        help="how the html files include plotly.js, by default embedded",
+    )
+    parser_render.set_defaults(func=render)
+
+    args = parser.parse_args(argv)
+    if args.command == "render" and not 0 <= args.shard_index < args.shard_count:
+        parser.error("--shard-index must be between 0 and --shard-count - 1")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
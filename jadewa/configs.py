@@ -0,0 +1,87 @@
+"""Lazy loading of the benchmarks plot configurations.
+
+Each benchmark has its own .json configuration in the resources. Only the
+names of the files are listed at startup, a configuration is parsed (and
+completed, e.g. with the tallies generated from the generic ones) the first
+time it is accessed, so that the startup time does not depend on the number
+of supported benchmarks.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Callable, Iterator, Mapping
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from importlib.resources.abc import Traversable
+
+
+class BenchmarkConfigs(Mapping):
+    def __init__(
+        self,
+        resources: Traversable,
+        on_load: Callable[[str, dict], None] = None,
+    ) -> None:
+        """Read-only mapping from benchmark name to its plot configuration,
+        loaded on first access.
+
+        Parameters
+        ----------
+        resources : Traversable
+            directory containing one <benchmark>.json file per benchmark, e.g.
+            importlib.resources.files(jadewa.resources) or a pathlib.Path
+        on_load : Callable[[str, dict], None], optional
+            function called with the benchmark name and its configuration
+            right after it is parsed, it may modify the configuration in
+            place. Accessing the same benchmark from within it returns the
+            configuration being loaded. By default None.
+        """
+        self._resources = resources
+        self._on_load = on_load
+        # only the file names are read
+        self._names = [
+            entry.name[:-5]
+            for entry in resources.iterdir()
+            if entry.name.endswith(".json")
+        ]
+        self._known = set(self._names)
+        self._configs: dict[str, dict] = {}
+        self._ready: set[str] = set()
+        self._lock = threading.RLock()
+
+    def __getitem__(self, benchmark: str) -> dict:
+        if benchmark in self._ready:
+            return self._configs[benchmark]
+        if benchmark not in self._known:
+            raise KeyError(benchmark)
+        with self._lock:
+            # already loaded, or being loaded by this thread
+            if benchmark in self._configs:
+                return self._configs[benchmark]
+            path = self._resources.joinpath(f"{benchmark}.json")
+            with path.open("r", encoding="utf-8") as infile:
+                config = json.load(infile)
+            self._configs[benchmark] = config
+            try:
+                if self._on_load is not None:
+                    self._on_load(benchmark, config)
+            except BaseException:
+                del self._configs[benchmark]
+                raise
+            self._ready.add(benchmark)
+            return config
+
+    def __contains__(self, benchmark: object) -> bool:
+        return benchmark in self._known
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def loaded(self) -> list[str]:
+        """Benchmarks whose configuration has been loaded"""
+        return [name for name in self._names if name in self._ready]
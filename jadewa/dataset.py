@@ -0,0 +1,307 @@
+"""Columnar datasets compiled from the raw .csv results.
+
+All the .csv files of a benchmark are compiled once per data version into a
+single Arrow IPC file in long format: the benchmark, library, code and file
+columns identify the rows of each .csv, followed by its x columns, Value and
+Error. Rows of the same file are contiguous, so that reading a file is a
+zero-copy slice of the memory-mapped dataset and no text is parsed again.
+
+Files of a benchmark may have columns with the same name but different types,
+these are stored in separate physical columns and each file keeps the mapping
+from its original columns to the physical ones.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from jadewa.utils import CachePath
+
+DATASET_DIR = CachePath("datasets")
+DATASET_VERSION = 1
+_METADATA_KEY = b"jadewa"
+ID_COLUMNS = ("benchmark", "library", "code", "file")
+
+
+class BenchmarkDataset:
+    def __init__(self, path: os.PathLike) -> None:
+        """Memory-mapped dataset of the results of a benchmark.
+
+        Parameters
+        ----------
+        path : os.PathLike
+            path of the Arrow IPC file, see BenchmarkDataset.build
+
+        Raises
+        ------
+        ValueError
+            if the file is not a dataset of this version
+        """
+        self.path = os.fspath(path)
+        source = pa.memory_map(self.path, "r")
+        # the columns point to the mapped file, nothing is copied
+        self.table = pa.ipc.open_file(source).read_all()
+        metadata = json.loads((self.table.schema.metadata or {})[_METADATA_KEY])
+        if metadata.get("version") != DATASET_VERSION:
+            raise ValueError(f"{self.path} is not a dataset version {DATASET_VERSION}")
+        self.benchmark = metadata["benchmark"]
+        # (library, code, file) -> offset, length, [[column, physical column]]
+        self._entries = {
+            (library, code, file): (offset, length, columns)
+            for library, code, file, offset, length, columns in metadata["entries"]
+        }
+
+    def __contains__(self, key: tuple[str, str, str]) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def read(self, library: str, code: str, file: str) -> pd.DataFrame | None:
+        """Get the content of a .csv file.
+
+        Parameters
+        ----------
+        library : str
+            library name
+        code : str
+            code name
+        file : str
+            name of the .csv file
+
+        Returns
+        -------
+        pd.DataFrame | None
+            content of the file as read by pandas, None if the file is not in
+            the dataset
+        """
+        try:
+            offset, length, columns = self._entries[library, code, file]
+        except KeyError:
+            return None
+        part = self.table.slice(offset, length).select(
+            [physical for _, physical in columns]
+        )
+        return part.rename_columns([column for column, _ in columns]).to_pandas()
+
+    @classmethod
+    def build(
+        cls,
+        path: os.PathLike,
+        benchmark: str,
+        frames: dict[tuple[str, str, str], pd.DataFrame],
+    ) -> BenchmarkDataset:
+        """Compile the content of the .csv files of a benchmark into a
+        dataset.
+
+        Parameters
+        ----------
+        path : os.PathLike
+            path of the Arrow IPC file to be written
+        benchmark : str
+            benchmark name
+        frames : dict[tuple[str, str, str], pd.DataFrame]
+            content of each file keyed by library, code and file name
+
+        Returns
+        -------
+        BenchmarkDataset
+            the dataset just written
+        """
+        physical: dict[tuple[str, pa.DataType], str] = {}
+        types: dict[str, pa.DataType] = {}
+        chunks: list[tuple[int, dict[str, pa.ChunkedArray]]] = []
+        entries = []
+        offset = 0
+        for (library, code, file), df in frames.items():
+            table = to_arrow(df)
+            columns = []
+            arrays = {}
+            for field, array in zip(table.schema, table.columns):
+                key = (field.name, field.type)
+                if key not in physical:
+                    name = field.name
+                    if name in types or name in ID_COLUMNS:
+                        name = f"{field.name}#{len(types)}"
+                    physical[key] = name
+                    types[name] = field.type
+                columns.append([field.name, physical[key]])
+                arrays[physical[key]] = array
+            chunks.append((table.num_rows, arrays))
+            entries.append([library, code, file, offset, table.num_rows, columns])
+            offset += table.num_rows
+
+        # the identifiers are dictionary encoded, one entry per file
+        lengths = [length for length, _ in chunks]
+        index = pa.array(np.repeat(np.arange(len(lengths), dtype=np.int32), lengths))
+        identifiers = {
+            "library": [entry[0] for entry in entries],
+            "code": [entry[1] for entry in entries],
+            "file": [entry[2] for entry in entries],
+        }
+        data = {
+            "benchmark": pa.DictionaryArray.from_arrays(
+                pa.array(np.zeros(len(index), dtype=np.int32)),
+                pa.array([benchmark], pa.string()),
+            )
+        }
+        for name, values in identifiers.items():
+            data[name] = pa.DictionaryArray.from_arrays(
+                index, pa.array(values, pa.string())
+            )
+        for name, dtype in types.items():
+            data[name] = pa.chunked_array(
+                [
+                    chunk
+                    for length, arrays in chunks
+                    for chunk in (
+                        arrays[name].chunks
+                        if name in arrays
+                        else [pa.nulls(length, dtype)]
+                    )
+                ],
+                dtype,
+            )
+        table = pa.table(data).replace_schema_metadata(
+            {
+                _METADATA_KEY: json.dumps(
+                    {
+                        "version": DATASET_VERSION,
+                        "benchmark": benchmark,
+                        "entries": entries,
+                    }
+                )
+            }
+        )
+
+        path = os.fspath(path)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+        return cls(path)
+
+
+def to_arrow(df: pd.DataFrame) -> pa.Table:
+    """Convert the content of a .csv file to an Arrow table. The columns that
+    mix types (e.g. numbers and "total") are stored as strings, their missing
+    values stay missing.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        content of the file as read by pandas
+
+    Returns
+    -------
+    pa.Table
+        table with the same columns, without the index
+    """
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowException, TypeError, ValueError):
+        pass
+    df = df.copy()
+    for position in range(df.shape[1]):
+        try:
+            pa.array(df.iloc[:, position], from_pandas=True)
+        except (pa.ArrowException, TypeError, ValueError):
+            df.isetitem(position, df.iloc[:, position].astype("string"))
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+class DatasetStore:
+    def __init__(self, directory: os.PathLike = DATASET_DIR) -> None:
+        """Compiled datasets of the benchmarks, one file per benchmark and
+        data version. Only the latest version of each benchmark is kept.
+
+        Parameters
+        ----------
+        directory : os.PathLike, optional
+            directory where the datasets are stored, by default DATASET_DIR
+        """
+        self.directory = directory
+        self._lock = threading.Lock()
+        # benchmark -> (version, dataset)
+        self._open: dict[str, tuple[str, BenchmarkDataset]] = {}
+
+    def _prefix(self, benchmark: str) -> str:
+        return hashlib.sha1(benchmark.encode("utf-8")).hexdigest()[:16]
+
+    def _path(self, benchmark: str, version: str) -> str:
+        return os.path.join(
+            self.directory, f"{self._prefix(benchmark)}-{version}.arrow"
+        )
+
+    def get(self, benchmark: str, version: str) -> BenchmarkDataset | None:
+        """Get the dataset of a benchmark if it was compiled for the given
+        data version.
+
+        Parameters
+        ----------
+        benchmark : str
+            benchmark name
+        version : str
+            data version of the benchmark, see Processor.get_data_version
+
+        Returns
+        -------
+        BenchmarkDataset | None
+            the dataset, None if it needs to be compiled
+        """
+        with self._lock:
+            opened = self._open.get(benchmark)
+            if opened is not None and opened[0] == version:
+                return opened[1]
+            try:
+                dataset = BenchmarkDataset(self._path(benchmark, version))
+            except (OSError, ValueError, KeyError, pa.ArrowException):
+                return None
+            self._open[benchmark] = (version, dataset)
+            return dataset
+
+    def build(
+        self,
+        benchmark: str,
+        version: str,
+        frames: dict[tuple[str, str, str], pd.DataFrame],
+    ) -> BenchmarkDataset:
+        """Compile the dataset of a benchmark and drop its older versions.
+
+        Parameters
+        ----------
+        benchmark : str
+            benchmark name
+        version : str
+            data version of the benchmark
+        frames : dict[tuple[str, str, str], pd.DataFrame]
+            content of each file keyed by library, code and file name
+
+        Returns
+        -------
+        BenchmarkDataset
+            the compiled dataset
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(benchmark, version)
+        dataset = BenchmarkDataset.build(path, benchmark, frames)
+        with self._lock:
+            self._open[benchmark] = (version, dataset)
+        prefix = self._prefix(benchmark) + "-"
+        for name in os.listdir(self.directory):
+            old = os.path.join(self.directory, name)
+            if name.startswith(prefix) and name.endswith(".arrow") and old != path:
+                try:
+                    # the mapped file stays readable by whoever opened it
+                    os.remove(old)
+                except OSError:
+                    pass
+        return dataset
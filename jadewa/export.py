@@ -0,0 +1,202 @@
+"""Bulk export of the results in long format.
+
+The tallies are exported one DataFrame at a time (see
+Processor.iter_long_format): each row holds the benchmark, library, code and
+tally it belongs to, the quantity measured (the label of the values in the
+plots), the x columns of the tally and its Value and Error. Tallies have
+different x columns, so the columns of the output are only known once all the
+tallies have been read. The chunks are spilled to temporary Arrow IPC files
+as they come, then they are written to a single Parquet or CSV file with the
+union of their columns. Only one chunk is held in memory at a time.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from jadewa.dataset import to_arrow
+
+ID_COLUMNS = ("benchmark", "library", "code", "tally", "quantity")
+VALUE_COLUMNS = ("Value", "Error")
+FORMATS = {".parquet": "parquet", ".pq": "parquet", ".csv": "csv"}
+DEFAULT_CHUNK_ROWS = 65536
+
+
+class LongFormatWriter:
+    def __init__(
+        self,
+        path: os.PathLike,
+        fmt: str = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        spill_dir: os.PathLike = None,
+    ) -> None:
+        """Write DataFrames with different columns into a single long format
+        file. The file is written when the writer is closed.
+
+        Parameters
+        ----------
+        path : os.PathLike
+            path of the output file
+        fmt : str, optional
+            "parquet" or "csv", by default guessed from the extension of path
+        chunk_rows : int, optional
+            maximum number of rows written at a time (one Parquet row group),
+            by default DEFAULT_CHUNK_ROWS
+        spill_dir : os.PathLike, optional
+            directory of the temporary files, by default the system one
+
+        Raises
+        ------
+        ValueError
+            if the format is not supported
+        """
+        self.path = os.fspath(path)
+        if fmt is None:
+            fmt = FORMATS.get(os.path.splitext(self.path)[1].lower())
+        if fmt not in FORMATS.values():
+            raise ValueError(f"Unsupported export format for {self.path}: {fmt}")
+        self.fmt = fmt
+        self.chunk_rows = max(chunk_rows, 1)
+        self.rows = 0
+        self._tmpdir = tempfile.TemporaryDirectory(dir=spill_dir)
+        # schema -> spill file writer, one file per distinct schema
+        self._spills: dict[pa.Schema, tuple[str, pa.ipc.RecordBatchFileWriter]] = {}
+        # (schema, batch number) of each chunk in the order they were written
+        self._batches: list[tuple[pa.Schema, int]] = []
+        self._counts: dict[pa.Schema, int] = {}
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Add a chunk to the export.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            rows to be exported
+        """
+        if df.empty:
+            return
+        table = to_arrow(df).combine_chunks()
+        schema = table.schema.remove_metadata()
+        if schema not in self._spills:
+            path = os.path.join(self._tmpdir.name, f"{len(self._spills)}.arrow")
+            self._spills[schema] = (path, pa.ipc.new_file(path, schema))
+            self._counts[schema] = 0
+        writer = self._spills[schema][1]
+        for batch in table.to_batches():
+            writer.write_batch(batch.replace_schema_metadata(None))
+            self._batches.append((schema, self._counts[schema]))
+            self._counts[schema] += 1
+        self.rows += table.num_rows
+
+    def close(self) -> int:
+        """Write the output file and remove the temporary files.
+
+        Returns
+        -------
+        int
+            number of rows written
+        """
+        try:
+            for _, writer in self._spills.values():
+                writer.close()
+            schema = _unify([*self._spills])
+            sources = {
+                spill: pa.memory_map(path, "r")
+                for spill, (path, _) in self._spills.items()
+            }
+            readers = {
+                spill: pa.ipc.open_file(source) for spill, source in sources.items()
+            }
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            if self.fmt == "parquet":
+                writer = pq.ParquetWriter(tmp_path, schema)
+            else:
+                writer = pacsv.CSVWriter(tmp_path, schema)
+            try:
+                buffer = []
+                buffered = 0
+                for spill, number in self._batches:
+                    batch = _conform(readers[spill].get_batch(number), schema)
+                    buffer.append(batch)
+                    buffered += batch.num_rows
+                    if buffered >= self.chunk_rows:
+                        writer.write_table(pa.Table.from_batches(buffer, schema))
+                        buffer = []
+                        buffered = 0
+                if buffer:
+                    writer.write_table(pa.Table.from_batches(buffer, schema))
+            finally:
+                writer.close()
+                for source in sources.values():
+                    source.close()
+            os.replace(tmp_path, self.path)
+        finally:
+            self.abort()
+        return self.rows
+
+    def abort(self) -> None:
+        """Remove the temporary files without writing the output file"""
+        for _, writer in self._spills.values():
+            try:
+                writer.close()
+            except (pa.ArrowException, OSError):
+                pass
+        self._spills = {}
+        self._tmpdir.cleanup()
+
+    def __enter__(self) -> LongFormatWriter:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def _unify(schemas: list[pa.Schema]) -> pa.Schema:
+    """Union of the columns of the chunks: the identifiers first, then the x
+    columns in the order they were found, then the values. A column found
+    with different types is stored as float if they are all numeric, as
+    string otherwise."""
+    types: dict[str, list[pa.DataType]] = {name: [] for name in ID_COLUMNS}
+    for schema in schemas:
+        for field in schema:
+            if field.name not in VALUE_COLUMNS:
+                types.setdefault(field.name, []).append(field.type)
+    for name in VALUE_COLUMNS:
+        types[name] = [
+            schema.field(name).type for schema in schemas if name in schema.names
+        ]
+    return pa.schema([(name, _common_type(found)) for name, found in types.items()])
+
+
+def _common_type(types: list[pa.DataType]) -> pa.DataType:
+    types = {dtype for dtype in types if not pa.types.is_null(dtype)}
+    if len(types) == 1:
+        (dtype,) = types
+        return pa.string() if pa.types.is_large_string(dtype) else dtype
+    if types and all(
+        pa.types.is_integer(dtype) or pa.types.is_floating(dtype) for dtype in types
+    ):
+        return pa.float64()
+    return pa.string()
+
+
+def _conform(batch: pa.RecordBatch, schema: pa.Schema) -> pa.RecordBatch:
+    """Cast a chunk to the output schema, the missing columns are null"""
+    arrays = []
+    for field in schema:
+        index = batch.schema.get_field_index(field.name)
+        if index < 0:
+            arrays.append(pa.nulls(batch.num_rows, field.type))
+        else:
+            arrays.append(batch.column(index).cast(field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
@@ -0,0 +1,114 @@
+"""Federation of the results coming from several repositories.
+
+The Status is built from a list of sources (GitHub repositories). Sources
+without merge rules provide results that are taken as they are, the others
+contribute only the folders selected by their rules (e.g. the experimental
+data of the IAEA open benchmarks, renamed to the "exp" library/code). All the
+sources are fetched concurrently, while a lazy source is fetched only when one
+of the benchmarks it serves is opened for the first time.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Container, Iterator
+from typing import NamedTuple
+
+
+class MergeRule(NamedTuple):
+    """Select the folders of a source and rename them in the federated
+    status. None matches any library or code and keeps the original name."""
+
+    library: str | None = None
+    code: str | None = None
+    as_library: str | None = None
+    as_code: str | None = None
+    # if False, the folder is added only to benchmarks that have results from
+    # the other sources
+    new_benchmarks: bool = False
+
+    def match(self, library: str, code: str) -> tuple[str, str] | None:
+        """Get the federated library and code of a folder, None if the rule
+        does not apply"""
+        if self.library is not None and library != self.library:
+            return None
+        if self.code is not None and code != self.code:
+            return None
+        return self.as_library or library, self.as_code or code
+
+
+class Source(NamedTuple):
+    """GitHub repository providing results"""
+
+    owner: str
+    repo: str
+    branch: str = "main"
+    # None: all the results are taken as they are
+    rules: tuple[MergeRule, ...] | None = None
+    # lazy sources are fetched when one of their benchmarks is first opened
+    lazy: bool = False
+    # benchmarks served by a lazy source, None for any
+    benchmarks: tuple[str, ...] | None = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.owner}/{self.repo}@{self.branch}"
+
+    def serves(self, benchmark: str) -> bool:
+        """Whether the source may have results for a benchmark"""
+        return self.benchmarks is None or benchmark in self.benchmarks
+
+
+DEFAULT_SOURCES = (
+    Source("JADE-V-V", "JADE-RAW-RESULTS"),
+    # experimental data, only needed when a benchmark is opened
+    Source(
+        "IAEA-NDS",
+        "open-benchmarks",
+        rules=(MergeRule("expresults", "expresults", "exp", "exp"),),
+        lazy=True,
+    ),
+)
+
+
+def select_folders(
+    status: dict[str, dict[str, dict[str, tuple[str, list[str]]]]],
+    blob_shas: dict[str, str],
+    rules: tuple[MergeRule, ...] | None,
+    benchmarks: Container[str],
+) -> Iterator[tuple[str, str, str, str, list[str], list[str | None]]]:
+    """Apply the merge rules of a source to its results.
+
+    Parameters
+    ----------
+    status : dict[str, dict[str, dict[str, tuple[str, list[str]]]]]
+        nested dictionary of the results of the source
+    blob_shas : dict[str, str]
+        git blob SHA of the files of the source, keyed by path + "/" + file
+    rules : tuple[MergeRule, ...] | None
+        merge rules of the source, None to take all the folders as they are
+    benchmarks : Container[str]
+        benchmarks that have results from the other sources
+
+    Yields
+    ------
+    tuple[str, str, str, str, list[str], list[str | None]]
+        benchmark, library, code, path, files and blob SHAs of each folder to
+        be added. The first rule matching a folder is applied.
+    """
+    for benchmark, libraries in status.items():
+        for library, codes in libraries.items():
+            for code, (path, files) in codes.items():
+                if rules is None:
+                    target = library, code
+                else:
+                    target = None
+                    for rule in rules:
+                        target = rule.match(library, code)
+                        if target is not None:
+                            if not rule.new_benchmarks and benchmark not in benchmarks:
+                                target = None
+                            break
+                    if target is None:
+                        continue
+                shas = [blob_shas.get(f"{path}/{file}") for file in files]
+                yield (benchmark, *target, path, files, shas)
@@ -0,0 +1,178 @@
+"""Persisted table of the metadata of the results.
+
+Each results folder comes with a metadata.json file and the Info tab needs all
+of them, i.e. hundreds of requests. The parsed metadata are stored in a
+Parquet table keyed by the git blob SHA of each metadata.json, so that across
+sessions only the files that were added or modified are requested again. The
+table is read lazily: checking whether it is up to date only reads the SHA
+column.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+
+from jadewa.utils import CachePath
+
+METADATA_FILE = CachePath("metadata", "metadata.parquet")
+# internal columns of the stored table
+SHA_COLUMN = "_sha"
+PATH_COLUMN = "_path"
+
+
+class MetadataStore:
+    def __init__(self, path: os.PathLike | None = METADATA_FILE) -> None:
+        """Store the parsed metadata files in a Parquet table keyed by their
+        git blob SHA.
+
+        Parameters
+        ----------
+        path : os.PathLike | None, optional
+            path of the Parquet file, by default METADATA_FILE. If None, the
+            table is only kept in memory.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._shas: set[str] | None = None
+        self._table: pd.DataFrame | None = None
+
+    def shas(self) -> set[str]:
+        """SHA of the stored metadata files, only this column is read from
+        disk"""
+        with self._lock:
+            if self._shas is None:
+                if self._table is not None:
+                    self._shas = set(self._table[SHA_COLUMN])
+                else:
+                    self._shas = set(self._read([SHA_COLUMN])[SHA_COLUMN])
+            return self._shas
+
+    def missing(self, shas: dict[str, str | None]) -> list[str]:
+        """Get the metadata files that need to be requested.
+
+        Parameters
+        ----------
+        shas : dict[str, str | None]
+            git blob SHA of each metadata file, keyed by its path
+
+        Returns
+        -------
+        list[str]
+            paths of the files that are not stored or whose SHA is not known
+        """
+        stored = self.shas()
+        return [path for path, sha in shas.items() if sha is None or sha not in stored]
+
+    def table(self) -> pd.DataFrame:
+        """Full stored table, read on first access"""
+        with self._lock:
+            if self._table is None:
+                self._table = self._read()
+            return self._table
+
+    def load(self, shas: dict[str, str | None]) -> pd.DataFrame:
+        """Get the stored metadata of a set of files without any request.
+
+        Parameters
+        ----------
+        shas : dict[str, str | None]
+            git blob SHA of each metadata file, keyed by its path
+
+        Returns
+        -------
+        pd.DataFrame
+            one row per stored file indexed by its path, in the order of shas.
+            Files that are not stored are skipped.
+        """
+        table = self.table().drop_duplicates(SHA_COLUMN).set_index(SHA_COLUMN)
+        stored = set(table.index)
+        paths = [path for path, sha in shas.items() if sha in stored]
+        df = table.loc[[shas[path] for path in paths]].drop(columns=PATH_COLUMN)
+        df.index = pd.Index(paths, dtype=object)
+        # columns of files that are not requested
+        return df.dropna(axis=1, how="all")
+
+    def update(self, shas: dict[str, str | None], rows: dict[str, dict]) -> None:
+        """Add the metadata just retrieved and drop the ones of files that are
+        no longer referenced. Files without a known SHA are not stored.
+
+        Parameters
+        ----------
+        shas : dict[str, str | None]
+            git blob SHA of all the current metadata files, keyed by path
+        rows : dict[str, dict]
+            content of the files just retrieved, keyed by path
+        """
+        keyed = [path for path in rows if shas.get(path) is not None]
+        new = pd.DataFrame([rows[path] for path in keyed])
+        new[SHA_COLUMN] = [shas[path] for path in keyed]
+        new[PATH_COLUMN] = keyed
+        current = set(sha for sha in shas.values() if sha is not None)
+        table = self.table()
+        table = table[table[SHA_COLUMN].isin(current - set(new[SHA_COLUMN]))]
+        table = pd.concat([table, new], ignore_index=True)
+        with self._lock:
+            self._table = table
+            self._shas = set(table[SHA_COLUMN])
+        self._write(table)
+
+    def _read(self, columns: list[str] | None = None) -> pd.DataFrame:
+        empty = pd.DataFrame({SHA_COLUMN: [], PATH_COLUMN: []}, dtype=object)
+        if self.path is None or not os.path.exists(self.path):
+            return empty if columns is None else empty[columns]
+        try:
+            return pd.read_parquet(self.path, columns=columns)
+        except (OSError, ValueError, pa.ArrowException):
+            # a corrupted table is rebuilt
+            return empty if columns is None else empty[columns]
+
+    def _write(self, table: pd.DataFrame) -> None:
+        if self.path is None:
+            return
+        try:
+            table = _to_storable(table)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_file = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            table.to_parquet(tmp_file, index=False)
+            os.replace(tmp_file, self.path)
+        except (OSError, ValueError, pa.ArrowException):
+            # the table is only an optimization
+            pass
+
+
+def _to_storable(table: pd.DataFrame) -> pd.DataFrame:
+    """Metadata values are free-form: nested values are stored as json and the
+    columns mixing types that Parquet cannot store are converted to strings"""
+    table = table.copy()
+    for column in table.columns:
+        if table[column].dtype != object:
+            continue
+        values = table[column]
+        if values.map(lambda value: isinstance(value, (dict, list))).any():
+            table[column] = values.map(_to_json)
+            continue
+        try:
+            pa.array(values)
+        except (pa.ArrowException, TypeError, ValueError):
+            table[column] = values.map(
+                lambda value: None if _is_missing(value) else str(value)
+            )
+    return table
+
+
+def _to_json(value) -> str | None:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return None if _is_missing(value) else str(value)
+
+
+def _is_missing(value) -> bool:
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
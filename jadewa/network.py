@@ -0,0 +1,335 @@
+"""Network access to the GitHub repositories hosting the raw results.
+
+A single Transport is shared by Status and Processor. It keeps pools of
+keep-alive connections so that the TCP and TLS handshakes are paid once per
+host instead of once per file. All its requests go through a RequestScheduler
+that attaches the credentials, keeps track of the GitHub rate limit and, when
+the limit is close to be exhausted, queues the requests instead of letting
+them fail. Interactive requests (e.g. the .csv files of a plot) are served
+before background ones (e.g. the metadata crawling), and they fail with a
+RateLimitError rather than waiting for a reset too far in the future. The
+shared Transport is obtained with get_transport().
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+from jadewa.utils import GITHUB_HEADERS
+
+# request priorities, lower is served first
+INTERACTIVE = 0
+BACKGROUND = 1
+
+GITHUB_HOSTS = frozenset(
+    ["github.com", "api.github.com", "raw.githubusercontent.com"]
+)
+DEFAULT_TIMEOUT = 10
+DEFAULT_POOL_SIZE = 32
+
+
+class RateLimitError(requests.RequestException):
+    """Exception raised when an interactive request cannot be sent before the
+    rate limit resets."""
+
+    def __init__(self, host: str, reset: float) -> None:
+        self.host = host
+        self.reset = reset
+        super().__init__(
+            f"The rate limit of {host} is exhausted, it resets in "
+            f"{max(0, reset - time.time()):.0f} s"
+        )
+
+
+class RequestScheduler:
+    def __init__(
+        self,
+        headers: dict[str, str] = None,
+        auth_hosts: frozenset[str] = GITHUB_HOSTS,
+        max_concurrency: int = 16,
+        reserve: int = 50,
+        max_wait: float = 60,
+        max_retries: int = 2,
+        session: requests.Session = None,
+    ) -> None:
+        """Send authenticated requests respecting the GitHub rate limit.
+
+        Parameters
+        ----------
+        headers : dict[str, str], optional
+            headers with the credentials, by default GITHUB_HEADERS
+        auth_hosts : frozenset[str], optional
+            hosts to which the credentials are sent, by default GITHUB_HOSTS
+        max_concurrency : int, optional
+            maximum number of requests in flight, by default 16
+        reserve : int, optional
+            number of requests of the rate limit that are reserved to
+            interactive requests, by default 50
+        max_wait : float, optional
+            maximum time in seconds an interactive request is held waiting
+            for the rate limit to reset, by default 60, it fails right away if
+            the reset is further away. Background requests wait for the reset
+            max_wait at a time.
+        max_retries : int, optional
+            number of times a request rejected with a Retry-After header is
+            retried, by default 2
+        session : requests.Session, optional
+            session used to send the requests, by default a new one. A
+            Transport provides one with pooled connections.
+
+        Attributes
+        ----------
+        limits : dict[str, tuple[int, float]]
+            remaining requests and reset time (epoch seconds) of the rate
+            limit of each host. The remaining requests are counted down as
+            the requests are sent and synchronized with the responses.
+        """
+        if headers is None:
+            headers = GITHUB_HEADERS
+        if session is None:
+            session = requests.Session()
+        self.headers = headers
+        self.auth_hosts = auth_hosts
+        self.max_concurrency = max_concurrency
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.session = session
+        self.limits = {}
+        self._active = 0
+        self._waiting = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+
+    def get(
+        self, url: str, priority: int = INTERACTIVE, **kwargs
+    ) -> requests.Response:
+        """Send a GET request. It may be delayed until the rate limit resets,
+        interactive requests fail instead if the reset is after max_wait.
+
+        Parameters
+        ----------
+        url : str
+            url to be requested
+        priority : int, optional
+            INTERACTIVE or BACKGROUND, by default INTERACTIVE
+        **kwargs
+            passed to requests.Session.get
+
+        Returns
+        -------
+        requests.Response
+            response of the server
+
+        Raises
+        ------
+        RateLimitError
+            if the request is interactive and the rate limit resets after
+            max_wait
+        """
+        host = urlparse(url).hostname
+        headers = dict(kwargs.pop("headers", None) or {})
+        if host in self.auth_hosts:
+            headers = {**self.headers, **headers}
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+
+        for attempt in range(self.max_retries + 1):
+            self._wait_rate_limit(host, priority)
+            while not self._acquire(host, priority):
+                # the requests sent in the meantime used up the limit
+                self._wait_rate_limit(host, priority)
+            try:
+                r = self.session.get(url, headers=headers, **kwargs)
+            finally:
+                self._release()
+            self._update_rate_limit(host, r)
+            if attempt < self.max_retries and self._is_rate_limited(host, r):
+                continue
+            return r
+        return r
+
+    def _acquire(self, host: str, priority: int) -> bool:
+        """Take a slot for a request, counting it in the rate limit. False if
+        the rate limit has to be waited for first."""
+        with self._condition:
+            ticket = (priority, next(self._counter))
+            heapq.heappush(self._waiting, ticket)
+            while (
+                self._active >= self.max_concurrency or self._waiting[0] != ticket
+            ):
+                self._condition.wait()
+            heapq.heappop(self._waiting)
+            # the next in line may be able to start as well
+            self._condition.notify_all()
+            if self._wait_time(host, priority) > 0:
+                return False
+            self._active += 1
+            if host in self.limits:
+                remaining, reset = self.limits[host]
+                self.limits[host] = (remaining - 1, reset)
+            return True
+
+    def _release(self) -> None:
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def _wait_time(self, host: str, priority: int) -> float:
+        with self._condition:
+            try:
+                remaining, reset = self.limits[host]
+            except KeyError:
+                return 0
+        # background requests leave a reserve to the interactive ones
+        threshold = 0 if priority == INTERACTIVE else self.reserve
+        if remaining > threshold:
+            return 0
+        return max(0.0, reset - time.time())
+
+    def _wait_rate_limit(self, host: str, priority: int) -> None:
+        wait = self._wait_time(host, priority)
+        if wait > self.max_wait and priority == INTERACTIVE:
+            raise RateLimitError(host, time.time() + wait)
+        wait = min(wait, self.max_wait)
+        if wait > 0:
+            time.sleep(wait)
+        with self._condition:
+            known = self.limits.get(host)
+            # the count is kept until its window is over, the caller waits
+            # again if the reset is still to come
+            if known is not None and time.time() >= known[1]:
+                del self.limits[host]
+
+    def _update_rate_limit(self, host: str, r: requests.Response) -> None:
+        try:
+            remaining = int(r.headers["X-RateLimit-Remaining"])
+            reset = float(r.headers["X-RateLimit-Reset"])
+        except (KeyError, ValueError):
+            return
+        with self._condition:
+            known = self.limits.get(host)
+            if known is not None and known[1] == reset:
+                # the responses of the requests in flight report higher
+                # counts than the one kept locally
+                remaining = min(remaining, known[0])
+            self.limits[host] = (remaining, reset)
+
+    def _is_rate_limited(self, host: str, r: requests.Response) -> bool:
+        """Check if the request was rejected by a limit that asks to retry
+        later. If so, the time to wait before retrying is registered. A
+        request rejected because no request is left is not retried, the
+        following ones wait for the reset (or fail if interactive)."""
+        if r.status_code not in (403, 429):
+            return False
+        retry_after = r.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                reset = time.time() + float(retry_after)
+            except ValueError:
+                try:
+                    reset = parsedate_to_datetime(retry_after).timestamp()
+                except (TypeError, ValueError):
+                    reset = time.time()
+            with self._condition:
+                self.limits[host] = (0, reset)
+            return True
+        return False
+
+
+class Transport:
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float | tuple[float, float] = DEFAULT_TIMEOUT,
+        scheduler: RequestScheduler = None,
+    ) -> None:
+        """HTTP transport shared by all the components of the application.
+
+        Parameters
+        ----------
+        pool_size : int, optional
+            number of keep-alive connections kept open for each host, by
+            default DEFAULT_POOL_SIZE. It should not be smaller than the
+            number of concurrent requests.
+        timeout : float | tuple[float, float], optional
+            default timeout in seconds of the requests (or connect and read
+            timeouts), by default DEFAULT_TIMEOUT
+        scheduler : RequestScheduler, optional
+            scheduler of the requests. By default a new one is created, using
+            the pooled session of the transport and allowing as many requests
+            in flight as the pool size.
+
+        Attributes
+        ----------
+        session : requests.Session
+            session with the pooled connections
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=len(GITHUB_HOSTS) + 1, pool_maxsize=pool_size
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # results are plain text, they compress very well
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+        self.session.headers["Connection"] = "keep-alive"
+        if scheduler is None:
+            scheduler = RequestScheduler(
+                max_concurrency=pool_size, session=self.session
+            )
+        self.scheduler = scheduler
+
+    def get(
+        self,
+        url: str,
+        priority: int = INTERACTIVE,
+        timeout: float | tuple[float, float] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """Send a GET request through the scheduler.
+
+        Parameters
+        ----------
+        url : str
+            url to be requested
+        priority : int, optional
+            INTERACTIVE or BACKGROUND, by default INTERACTIVE
+        timeout : float | tuple[float, float], optional
+            timeout of the request, by default the one of the transport
+        **kwargs
+            passed to requests.Session.get
+
+        Returns
+        -------
+        requests.Response
+            response of the server
+        """
+        if timeout is None:
+            timeout = self.timeout
+        return self.scheduler.get(url, priority=priority, timeout=timeout, **kwargs)
+
+    def close(self) -> None:
+        """Close all the pooled connections"""
+        self.session.close()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """Get the Transport shared by the whole application"""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = Transport()
+        return _transport
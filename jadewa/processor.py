@@ -1,11 +1,16 @@
 """Module to process the data and get the plot"""
 
-import json
+import hashlib
 import logging
 import os
 import re
+import threading
+from bisect import insort
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from copy import deepcopy
-from importlib.resources import as_file, files, path
+from functools import partial
+from importlib.resources import files, path
 from io import StringIO
 from urllib.error import HTTPError
 
@@ -15,145 +20,754 @@ import requests
 from plotly.graph_objects import Figure
 
 import jadewa.resources as res
+from jadewa.cache import CSVCache, FigureCache
+from jadewa.configs import BenchmarkConfigs
+from jadewa.dataset import BenchmarkDataset, DatasetStore
 from jadewa.errors import JsonSettingsError
+from jadewa.export import LongFormatWriter
+from jadewa.network import BACKGROUND, INTERACTIVE, RateLimitError
 from jadewa.plotter import get_figure
-from jadewa.status import Status
+from jadewa.schema import Coercion, TallySchema
+from jadewa.status import Status, StatusDelta
+from jadewa.storage import StorageBackend
 from jadewa.utils import (
     PROTECTED_STRINGS,
     sorting_func,
-    string_ints_converter,
 )
 
 UNIT_PATTERN = re.compile(r"\[.*\]")
+LOGGER = logging.getLogger(__name__)
+DEFAULT_MAX_WORKERS = 8
+# benchmarks prefetched at the same time
+PREFETCH_WORKERS = 2
+
+
+def get_ratio(data: pd.DataFrame, ref_label: str) -> pd.DataFrame:
+    """Normalize the values of all the libraries to the reference one.
+
+    Each point is aligned to the reference point with the same x values (all
+    the columns but Value, Error and label), repeated x values are matched in
+    order. Numbers are matched regardless of their representation, e.g. "1"
+    and 1.0. Relative errors are propagated in quadrature.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        values of all the libraries in long format, identified by the label
+        column
+    ref_label : str
+        label of the reference library-code
+
+    Returns
+    -------
+    pd.DataFrame
+        ratios of the points that have a reference value. The number of
+        points of each label without a reference value is stored in
+        attrs["unmatched"].
+
+    Raises
+    ------
+    NotImplementedError
+        if there is no reference data
+    """
+    is_ref = (data["label"] == ref_label).to_numpy()
+    if not is_ref.any():
+        raise NotImplementedError(
+            f"Reference data for {ref_label} not found. Please, select another library as a reference."
+        )
+    x_columns = [
+        column for column in data.columns if column not in ("Value", "Error", "label")
+    ]
+    keys = pd.DataFrame(
+        {f"key{i}": _match_key(data[column]) for i, column in enumerate(x_columns)},
+        index=data.index,
+    )
+    keys["label"] = data["label"]
+    keys["occurrence"] = keys.groupby(list(keys.columns), dropna=False).cumcount()
+    key_columns = [column for column in keys.columns if column != "label"]
+
+    reference = keys[is_ref].drop(columns="label")
+    reference["position"] = np.flatnonzero(is_ref)
+    position = keys.merge(reference, on=key_columns, how="left")["position"]
+    matched = position.notna().to_numpy()
+
+    ref_position = position[matched].to_numpy(dtype=np.int64)
+    values = data["Value"].to_numpy(dtype=float)
+    errors = data["Error"].to_numpy(dtype=float)
+    newdf = data[matched].reset_index(drop=True)
+    newdf["Value"] = values[matched] / values[ref_position]
+    # relative error propagation for ratio
+    newdf["Error"] = np.sqrt(errors[matched] ** 2 + errors[ref_position] ** 2)
+
+    unmatched = data["label"][~matched].value_counts(sort=False)
+    newdf.attrs["unmatched"] = {
+        label: int(count) for label, count in unmatched.items()
+    }
+    return newdf
+
+
+def _match_key(values: pd.Series) -> pd.Series:
+    """Representation of x values used to match them across libraries"""
+    numbers = pd.to_numeric(values, errors="coerce")
+    numbers = numbers.astype(float).astype(str)
+    return values.astype(str).where(numbers == "nan", numbers)
+
+
+class Prefetch:
+    def __init__(
+        self, benchmark: str, future: Future, cancelled: threading.Event
+    ) -> None:
+        """Handle of a background prefetch, see Processor.prefetch.
+
+        Parameters
+        ----------
+        benchmark : str
+            benchmark being prefetched
+        future : Future
+            future of the prefetch, its result is the number of files fetched
+        cancelled : threading.Event
+            set to stop the prefetch
+        """
+        self.benchmark = benchmark
+        self._future = future
+        self._cancelled = cancelled
+
+    def cancel(self) -> None:
+        """Stop the prefetch, the batch of files being fetched is completed"""
+        self._cancelled.set()
+        self._future.cancel()
+
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def result(self, timeout: float = None) -> int:
+        """Wait for the prefetch to stop and get the number of files fetched"""
+        return self._future.result(timeout)
 
 
 class Processor:
-    def __init__(self, status: Status) -> None:
+    def __init__(
+        self,
+        status: Status,
+        cache: CSVCache = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        backend: StorageBackend = None,
+        datasets: DatasetStore = None,
+        figures: FigureCache = None,
+    ) -> None:
+        """Process the raw results to produce the plots.
+
+        Parameters
+        ----------
+        status : Status
+            status object describing the available raw results
+        cache : CSVCache, optional
+            cache for the raw .csv results. If None, a default one is created.
+        max_workers : int, optional
+            maximum number of .csv files fetched concurrently, by default
+            DEFAULT_MAX_WORKERS.
+        backend : StorageBackend, optional
+            storage from which the .csv files are read, by default the one of
+            the status.
+        datasets : DatasetStore, optional
+            compiled datasets of the benchmarks. If given, the first time a
+            benchmark is plotted all its .csv files are compiled in the
+            background into a columnar dataset, which is then read instead of
+            the .csv files. By default None.
+        figures : FigureCache, optional
+            cache of the figures already built. If None, a default one is
+            created.
+        """
         self.status = status
-        # Load the available tallies plot parameters
-        resources = files(res)
-        self.params = {}
-        for file in os.listdir(resources):
-            if file.endswith(".json"):
-                name = file[:-5]
-                with as_file(resources.joinpath(file)) as file:
-                    with open(file, "r", encoding="utf-8") as infile:
-                        benchmark_params = json.load(infile)
-                        self.params[name] = benchmark_params
+        if cache is None:
+            cache = CSVCache()
+        self.cache = cache
+        self.max_workers = max_workers
+        if backend is None:
+            backend = status.backend
+        self.backend = backend
+        self.datasets = datasets
+        if figures is None:
+            figures = FigureCache()
+        self.figures = figures
+        # data version -> compilation of the dataset
+        self._compilations: dict[str, Future] = {}
+        self._compiler = None
+        # (benchmark, tally) -> learned dtypes of its .csv files
+        self._schemas: dict[tuple[str, str], TallySchema] = {}
+        self._schemas_lock = threading.Lock()
+        self._prefetcher = None
+        # benchmark -> generic tally name -> config
+        self._generic_templates: dict[str, dict[str, dict]] = {}
+        # benchmark -> .csv file name -> number of folders that contain it
+        self._generic_csvs: dict[str, dict[str, int]] = {}
+        # benchmark -> .csv file name -> tallies generated from it
+        self._generated: dict[str, dict[str, list[str]]] = {}
+        # benchmark -> revision of the status of its generated tallies
+        self._generic_revision: dict[str, int] = {}
+        # benchmark -> counter of the changes to its generated tallies
+        self._params_versions: dict[str, int] = {}
+        # benchmark -> (params version, inverted index of the results)
+        self._result_index: dict[str, tuple[int, tuple]] = {}
+        # benchmark -> (revision of the status, versions of its folders, data
+        # version)
+        self._data_versions: dict[str, tuple[int, tuple, str]] = {}
+        self._params_lock = threading.RLock()
+        # The tallies plot parameters are loaded when a benchmark is first
+        # accessed
+        self.params = BenchmarkConfigs(files(res), on_load=self._setup_config)
+
+        # (benchmark, tally) -> (library, code) -> path, .csv files of the tally
+        self._csv_index: dict[
+            tuple[str, str], dict[tuple[str, str], tuple[str, list[str]]]
+        ] = {}
+        # (benchmark, library, code) -> version and path of the folder when
+        # indexed
+        self._indexed_folders: dict[tuple[str, str, str], tuple[int, str]] = {}
+        # benchmark -> revision of the status when indexed
+        self._indexed_revision: dict[str, int] = {}
+        self._index_lock = threading.Lock()
+
+    def _setup_config(self, benchmark: str, config: dict) -> None:
+        """Complete the configuration of a benchmark when it is loaded"""
+        try:
+            generic = config["general"]["generic_tallies"]
+        except KeyError:
+            generic = False
+        if not generic:
+            return
         # if the tallies are generic, at runtime, new tally configuration must
-        # be created
+        # be created from the generic ones for each .csv file available
         # check for XX-... general tallies
         # the XX pattern will tell what to ignore and what is the actual tally
-        available_benchmarks = self.get_available_benchmarks()
-        for benchmark in available_benchmarks:
-            try:
-                generic = self.params[benchmark]["general"]["generic_tallies"]
-            except KeyError:
-                generic = False
-
-            if generic:
-                # first of all check all possible tallies available across
-                # all libraries and codes
-                csv_names = []
-                for lib, values in self.status.status[benchmark].items():
-                    for code, available_csv in values.items():
-                        csv_names.extend(available_csv[1])
-                csv_names = list(set(csv_names))
-                csv_names.sort(key=sorting_func)
-
-                generic_tally_names = list(self.params[benchmark].keys())
-                for csv in csv_names:
-                    # split only on the first underscore to separate the benchmark
-                    # name from the rest
-                    pieces = csv.split("_", 1)
-
-                    # now separate the case name from the tally name
-                    pieces[-1] = pieces[-1].split(" ", 1)
-                    # generic tallies should only be used for benchmarks with cases, so
-                    # pieces[0] = benchmark, pieces[1][0] = case name,
-                    # pieces[1][1] = tally name
-                    pieces = [pieces[0], pieces[-1][0], pieces[-1][1]]
-                    # A new ad hoc config tally must be created from the generic
-                    for gtally_name in generic_tally_names:
-                        # Add the correct general tally
-                        if gtally_name != "general":
-                            result = self.params[benchmark][gtally_name]["result"]
-                            match = False
-                            # result can either be a list or a string
-                            if isinstance(result, list):
-                                # Check if any item in the result list matches the current csv
-                                match = pieces[-1][:-4] in result
-                            else:
-                                match = result == pieces[-1][:-4]
-                            if match:
-                                gtally_splits = gtally_name.count("{}")
-                                # if there are protected substrings, replace them temporarily
-                                for orig, temp in PROTECTED_STRINGS.items():
-                                    pieces[1] = pieces[1].replace(orig, temp)
-                                    gtally_name = gtally_name.replace(orig, temp)
-                                split_name = pieces[1].rsplit("-", gtally_splits - 1)
-                                total_splits = gtally_name.count("-")
-                                # Restore original protected substrings
-                                for orig, temp in PROTECTED_STRINGS.items():
-                                    gtally_name = gtally_name.replace(temp, orig)
-                                    for i, split in enumerate(split_name):
-                                        split_name[i] = split_name[i].replace(
-                                            temp, orig
-                                        )
-                                # Substitute empty spaces in gtally_name ("{}")
-                                # with the corresponding specific case pieces
-                                completed_gtally_name = gtally_name.format(*split_name)
-                                if completed_gtally_name not in self.params[benchmark]:
-                                    self.params[benchmark][completed_gtally_name] = (
-                                        deepcopy(self.params[benchmark][gtally_name])
-                                    )
-                                # Add the "csv" key only for benchmarks with general tallies,
-                                # others retrieve csv names from self.params[benchmark][tally]["result"]
-                                if (
-                                    "csv"
-                                    not in self.params[benchmark][completed_gtally_name]
-                                ):
-                                    self.params[benchmark][completed_gtally_name][
-                                        "csv"
-                                    ] = []
-                                self.params[benchmark][completed_gtally_name][
-                                    "csv"
-                                ].append(csv)
-                                # Add "tally_options_divisions" for general tallies with
-                                # "-" in sub-cases; used when "{}" count in gtally_name
-                                # doesn't match "-" count in pieces[1].
-                                self.params[benchmark][gtally_name.format(*split_name)][
-                                    "tally_options_divisions"
-                                ] = gtally_splits + total_splits - 1
-
-                for key in generic_tally_names:
-                    if key != "general":
-                        self.params[benchmark].pop(key)
+        with self._params_lock:
+            self._generic_templates[benchmark] = {
+                key: config.pop(key) for key in list(config) if key != "general"
+            }
+            # all possible tallies available across all libraries and codes
+            delta = self.status.get_delta(0, benchmark)
+            self._generic_revision[benchmark] = delta.revision
+            self._apply_generic_delta(delta.added, delta.removed)
+
+    def _expand_generic(self, benchmark: str, csv: str) -> list[str]:
+        """Create or extend the tally configs generated by a .csv file from
+        the generic tallies of a benchmark, returns the names of the tallies
+        that were changed"""
+        generated = []
+        # split only on the first underscore to separate the benchmark
+        # name from the rest
+        pieces = csv.split("_", 1)
+
+        # now separate the case name from the tally name
+        pieces[-1] = pieces[-1].split(" ", 1)
+        # generic tallies should only be used for benchmarks with cases, so
+        # pieces[0] = benchmark, pieces[1][0] = case name,
+        # pieces[1][1] = tally name
+        pieces = [pieces[0], pieces[-1][0], pieces[-1][1]]
+        # A new ad hoc config tally must be created from the generic
+        for gtally_name, template in self._generic_templates[benchmark].items():
+            result = template["result"]
+            match = False
+            # result can either be a list or a string
+            if isinstance(result, list):
+                # Check if any item in the result list matches the current csv
+                match = pieces[-1][:-4] in result
+            else:
+                match = result == pieces[-1][:-4]
+            if not match:
+                continue
+            gtally_splits = gtally_name.count("{}")
+            # if there are protected substrings, replace them temporarily
+            for orig, temp in PROTECTED_STRINGS.items():
+                pieces[1] = pieces[1].replace(orig, temp)
+                gtally_name = gtally_name.replace(orig, temp)
+            split_name = pieces[1].rsplit("-", gtally_splits - 1)
+            total_splits = gtally_name.count("-")
+            # Restore original protected substrings
+            for orig, temp in PROTECTED_STRINGS.items():
+                gtally_name = gtally_name.replace(temp, orig)
+                for i, split in enumerate(split_name):
+                    split_name[i] = split_name[i].replace(temp, orig)
+            # Substitute empty spaces in gtally_name ("{}")
+            # with the corresponding specific case pieces
+            completed_gtally_name = gtally_name.format(*split_name)
+            if completed_gtally_name not in self.params[benchmark]:
+                self.params[benchmark][completed_gtally_name] = deepcopy(template)
+            config = self.params[benchmark][completed_gtally_name]
+            # Add the "csv" key only for benchmarks with general tallies,
+            # others retrieve csv names from self.params[benchmark][tally]["result"]
+            if "csv" not in config:
+                config["csv"] = []
+            # kept in the order of the files
+            insort(config["csv"], csv, key=sorting_func)
+            # Add "tally_options_divisions" for general tallies with
+            # "-" in sub-cases; used when "{}" count in gtally_name
+            # doesn't match "-" count in pieces[1].
+            config["tally_options_divisions"] = gtally_splits + total_splits - 1
+            generated.append(completed_gtally_name)
+        return generated
+
+    def _apply_generic_delta(
+        self, added: dict[str, list[str]], removed: dict[str, list[str]]
+    ) -> set[tuple[str, str]]:
+        """Update the tally configs generated from the generic tallies with the
+        .csv files added and removed. Only the tallies generated by those
+        files are touched, returns the (benchmark, tally) couples changed."""
+        changed = set()
+        with self._params_lock:
+            for benchmark in {*added, *removed}:
+                if benchmark not in self._generic_templates:
+                    continue
+                counts = self._generic_csvs.setdefault(benchmark, {})
+                generated = self._generated.setdefault(benchmark, {})
+                # number of folders containing each file before the delta
+                before = {}
+                for csv in added.get(benchmark, []):
+                    before.setdefault(csv, counts.get(csv, 0))
+                    counts[csv] = counts.get(csv, 0) + 1
+                for csv in removed.get(benchmark, []):
+                    before.setdefault(csv, counts.get(csv, 0))
+                    counts[csv] = counts.get(csv, 0) - 1
+                for csv in sorted(before, key=sorting_func):
+                    if counts[csv] <= 0:
+                        del counts[csv]
+                        if before[csv] <= 0:
+                            continue
+                        for tally in generated.pop(csv, []):
+                            config = self.params[benchmark].get(tally)
+                            if config is not None and csv in config["csv"]:
+                                config["csv"].remove(csv)
+                                if not config["csv"]:
+                                    del self.params[benchmark][tally]
+                            changed.add((benchmark, tally))
+                    elif before[csv] <= 0:
+                        tallies = self._expand_generic(benchmark, csv)
+                        generated[csv] = tallies
+                        changed.update((benchmark, tally) for tally in tallies)
+            for benchmark in {benchmark for benchmark, _ in changed}:
+                self._params_versions[benchmark] = (
+                    self._params_versions.get(benchmark, 0) + 1
+                )
+        return changed
+
+    def refresh(self) -> StatusDelta:
+        """Apply the changes of the status since the last refresh. The tally
+        configs generated from the generic tallies of the loaded benchmarks
+        are updated only for the .csv files added or removed, the cost is
+        proportional to the changed folders. It is done automatically before
+        resolving the files of a tally.
+
+        Returns
+        -------
+        StatusDelta
+            changes applied, only for the loaded generic benchmarks
+        """
+        revision = self.status.revision
+        added: dict[str, list[str]] = {}
+        removed: dict[str, list[str]] = {}
+        changed = set()
+        with self._params_lock:
+            for benchmark, since in list(self._generic_revision.items()):
+                if since == revision:
+                    continue
+                delta = self.status.get_delta(since, benchmark)
+                self._generic_revision[benchmark] = delta.revision
+                changed.update(self._apply_generic_delta(delta.added, delta.removed))
+                added.update(delta.added)
+                removed.update(delta.removed)
+        for benchmark, tally in changed:
+            self._index_tally(benchmark, tally)
+        return StatusDelta(revision, added, removed)
+
+    def _locate(self, path: str, csv: str) -> tuple[str, str, str | None]:
+        """Get location, cache key and blob SHA of a .csv file"""
+        location = self.backend.join(path, csv)
+        sha = self.status.get_blob_sha(path, csv)
+        if sha is not None:
+            # content-addressed, valid across sessions
+            return location, sha, sha
+        return location, self.backend.cache_key(location), None
 
     def _get_csv(
         self,
         path: str | os.PathLike,
         csv: str,
     ) -> pd.DataFrame:
-        # logic to determine the correct path (local or github)
-        if "https" in path:
-            path = path + r"/{}"
-            formatted_path = (
-                path.format(csv)
-                .replace(" ", "%20")
-                .replace("[", "%5B")
-                .replace("]", "%5D")
-            )
-        else:
-            path = path + os.sep + "{}"
-            formatted_path = path.format(csv)
-
         try:
-            df = pd.read_csv(formatted_path)
+            location, key, sha = self._locate(path, csv)
+            df = self.cache.get_or_load(
+                key, lambda: self.backend.read(location), sha=sha
+            )
         except Exception:
             df = None
         return df
 
+    def _get_schema(self, benchmark: str, tally: str) -> TallySchema:
+        """Get the schema of the .csv files of a tally, shared by all the
+        plots of the tally"""
+        with self._schemas_lock:
+            return self._schemas.setdefault((benchmark, tally), TallySchema())
+
+    def _tally_files(
+        self, benchmark: str
+    ) -> list[tuple[str | None, list[tuple[str, str]]]]:
+        """Group the .csv files of a benchmark by the tally that reads them,
+        files not read by any tally are grouped under None"""
+        groups: dict[str | None, list[tuple[str, str]]] = {}
+        available = {
+            (path, csv)
+            for values in self.status.status[benchmark].values()
+            for path, csvs in values.values()
+            for csv in csvs
+        }
+        seen = set()
+        for tally in self.params.get(benchmark, {}):
+            if tally == "general":
+                continue
+            for path, csvs in self._resolve_csvs(benchmark, tally).values():
+                for csv in csvs:
+                    if (path, csv) in available and (path, csv) not in seen:
+                        seen.add((path, csv))
+                        groups.setdefault(tally, []).append((path, csv))
+        for values in self.status.status[benchmark].values():
+            for path, csvs in values.values():
+                for csv in csvs:
+                    if (path, csv) not in seen:
+                        seen.add((path, csv))
+                        groups.setdefault(None, []).append((path, csv))
+        return list(groups.items())
+
+    def _fetch_csvs(
+        self,
+        files: list[tuple[str, str]],
+        priority: int = INTERACTIVE,
+        schema: TallySchema = None,
+        coercion: Coercion = None,
+    ) -> dict[tuple[str, str], pd.DataFrame | None]:
+        """Read a group of .csv files. The files that are not cached are read
+        in a single batch from the backend, then they are parsed together.
+
+        Parameters
+        ----------
+        files : list[tuple[str, str]]
+            (path, csv name) couples to be read
+        priority : int, optional
+            priority of the requests, by default INTERACTIVE
+        schema : TallySchema, optional
+            schema of the tally the files belong to, used to parse them with
+            explicit dtypes. By default the types of each file are inferred.
+        coercion : Coercion, optional
+            preparation of the DataFrames applied when they are parsed with
+            the schema, by default None
+
+        Returns
+        -------
+        dict[tuple[str, str], pd.DataFrame | None]
+            DataFrame of each file, None if it could not be read
+        """
+        files = list(dict.fromkeys(files))
+        located = {}
+        for file in files:
+            try:
+                located[file] = self._locate(*file)
+            except Exception:
+                # e.g. a local file that does not exist
+                pass
+        locations = {key: location for location, key, _ in located.values()}
+
+        def loader(keys: list[str]) -> dict[str, bytes | None]:
+            contents = self.backend.read_many(
+                [locations[key] for key in keys],
+                max_workers=self.max_workers,
+                priority=priority,
+            )
+            return {key: contents.get(locations[key]) for key in keys}
+
+        parser = None
+        if schema is not None:
+            parser = partial(schema.parse_many, coercion=coercion)
+        try:
+            frames = self.cache.get_many(
+                {key: sha for _, key, sha in located.values()},
+                loader,
+                parser=parser,
+                variant=coercion,
+            )
+        except RateLimitError:
+            # the plot cannot be built until the limit resets
+            raise
+        except Exception:
+            frames = {}
+        return {
+            file: frames.get(located[file][1]) if file in located else None
+            for file in files
+        }
+
+    def prefetch(self, benchmark: str, batch_size: int = None) -> Prefetch:
+        """Start fetching and parsing all the .csv files of a benchmark in the
+        background, e.g. as soon as it is selected, so that the plots find
+        them in the cache. The files are fetched in batches with background
+        priority and the prefetch can be cancelled between batches.
+
+        Parameters
+        ----------
+        benchmark : str
+            benchmark name
+        batch_size : int, optional
+            number of files fetched at a time, by default twice max_workers
+
+        Returns
+        -------
+        Prefetch
+            handle of the prefetch
+        """
+        if batch_size is None:
+            batch_size = 2 * self.max_workers
+        batch_size = max(batch_size, 1)
+        cancelled = threading.Event()
+
+        def run() -> int:
+            self.status.require(benchmark)
+            # a compiled dataset makes the csv files unnecessary
+            if self.datasets is not None:
+                version = self.get_data_version(benchmark)
+                if self.datasets.get(benchmark, version) is not None:
+                    return 0
+            fetched = 0
+            for tally, files in self._tally_files(benchmark):
+                schema = coercion = None
+                if tally is not None:
+                    # prepared as the plots need them
+                    schema = self._get_schema(benchmark, tally)
+                    coercion = self._get_coercion(benchmark, tally)
+                for start in range(0, len(files), batch_size):
+                    if cancelled.is_set():
+                        return fetched
+                    batch = files[start : start + batch_size]
+                    self._fetch_csvs(
+                        batch, priority=BACKGROUND, schema=schema, coercion=coercion
+                    )
+                    fetched += len(batch)
+            self._get_dataset(benchmark)
+            return fetched
+
+        if self._prefetcher is None:
+            self._prefetcher = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS)
+        return Prefetch(benchmark, self._prefetcher.submit(run), cancelled)
+
+    def get_data_version(self, benchmark: str) -> str:
+        """Get a token identifying the current content of the raw results of a
+        benchmark. Files are identified by their blob SHA or, if it is not
+        known, by their cache key in the backend. The version is computed
+        again only when the folders of the benchmark are added or replaced in
+        the status, files changed in place are seen once their folder is
+        scanned again.
+
+        Parameters
+        ----------
+        benchmark : str
+            benchmark name
+
+        Returns
+        -------
+        str
+            data version of the benchmark
+        """
+        self.status.require(benchmark)
+        revision = self.status.revision
+        cached = self._data_versions.get(benchmark)
+        if cached is not None and cached[0] == revision:
+            return cached[2]
+        view = self.status.status[benchmark]
+        folders = tuple(
+            (lib, code, self.status.get_folder_version(benchmark, lib, code))
+            for lib in view
+            for code in view[lib]
+        )
+        if cached is not None and cached[1] == folders:
+            self._data_versions[benchmark] = (revision, folders, cached[2])
+            return cached[2]
+        digest = hashlib.sha1(benchmark.encode("utf-8"))
+        for lib, values in view.items():
+            for code, (path, csvs) in values.items():
+                shas = self.status.get_blob_shas(benchmark, lib, code)
+                for csv, sha in zip(csvs, shas):
+                    if sha is None:
+                        try:
+                            sha = self.backend.cache_key(self.backend.join(path, csv))
+                        except OSError:
+                            sha = ""
+                    digest.update(f"{lib}\0{code}\0{csv}\0{sha}\n".encode("utf-8"))
+        version = digest.hexdigest()
+        self._data_versions[benchmark] = (revision, folders, version)
+        return version
+
+    def compile_dataset(self, benchmark: str, version: str = None) -> BenchmarkDataset:
+        """Compile all the .csv files of a benchmark into a columnar dataset.
+
+        Parameters
+        ----------
+        benchmark : str
+            benchmark name
+        version : str, optional
+            data version of the benchmark, by default the current one
+
+        Returns
+        -------
+        BenchmarkDataset
+            the compiled dataset
+
+        Raises
+        ------
+        ValueError
+            if some .csv files could not be read, an incomplete dataset is
+            never stored
+        """
+        if self.datasets is None:
+            raise ValueError("the processor has no dataset store")
+        if version is None:
+            version = self.get_data_version(benchmark)
+        files = [
+            (lib, code, path, csv)
+            for lib, values in self.status.status[benchmark].items()
+            for code, (path, csvs) in values.items()
+            for csv in csvs
+        ]
+        fetched = {}
+        for tally, tally_files in self._tally_files(benchmark):
+            schema = None if tally is None else self._get_schema(benchmark, tally)
+            fetched.update(self._fetch_csvs(tally_files, schema=schema))
+        missing = [
+            f"{path}/{csv}" for _, _, path, csv in files if fetched[path, csv] is None
+        ]
+        if missing:
+            raise ValueError(
+                f"Cannot compile the dataset of {benchmark}, "
+                f"{len(missing)} files could not be read: {', '.join(missing[:5])}"
+            )
+        frames = {
+            (lib, code, csv): fetched[path, csv] for lib, code, path, csv in files
+        }
+        return self.datasets.build(benchmark, version, frames)
+
+    def _get_dataset(self, benchmark: str) -> BenchmarkDataset | None:
+        """Get the dataset of a benchmark, scheduling its compilation in the
+        background if it is not available for the current data version"""
+        if self.datasets is None:
+            return None
+        version = self.get_data_version(benchmark)
+        dataset = self.datasets.get(benchmark, version)
+        if dataset is None and version not in self._compilations:
+            if self._compiler is None:
+                self._compiler = ThreadPoolExecutor(max_workers=1)
+            future = self._compiler.submit(self.compile_dataset, benchmark, version)
+            self._compilations[version] = future
+
+            def forget(future: Future) -> None:
+                # a failed compilation is tried again by the next plot, the
+                # .csv files are read meanwhile
+                if future.exception() is not None:
+                    self._compilations.pop(version, None)
+
+            future.add_done_callback(forget)
+        return dataset
+
+    def _update_csv_index(self, benchmark: str) -> None:
+        """Bring the tally to .csv files index of a benchmark up to date with
+        the status. Only the folders added or replaced since the last update
+        are indexed again."""
+        revision = self.status.revision
+        with self._index_lock:
+            if self._indexed_revision.get(benchmark) == revision:
+                return
+            view = self.status.status[benchmark]
+            folders = set()
+            for lib in view:
+                for code in view[lib]:
+                    folders.add((benchmark, lib, code))
+                    version = self.status.get_folder_version(benchmark, lib, code)
+                    indexed = self._indexed_folders.get((benchmark, lib, code))
+                    if indexed is None or indexed[0] != version:
+                        path, csvs = view[lib][code]
+                        self._index_folder(benchmark, lib, code, path, csvs)
+                        self._indexed_folders[benchmark, lib, code] = (version, path)
+            for key in list(self._indexed_folders):
+                if key[0] == benchmark and key not in folders:
+                    del self._indexed_folders[key]
+                    for (indexed, _), entries in self._csv_index.items():
+                        if indexed == benchmark:
+                            entries.pop(key[1:], None)
+            self._indexed_revision[benchmark] = revision
+
+    def _index_folder(
+        self, benchmark: str, lib: str, code: str, path: str, csvs: list[str]
+    ) -> None:
+        """Resolve the .csv files of every tally of a benchmark in a folder"""
+        # file name without extension -> positions in the folder
+        positions: dict[str, list[int]] = {}
+        for position, csv in enumerate(csvs):
+            positions.setdefault(csv[:-4], []).append(position)
+        for tally, config in self.params.get(benchmark, {}).items():
+            if tally == "general":
+                continue
+            try:
+                resolved = list(config["csv"])
+            except KeyError:
+                try:
+                    result = config["result"]
+                except KeyError:
+                    continue
+                # result can either be a list or a string
+                if not isinstance(result, list):
+                    result = [result]
+                found = {i for name in result for i in positions.get(name, ())}
+                resolved = [csvs[i] for i in sorted(found)]
+            self._csv_index.setdefault((benchmark, tally), {})[lib, code] = (
+                path,
+                resolved,
+            )
+
+    def _index_tally(self, benchmark: str, tally: str) -> None:
+        """Index again a tally generated from the generic ones, in all the
+        folders already indexed"""
+        with self._index_lock:
+            config = self.params[benchmark].get(tally)
+            if config is None:
+                self._csv_index.pop((benchmark, tally), None)
+                return
+            self._csv_index[benchmark, tally] = {
+                (lib, code): (path, list(config["csv"]))
+                for (indexed, lib, code), (_, path) in self._indexed_folders.items()
+                if indexed == benchmark
+            }
+
+    def _resolve_csvs(
+        self, benchmark: str, tally: str
+    ) -> dict[tuple[str, str], tuple[str, list[str]]]:
+        """Get the .csv files that contain the data of a tally.
+
+        Parameters
+        ----------
+        benchmark : str
+            benchmark name
+        tally : str
+            tally name
+
+        Returns
+        -------
+        dict[tuple[str, str], tuple[str, list[str]]]
+            path of the results and .csv files to be read for the tally, for
+            each lib-code combination
+        """
+        self.status.require(benchmark)
+        self.refresh()
+        self._update_csv_index(benchmark)
+        with self._index_lock:
+            return dict(self._csv_index.get((benchmark, tally), {}))
+
     def _get_graph_data(
         self,
         benchmark: str,
@@ -190,108 +804,74 @@ class Processor:
         pd.DataFrame
             data for plotting
         """
-        # verify that the benchmark-tally combination is supported
-        try:
-            y_label = self.params[benchmark][tally]["plot_args"]["y"]
-        except KeyError as exc:
-            raise NotImplementedError(
-                f"{benchmark}-{tally} combination not supported"
-            ) from exc
+        substitutions = self._get_substitutions(
+            benchmark, tally, ratio=ratio, reflib=reflib, refcode=refcode
+        )
 
         # get all dfs for the different codes-libraries combos
         dfs = []
-        for lib, values in self.status.status[benchmark].items():
-            for code, (path, csvs) in values.items():
-                # locate and read the csv file
-                try:
-                    csv = self.params[benchmark][tally]["csv"]
-                except KeyError:
-                    result = self.params[benchmark][tally]["result"]
-                    # If result is a list, find all matching csvs
-                    if isinstance(result, list):
-                        csv = [csv for csv in csvs if csv[:-4] in result]
-                    else:
-                        csv = [csv for csv in csvs if result == csv[:-4]]
-                # If result is a list, more than one csv needs to be considered for the plot
-                # Load and concatenate all matching CSVs
-                dfs_to_concat = []
-                ref_df_concat = []
-                for csv_name in csv:
-                    df = self._get_csv(
-                        path,
-                        csv_name,
-                    )
-                    if df is None:
-                        if reflib == lib and refcode == code:
-                            raise NotImplementedError(
-                                f"Reference data for {reflib}-{refcode} not found. Please, select another library as a reference."
-                            )
-                        else:
-                            continue
-
-                    # Always drop the "total" row if present (check only first col)
-                    df = (
-                        df.set_index(df.columns[0])
-                        .drop("total", errors="ignore")
-                        .reset_index()
-                    )
-
-                    # Get only a subset of the data if requested
-                    if subset:
-                        col = subset[0]
-                        index = subset[1]
-                        # transform the values contained in column col to strings
-                        df[col] = list(map(str, df[col]))
-                        # keep the subset of the dataframe for which the col column matches the values in index
-                        df = df[df[col].isin(np.array(index).flatten())]
-                    # Add the label to the df
-                    label = f"{lib}-{code}"
-                    df["label"] = label
-
-                    # Memorize the reference df to compute ratios
-                    if reflib == lib and refcode == code:
-                        ref_df = df
-                        ref_df_concat.append(ref_df)
-
-                    # if requested, convert x values to string
-                    if x_vals_to_string:
-                        df = string_ints_converter(df, x_vals_to_string)
-
-                    dfs_to_concat.append(df)
-
-                # Concatenate all dataframes for this tally/lib/code
-                if not dfs_to_concat:
-                    continue
-                df = pd.concat(dfs_to_concat, ignore_index=True)
-                if reflib == lib and refcode == code:
-                    ref_df = pd.concat(ref_df_concat, ignore_index=True)
-                # if the library is exp, it needs to be the first one for
-                # better plots
-                if lib == "exp":
-                    temp = [df]
-                    temp.extend(dfs)
-                    dfs = temp
-                else:
-                    dfs.append(df)
+        for lib, code, df in self._read_tally(
+            benchmark,
+            tally,
+            reference=(reflib, refcode),
+            x_vals_to_string=x_vals_to_string,
+            subset=subset,
+        ):
+            # Add the label to the df
+            df["label"] = f"{lib}-{code}"
+            # if the library is exp, it needs to be the first one for
+            # better plots
+            if lib == "exp":
+                temp = [df]
+                temp.extend(dfs)
+                dfs = temp
+            else:
+                dfs.append(df)
         # normalize data to reflib/refcode if requested
         if ratio:
-            newdfs = []
-            for df in dfs:
-                if len(df) == len(ref_df):
-                    newdf = df.copy()
-                    newdf["Value"] = (
-                        newdf["Value"].to_numpy() / ref_df["Value"].to_numpy()
-                    )
-                    newdf["Error"] = np.sqrt(
-                        newdf["Error"].to_numpy() ** 2 + ref_df["Error"].to_numpy() ** 2
-                    )  # relative error propagation for ratio
-                    newdfs.append(newdf)
+            newdf = get_ratio(pd.concat(dfs, ignore_index=True), f"{reflib}-{refcode}")
+            if newdf.attrs["unmatched"]:
+                LOGGER.warning(
+                    "%s-%s: points without a reference value %s",
+                    benchmark,
+                    tally,
+                    newdf.attrs["unmatched"],
+                )
         else:
-            newdfs = dfs
-
-        newdf = pd.concat(newdfs)
+            newdf = pd.concat(dfs)
 
         # Rename columns
+        for old, new in substitutions.items():
+            newdf[new] = newdf[old]
+            del newdf[old]
+
+        return newdf
+
+    def _get_substitutions(
+        self,
+        benchmark: str,
+        tally: str,
+        ratio: bool = False,
+        reflib: str = None,
+        refcode: str = None,
+    ) -> dict[str, str]:
+        """Get the new names of the columns of a tally. If ratio is True, the
+        unit of the y values is replaced by the one of the ratio.
+
+        Raises
+        ------
+        NotImplementedError
+            if the benchmark-tally combination is not supported
+        """
+        # verify that the benchmark-tally combination is supported
+        try:
+            y_label = self.params[benchmark][tally]["plot_args"]["y"]
+        except KeyError as exc:
+            raise NotImplementedError(
+                f"{benchmark}-{tally} combination not supported"
+            ) from exc
+
+        substitutions = {}
         for old, new in self.params[benchmark][tally]["substitutions"].items():
             # if ratio was requested, change y unit
             if ratio and new == y_label:
@@ -301,10 +881,104 @@ class Processor:
                     new = new.replace("C/E", f"Ratio vs {reflib}-{refcode}")
                 else:
                     new = UNIT_PATTERN.sub(f"[ratio vs {reflib}-{refcode}]", new)
-            newdf[new] = newdf[old]
-            del newdf[old]
+            substitutions[old] = new
+        return substitutions
 
-        return newdf
+    def _read_tally(
+        self,
+        benchmark: str,
+        tally: str,
+        reference: tuple[str, str] = None,
+        x_vals_to_string: str = None,
+        subset: tuple[str, str | list] = None,
+    ) -> list[tuple[str, str, pd.DataFrame]]:
+        """Read the data of a tally for each codes-libraries combination, with
+        the original column names.
+
+        Parameters
+        ----------
+        benchmark : str
+            benchmark name
+        tally : str
+            tally name
+        reference : tuple[str, str], optional
+            library and code whose data is required, by default None
+        x_vals_to_string : str, optional
+            column whose values are converted to string, by default None
+        subset : tuple[str, str | list], optional
+            if provided, the df is filtered by the specified column-value
+            couple, by default None.
+
+        Returns
+        -------
+        list[tuple[str, str, pd.DataFrame]]
+            library, code and data of each combination that has results
+
+        Raises
+        ------
+        NotImplementedError
+            if the data of the reference library and code is missing
+        """
+        # locate the csv files for the different codes-libraries combos
+        to_read = [
+            (lib, code, path, csvs)
+            for (lib, code), (path, csvs) in self._resolve_csvs(
+                benchmark, tally
+            ).items()
+        ]
+        # the x columns are prepared when the files are parsed
+        coercion = Coercion.from_options(subset, x_vals_to_string)
+        fetched = {}
+        dataset = self._get_dataset(benchmark)
+        if dataset is not None:
+            # slices of the memory-mapped dataset, nothing to parse
+            for lib, code, path, csv in to_read:
+                for csv_name in csv:
+                    df = dataset.read(lib, code, csv_name)
+                    if df is None:
+                        continue
+                    try:
+                        fetched[path, csv_name] = coercion.apply(df)
+                    except (KeyError, IndexError, ValueError, TypeError):
+                        # read from the .csv file, see TallySchema.parse_many
+                        pass
+        # fetch the others all at once, the order of the plot is not affected
+        missing = [
+            (path, csv_name)
+            for _, _, path, csv in to_read
+            for csv_name in csv
+            if (path, csv_name) not in fetched
+        ]
+        if missing:
+            fetched.update(
+                self._fetch_csvs(
+                    missing,
+                    schema=self._get_schema(benchmark, tally),
+                    coercion=coercion,
+                )
+            )
+
+        read = []
+        for lib, code, path, csv in to_read:
+            # If result is a list, more than one csv needs to be considered for the plot
+            # Load and concatenate all matching CSVs
+            dfs_to_concat = []
+            for csv_name in csv:
+                df = fetched[path, csv_name]
+                if df is None:
+                    if reference == (lib, code):
+                        raise NotImplementedError(
+                            f"Reference data for {lib}-{code} not found. Please, select another library as a reference."
+                        )
+                    else:
+                        continue
+                dfs_to_concat.append(df)
+
+            # Concatenate all dataframes for this tally/lib/code
+            if not dfs_to_concat:
+                continue
+            read.append((lib, code, pd.concat(dfs_to_concat, ignore_index=True)))
+        return read
 
     def _get_x_vals_to_string(self, benchmark: str, tally: str) -> str:
         # Check if the x-axis needs to be converted to string
@@ -334,6 +1008,13 @@ class Processor:
 
         return x_vals_to_string
 
+    def _get_coercion(self, benchmark: str, tally: str) -> Coercion:
+        """Preparation of the .csv files of a tally for its plots"""
+        return Coercion.from_options(
+            self._get_optional_config("subset", benchmark, tally),
+            self._get_x_vals_to_string(benchmark, tally),
+        )
+
     def _get_optional_config(self, key: str, benchmark: str, tally: str) -> str | bool:
         """helper to get optional configuration from the json file thay may not
         be present"""
@@ -368,8 +1049,33 @@ class Processor:
         Returns
         -------
         Figure
-            plotly Figure
+            plotly Figure. Figures are cached by their arguments and the data
+            version of the benchmark, a copy is returned.
         """
+        key = (
+            benchmark,
+            reflib,
+            refcode,
+            tally,
+            ratio,
+            self.get_data_version(benchmark),
+        )
+        fig = self.figures.get(key)
+        if fig is not None:
+            return fig
+        fig = self._build_plot(benchmark, reflib, refcode, tally, ratio)
+        self.figures.put(key, fig)
+        return fig
+
+    def _build_plot(
+        self,
+        benchmark: str,
+        reflib: str,
+        refcode: str,
+        tally: str,
+        ratio: bool = False,
+    ) -> Figure:
+        """Build the figure returned by get_plot, see its parameters"""
         """
         # Recover the tally code
         for key, value in self.params[benchmark].items():
@@ -399,7 +1105,8 @@ class Processor:
         )
         # Mandatory keys
         try:
-            key_args = self.params[benchmark][tally]["plot_args"]
+            # copied, the ratio options must not leak into the configuration
+            key_args = deepcopy(self.params[benchmark][tally]["plot_args"])
             plot_type = self.params[benchmark][tally]["plot_type"]
         except KeyError as exc:
             raise JsonSettingsError(
@@ -439,6 +1146,94 @@ class Processor:
         )
         return fig
 
+    def iter_long_format(
+        self, benchmark: str, tallies: Iterable[str] = None
+    ) -> Iterator[pd.DataFrame]:
+        """Iterate over the data of the tallies of a benchmark in long format,
+        one DataFrame per tally and codes-libraries combination.
+
+        The .csv files are resolved and read as for the plots. The columns
+        are benchmark, library, code, tally, quantity (the name given to the
+        values in the plots), the x columns renamed as in the plots, Value
+        and Error.
+
+        Parameters
+        ----------
+        benchmark : str
+            benchmark name
+        tallies : Iterable[str], optional
+            tallies to be read, by default all the supported ones
+
+        Yields
+        ------
+        pd.DataFrame
+            data of a tally for a library and code
+        """
+        self.status.require(benchmark)
+        if tallies is None:
+            tallies = [
+                tally
+                for tally, config in self.params.get(benchmark, {}).items()
+                if tally != "general" and "plot_args" in config
+            ]
+        for tally in tallies:
+            substitutions = self._get_substitutions(benchmark, tally)
+            quantity = substitutions.pop("Value", "Value")
+            substitutions.pop("Error", None)
+            for lib, code, df in self._read_tally(
+                benchmark,
+                tally,
+                subset=self._get_optional_config("subset", benchmark, tally),
+            ):
+                data = {
+                    "benchmark": benchmark,
+                    "library": lib,
+                    "code": code,
+                    "tally": tally,
+                    "quantity": quantity,
+                }
+                for column in df.columns:
+                    if column not in ("Value", "Error"):
+                        data[substitutions.get(column, column)] = df[column]
+                data["Value"] = df["Value"]
+                data["Error"] = df["Error"] if "Error" in df else np.nan
+                yield pd.DataFrame(data, index=df.index)
+
+    def export(
+        self,
+        benchmarks: Iterable[str],
+        path: os.PathLike,
+        fmt: str = None,
+        chunk_rows: int = None,
+    ) -> int:
+        """Export all the tallies of some benchmarks into a single long
+        format file, see iter_long_format for its columns. Tallies are read
+        one at a time and written in chunks.
+
+        Parameters
+        ----------
+        benchmarks : Iterable[str]
+            benchmarks to be exported
+        path : os.PathLike
+            path of the output file
+        fmt : str, optional
+            "parquet" or "csv", by default guessed from the extension of path
+        chunk_rows : int, optional
+            maximum number of rows written at a time, by default the one of
+            LongFormatWriter
+
+        Returns
+        -------
+        int
+            number of rows exported
+        """
+        kwargs = {} if chunk_rows is None else {"chunk_rows": chunk_rows}
+        with LongFormatWriter(path, fmt=fmt, **kwargs) as writer:
+            for benchmark in benchmarks:
+                for df in self.iter_long_format(benchmark):
+                    writer.write(df)
+        return writer.rows
+
     def get_available_benchmarks(self) -> list[str]:
         """Get a list of all benchmarks available. To be available, the raw data
         need to be present and a json configuration file should be also present.
@@ -473,46 +1268,62 @@ class Processor:
         list[str]
             Path to the results and a list of all files available
         """
-        available_csv = self.status.status[benchmark][library][code]
-        csv_names = available_csv[1]
+        self.status.require(benchmark)
+        self.refresh()
+        csv_names = self.status.get_results(benchmark, library, code)[1]
+        by_result, order, dashes = self._get_result_index(benchmark)
 
-        supported = []
-        for key, value in self.params[benchmark].items():
-            if "result" in value:
-                result = value["result"]
-                # result can either be a list or a string
-                if isinstance(result, list):
-                    supported.extend(result)
-                else:
-                    supported.append(result)
-        tally_names = []
-        available = []
+        results = set()
         for csv in csv_names:
-            available.append(csv[:-4])
-            csv = csv[:-4].split(" ", 1)
-            available.append(csv[-1])
-        tallies = list(set(available).intersection(set(supported)))
-        tallies.sort(key=sorting_func)
-        for tally in tallies:
-            for key, value in self.params[benchmark].items():
-                if "result" in value:
-                    result = value["result"]
-                    # result can either be a list or a string
-                    if (
-                        (isinstance(result, list) and tally in result)
-                        or (result == tally)
-                    ) and key not in tally_names:
-                        tally_names.append(key)
+            name = csv[:-4]
+            if name in by_result:
+                results.add(name)
+            name = name.split(" ", 1)[-1]
+            if name in by_result:
+                results.add(name)
+        tally_names = {}
+        # results with the same sorting key keep the order of the configuration
+        results = sorted(
+            results, key=lambda result: (sorting_func(result), order[result])
+        )
+        for result in results:
+            for key in by_result[result]:
+                tally_names.setdefault(key)
 
         # Sort options by number of "-" to ensure proper construction of the ctg_dict
-        # first, temporarily replace protected substrings
-        for i in range(len(tally_names)):
-            for orig, temp in PROTECTED_STRINGS.items():
-                tally_names[i] = tally_names[i].replace(orig, temp)
-        tally_names = sorted(tally_names, key=lambda x: x.count("-"))
-        # restore original protected substrings
-        for i in range(len(tally_names)):
-            for orig, temp in PROTECTED_STRINGS.items():
-                tally_names[i] = tally_names[i].replace(temp, orig)
+        return sorted(tally_names, key=dashes.__getitem__)
 
-        return tally_names
+    def _get_result_index(
+        self, benchmark: str
+    ) -> tuple[dict[str, list[str]], dict[str, int], dict[str, int]]:
+        """Get the inverted index of the results of a benchmark, built again
+        only when its tallies change.
+
+        Returns
+        -------
+        tuple[dict[str, list[str]], dict[str, int], dict[str, int]]
+            tallies reading each result (in the order of the configuration),
+            position of each result in the configuration and number of "-" of
+            each tally name, excluding the protected substrings
+        """
+        version = self._params_versions.get(benchmark, 0)
+        cached = self._result_index.get(benchmark)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        by_result: dict[str, list[str]] = {}
+        dashes: dict[str, int] = {}
+        for key, value in list(self.params[benchmark].items()):
+            if "result" not in value:
+                continue
+            result = value["result"]
+            # result can either be a list or a string
+            for name in result if isinstance(result, list) else [result]:
+                by_result.setdefault(name, []).append(key)
+            protected = key
+            for orig, temp in PROTECTED_STRINGS.items():
+                protected = protected.replace(orig, temp)
+            dashes[key] = protected.count("-")
+        order = {name: position for position, name in enumerate(by_result)}
+        index = (by_result, order, dashes)
+        self._result_index[benchmark] = (version, index)
+        return index
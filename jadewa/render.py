@@ -0,0 +1,282 @@
+"""Headless rendering of the figures of the web app.
+
+Every figure the app can show (benchmark, reference library and code, tally,
+absolute or ratio) is written to a standalone HTML or plotly JSON file. The
+figures are rendered by benchmark: all the figures of a benchmark are built
+by the same worker process, after its .csv files have been fetched once, so
+that they are shared by all its figures. The benchmarks are rendered in
+parallel on a process pool and can be split in shards, e.g. to render them
+on several machines.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple
+
+import plotly.io as pio
+
+from jadewa.cache import FigureCache
+from jadewa.processor import Processor
+from jadewa.status import Status
+
+FORMATS = ("html", "json")
+# characters not allowed in file names on the common file systems
+_UNSAFE_CHARACTERS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
+# processor of a worker process, see _init_worker
+_WORKER_PROCESSOR: Processor | None = None
+
+
+class FigureJob(NamedTuple):
+    """Arguments of Processor.get_plot for a figure"""
+
+    benchmark: str
+    reflib: str
+    refcode: str
+    tally: str
+    ratio: bool
+
+    def filename(self, fmt: str) -> str:
+        """Path of the figure relative to the output directory"""
+        name = f"{self.tally} - ratio" if self.ratio else self.tally
+        return os.path.join(
+            _safe_name(self.benchmark),
+            _safe_name(f"{self.reflib}_{self.refcode}"),
+            f"{_safe_name(name)}.{fmt}",
+        )
+
+
+def _safe_name(name: str) -> str:
+    return _UNSAFE_CHARACTERS.sub("_", name).strip(" .") or "_"
+
+
+def list_figures(
+    processor: Processor,
+    benchmarks: Iterable[str] = None,
+    ratios: Iterable[bool] = (False, True),
+) -> list[FigureJob]:
+    """List the figures that can be shown in the app, in the same way the
+    app lists its options.
+
+    Parameters
+    ----------
+    processor : Processor
+        processor of the results
+    benchmarks : Iterable[str], optional
+        benchmarks to be listed, by default the available ones
+    ratios : Iterable[bool], optional
+        plot types to be listed, by default both absolute (False) and ratio
+        (True)
+
+    Returns
+    -------
+    list[FigureJob]
+        one job per figure
+    """
+    if benchmarks is None:
+        benchmarks = processor.get_available_benchmarks()
+    ratios = list(ratios)
+    status = processor.status
+    jobs = []
+    for benchmark in benchmarks:
+        for reflib in status.get_libraries(benchmark):
+            for refcode in status.get_codes(benchmark, reflib):
+                for tally in processor.get_available_tallies(
+                    benchmark, reflib, refcode
+                ):
+                    for ratio in ratios:
+                        jobs.append(
+                            FigureJob(benchmark, reflib, refcode, tally, ratio)
+                        )
+    return jobs
+
+
+def shard(jobs: list[FigureJob], index: int, count: int) -> list[FigureJob]:
+    """Select the figures of a shard. Benchmarks are never split between
+    shards, they are assigned so that the shards have about the same number
+    of figures. The assignment only depends on the jobs, so that the shards
+    computed on different machines do not overlap.
+
+    Parameters
+    ----------
+    jobs : list[FigureJob]
+        all the figures
+    index : int
+        index of the shard, from 0 to count - 1
+    count : int
+        number of shards
+
+    Returns
+    -------
+    list[FigureJob]
+        figures of the shard, in the original order
+
+    Raises
+    ------
+    ValueError
+        if the index is not valid
+    """
+    if not 0 <= index < count:
+        raise ValueError(f"Shard index {index} not in [0, {count})")
+    sizes: dict[str, int] = {}
+    for job in jobs:
+        sizes[job.benchmark] = sizes.get(job.benchmark, 0) + 1
+    loads = [0] * count
+    selected = set()
+    # largest benchmarks first, each to the least loaded shard
+    for benchmark in sorted(sizes, key=lambda name: (-sizes[name], name)):
+        target = loads.index(min(loads))
+        loads[target] += sizes[benchmark]
+        if target == index:
+            selected.add(benchmark)
+    return [job for job in jobs if job.benchmark in selected]
+
+
+def render_benchmark(
+    processor: Processor,
+    jobs: list[FigureJob],
+    directory: os.PathLike,
+    fmt: str = "html",
+    include_plotlyjs: bool | str = True,
+) -> list[tuple[FigureJob, str | None]]:
+    """Render figures of the same benchmark. All its .csv files are fetched
+    first, in batches, then each figure is built from the cache.
+
+    Parameters
+    ----------
+    processor : Processor
+        processor of the results
+    jobs : list[FigureJob]
+        figures of a benchmark
+    directory : os.PathLike
+        output directory, see FigureJob.filename for the layout
+    fmt : str, optional
+        "html" or "json", by default "html"
+    include_plotlyjs : bool | str, optional
+        how the html files include plotly.js, see plotly.io.write_html. By
+        default True, the library is embedded in each file.
+
+    Returns
+    -------
+    list[tuple[FigureJob, str | None]]
+        each job with the error that prevented its rendering, None if it
+        was rendered
+    """
+    if not jobs:
+        return []
+    try:
+        processor.prefetch(jobs[0].benchmark).result()
+    except Exception:
+        # the figures fetch what they need
+        pass
+    results = []
+    for job in jobs:
+        path = os.path.join(directory, job.filename(fmt))
+        try:
+            fig = processor.get_plot(*job)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if fmt == "json":
+                pio.write_json(fig, path)
+            else:
+                pio.write_html(fig, path, include_plotlyjs=include_plotlyjs)
+        except Exception as exc:
+            results.append((job, f"{type(exc).__name__}: {exc}"))
+        else:
+            results.append((job, None))
+    return results
+
+
+def _init_worker(make_status: Callable[[], Status]) -> None:
+    global _WORKER_PROCESSOR
+    # each figure is rendered once, there is no point in caching them
+    _WORKER_PROCESSOR = Processor(make_status(), figures=FigureCache(0))
+
+
+def _render_in_worker(*args) -> list[tuple[FigureJob, str | None]]:
+    return render_benchmark(_WORKER_PROCESSOR, *args)
+
+
+def render_figures(
+    make_status: Callable[[], Status],
+    jobs: list[FigureJob],
+    directory: os.PathLike,
+    fmt: str = "html",
+    max_workers: int = None,
+    include_plotlyjs: bool | str = True,
+    progress_callback: Callable[[int, int], None] = None,
+) -> dict[FigureJob, str | None]:
+    """Render figures on a pool of processes, one benchmark at a time per
+    process.
+
+    Parameters
+    ----------
+    make_status : Callable[[], Status]
+        picklable function building the status in each process, e.g.
+        functools.partial(Status.from_root, root)
+    jobs : list[FigureJob]
+        figures to be rendered
+    directory : os.PathLike
+        output directory, see FigureJob.filename for the layout
+    fmt : str, optional
+        "html" or "json", by default "html"
+    max_workers : int, optional
+        number of processes, by default the number of CPUs. With 1 the
+        figures are rendered in the calling process.
+    include_plotlyjs : bool | str, optional
+        how the html files include plotly.js, see plotly.io.write_html. By
+        default True, the library is embedded in each file.
+    progress_callback : Callable[[int, int], None], optional
+        called with the number of figures done and the total after each
+        benchmark, by default None
+
+    Returns
+    -------
+    dict[FigureJob, str | None]
+        error of each figure, None if it was rendered
+
+    Raises
+    ------
+    ValueError
+        if the format is not supported
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported figure format: {fmt}")
+    groups: dict[str, list[FigureJob]] = {}
+    for job in jobs:
+        groups.setdefault(job.benchmark, []).append(job)
+    # largest benchmarks first, for a better balance of the processes
+    batches = sorted(groups.values(), key=len, reverse=True)
+    args = (directory, fmt, include_plotlyjs)
+
+    results: dict[FigureJob, str | None] = {}
+
+    def collect(rendered: list[tuple[FigureJob, str | None]]) -> None:
+        results.update(rendered)
+        if progress_callback is not None:
+            progress_callback(len(results), len(jobs))
+
+    if max_workers == 1:
+        processor = Processor(make_status(), figures=FigureCache(0))
+        for batch in batches:
+            collect(render_benchmark(processor, batch, *args))
+        return {job: results[job] for job in jobs}
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_worker, initargs=(make_status,)
+    ) as executor:
+        futures = {
+            executor.submit(_render_in_worker, batch, *args): batch
+            for batch in batches
+        }
+        for future in as_completed(futures):
+            try:
+                collect(future.result())
+            except Exception as exc:
+                # e.g. the worker could not build the status
+                error = f"{type(exc).__name__}: {exc}"
+                collect([(job, error) for job in futures[future]])
+    return {job: results[job] for job in jobs}
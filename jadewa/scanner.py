@@ -0,0 +1,196 @@
+"""Scanner of the local mirrors of the raw results.
+
+The directories are listed with os.scandir, one task per directory on a pool
+of threads, so that on network filesystems the latency of the listings
+overlaps. The listing of each directory is cached on disk together with its
+mtime: creating, removing or renaming an entry changes the mtime of the
+directory, hence an unchanged directory is only stat-ed on the next scan and
+not listed again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from jadewa.utils import CachePath
+
+SCAN_WORKERS = 16
+SCAN_CACHE_DIR = CachePath("scan")
+SCAN_CACHE_VERSION = 1
+# the mtime resolution of some filesystems is coarse, the listings of the
+# directories modified within this window (ns) from the scan are not cached
+RACY_WINDOW = 2 * 10**9
+
+
+class LocalScanner:
+    def __init__(
+        self,
+        max_workers: int = SCAN_WORKERS,
+        cache_dir: os.PathLike | None = None,
+        suffix: str = ".csv",
+    ) -> None:
+        """List the results files of a local directory tree.
+
+        Parameters
+        ----------
+        max_workers : int, optional
+            maximum number of directories listed concurrently, by default
+            SCAN_WORKERS
+        cache_dir : os.PathLike | None, optional
+            directory where the listings are cached between sessions, e.g.
+            SCAN_CACHE_DIR. By default None, all the directories are listed
+            at every scan.
+        suffix : str, optional
+            suffix of the results files, by default ".csv"
+
+        Attributes
+        ----------
+        listed : int
+            number of directories listed during the last scan
+        reused : int
+            number of directories whose cached listing was reused during the
+            last scan
+        """
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.suffix = suffix
+        self.listed = 0
+        self.reused = 0
+
+    def scan(self, root: os.PathLike) -> list[tuple[str, list[str]]]:
+        """Get all the directories of a tree that contain results files.
+
+        Parameters
+        ----------
+        root : os.PathLike
+            root of the tree
+
+        Returns
+        -------
+        list[tuple[str, list[str]]]
+            normalized path of each directory containing results files and
+            their names, in the same order of a top-down os.walk
+        """
+        root = os.path.normpath(os.fspath(root))
+        cache_file = self._cache_file(root)
+        cached = self._load_cache(cache_file)
+        scan_start = time.time_ns()
+
+        self.listed = 0
+        self.reused = 0
+        listings = {}
+        new_cache = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {executor.submit(self._list, root, "", cached.get(""))}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rel_path, mtime, files, subdirs, reused = future.result()
+                    listings[rel_path] = (files, subdirs)
+                    if reused:
+                        self.reused += 1
+                    elif mtime is not None:
+                        self.listed += 1
+                    if mtime is not None and mtime < scan_start - RACY_WINDOW:
+                        new_cache[rel_path] = [mtime, files, subdirs]
+                    for subdir in subdirs:
+                        child = os.path.join(rel_path, subdir)
+                        pending.add(
+                            executor.submit(
+                                self._list, root, child, cached.get(child)
+                            )
+                        )
+
+        if new_cache != cached:
+            self._save_cache(cache_file, root, new_cache)
+
+        # rebuild the top-down order of os.walk
+        allfiles = []
+        stack = [""]
+        while stack:
+            rel_path = stack.pop()
+            files, subdirs = listings[rel_path]
+            if files:
+                path = os.path.normpath(os.path.join(root, rel_path))
+                allfiles.append((path, files))
+            stack.extend(
+                os.path.join(rel_path, subdir) for subdir in reversed(subdirs)
+            )
+        return allfiles
+
+    def _list(
+        self, root: str, rel_path: str, cached: list | None
+    ) -> tuple[str, int | None, list[str], list[str], bool]:
+        """List a directory unless its cached listing is still valid"""
+        path = os.path.join(root, rel_path)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            # as os.walk, directories that cannot be accessed are skipped
+            return rel_path, None, [], [], False
+        if cached is not None and cached[0] == mtime:
+            return rel_path, mtime, cached[1], cached[2], True
+
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        # symbolic links to directories are not followed
+                        if not entry.is_symlink():
+                            subdirs.append(entry.name)
+                    elif entry.name.endswith(self.suffix):
+                        files.append(entry.name)
+        except OSError:
+            return rel_path, None, [], [], False
+        return rel_path, mtime, files, subdirs, False
+
+    def _cache_file(self, root: str) -> str | None:
+        if self.cache_dir is None:
+            return None
+        key = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load_cache(self, cache_file: str | None) -> dict[str, list]:
+        if cache_file is None:
+            return {}
+        try:
+            with open(cache_file, "r", encoding="utf-8") as infile:
+                cache = json.load(infile)
+        except (OSError, ValueError):
+            return {}
+        if cache.get("version") != SCAN_CACHE_VERSION:
+            return {}
+        if cache.get("suffix") != self.suffix:
+            return {}
+        return cache["dirs"]
+
+    def _save_cache(
+        self, cache_file: str | None, root: str, dirs: dict[str, list]
+    ) -> None:
+        if cache_file is None:
+            return
+        cache = {
+            "version": SCAN_CACHE_VERSION,
+            "root": os.path.abspath(root),
+            "suffix": self.suffix,
+            "dirs": dirs,
+        }
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as outfile:
+                json.dump(cache, outfile)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            # the cache is only an optimization
+            pass
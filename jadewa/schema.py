@@ -0,0 +1,257 @@
+"""Typed parsing of the raw .csv results of a tally.
+
+All the .csv files of a tally share the same columns (one file per library and
+code), so their types only need to be inferred once. A TallySchema learns the
+dtypes of each header from the first file it parses, then the other files with
+the same header are concatenated and parsed in a single pass of the C parser,
+with explicit dtypes for the float columns. The result is the same as parsing
+each file on its own: a file whose columns could have been typed differently
+on their own (e.g. only integers in a float column) is parsed again alone, and
+the headers with text columns are always parsed one file at a time.
+
+The x columns of the plots are prepared while parsing (see Coercion), so that
+the prepared DataFrames are cached and not converted again at every plot.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Hashable
+from io import BytesIO
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from jadewa.utils import string_ints_converter
+
+
+class Coercion(NamedTuple):
+    """Preparation of the DataFrames of a tally for the plots: the "total"
+    row is dropped, the subset column is converted to string and filtered,
+    the x column is converted to string with string_ints_converter."""
+
+    # column and values of the rows to be kept
+    subset: tuple[str, tuple] | None = None
+    # column converted to string
+    x_vals_to_string: str | None = None
+
+    @classmethod
+    def from_options(
+        cls, subset: tuple[str, str | list] = None, x_vals_to_string: str = None
+    ) -> Coercion:
+        """Build the coercion from the options of a tally, see
+        Processor._read_tally"""
+        if subset:
+            column, index = subset
+            subset = (column, tuple(np.array(index).flatten().tolist()))
+        else:
+            subset = None
+        return cls(subset, x_vals_to_string or None)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Prepare the content of a .csv file.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            content of the file as read by pandas
+
+        Returns
+        -------
+        pd.DataFrame
+            prepared DataFrame
+        """
+        # Always drop the "total" row if present (check only first col)
+        df = df.set_index(df.columns[0]).drop("total", errors="ignore").reset_index()
+        if self.subset is not None:
+            column, index = self.subset
+            # transform the values contained in column col to strings
+            if not pd.api.types.is_string_dtype(df[column]):
+                df[column] = df[column].astype(str)
+            df = df[df[column].isin(index)]
+        if self.x_vals_to_string is not None:
+            df = string_ints_converter(df, self.x_vals_to_string)
+        return df
+
+
+class TallySchema:
+    def __init__(self) -> None:
+        """Column dtypes of the .csv files of a tally, learned from the files
+        parsed on their own for each header."""
+        self._lock = threading.Lock()
+        # header line -> {column: dtype}
+        self._dtypes: dict[bytes, dict[str, object]] = {}
+
+    def dtypes(self, header: bytes) -> dict[str, object] | None:
+        """Get the learned dtypes of the files with a given header line, None
+        if no file with that header was parsed yet"""
+        with self._lock:
+            dtypes = self._dtypes.get(header)
+            return None if dtypes is None else dict(dtypes)
+
+    def parse(self, raw: bytes, coercion: Coercion = None) -> pd.DataFrame:
+        """Parse the raw content of a single .csv file.
+
+        Parameters
+        ----------
+        raw : bytes
+            content of the file
+        coercion : Coercion, optional
+            preparation of the DataFrame, by default None
+
+        Returns
+        -------
+        pd.DataFrame
+            content of the file
+        """
+        key = "raw"
+        return self.parse_many({key: raw}, coercion)[key]
+
+    def parse_many(
+        self, raws: dict[Hashable, bytes], coercion: Coercion = None
+    ) -> dict[Hashable, pd.DataFrame | None]:
+        """Parse the raw content of several .csv files of the tally.
+
+        Parameters
+        ----------
+        raws : dict[Hashable, bytes]
+            content of each file
+        coercion : Coercion, optional
+            preparation of the DataFrames, by default None, they are returned
+            as parsed by pandas
+
+        Returns
+        -------
+        dict[Hashable, pd.DataFrame | None]
+            content of each file, None if it could not be parsed or prepared
+        """
+        groups: dict[bytes, list[Hashable]] = {}
+        for key, raw in raws.items():
+            groups.setdefault(_header(raw), []).append(key)
+
+        parsed = {}
+        for header, keys in groups.items():
+            if self.dtypes(header) is None:
+                # the first file of a header teaches its dtypes
+                parsed[keys[0]] = self._parse_single(header, raws[keys[0]])
+                keys = keys[1:]
+            batch = [key for key in keys if _batchable(raws[key])]
+            if len(batch) > 1 and self._numeric(header):
+                try:
+                    frames = self._parse_batch(header, [raws[k] for k in batch])
+                except (ValueError, TypeError, OverflowError):
+                    frames = []
+                for key, df in zip(batch, frames):
+                    if df is not None:
+                        parsed[key] = df
+            for key in keys:
+                if key not in parsed:
+                    parsed[key] = self._parse_single(header, raws[key])
+
+        if coercion is not None:
+            for key, df in parsed.items():
+                if df is None:
+                    continue
+                try:
+                    parsed[key] = coercion.apply(df)
+                except (KeyError, IndexError, ValueError, TypeError):
+                    parsed[key] = None
+        return {key: parsed[key] for key in raws}
+
+    def _numeric(self, header: bytes) -> bool:
+        # the types of text columns cannot be checked after a batch parse
+        dtypes = self.dtypes(header)
+        return dtypes is not None and all(
+            pd.api.types.is_numeric_dtype(dtype) for dtype in dtypes.values()
+        )
+
+    def _parse_single(self, header: bytes, raw: bytes) -> pd.DataFrame | None:
+        try:
+            df = pd.read_csv(BytesIO(raw))
+        except (ValueError, UnicodeDecodeError):
+            return None
+        if len(df) > 0:
+            # the columns of a file without rows have no types
+            self._learn(header, df)
+        return df
+
+    def _parse_batch(
+        self, header: bytes, raws: list[bytes]
+    ) -> list[pd.DataFrame | None]:
+        """Parse files with the same header together, None for the files
+        that must be parsed again on their own"""
+        dtypes = self.dtypes(header)
+        forced = {
+            column: dtype
+            for column, dtype in dtypes.items()
+            if pd.api.types.is_float_dtype(dtype)
+        }
+        bodies = []
+        lengths = []
+        for raw in raws:
+            body = raw.split(b"\n", 1)[1]
+            if not body.endswith(b"\n"):
+                body += b"\n"
+            bodies.append(body)
+            # blank lines are skipped by the parser
+            lengths.append(sum(1 for line in body.splitlines() if line.strip()))
+        df = pd.read_csv(BytesIO(header + b"\n" + b"".join(bodies)), dtype=forced)
+        if len(df) != sum(lengths) or list(df.columns) != list(dtypes):
+            raise ValueError("the files could not be split back")
+        frames = []
+        start = 0
+        for length in lengths:
+            frame = df.iloc[start : start + length].reset_index(drop=True)
+            frames.append(frame if _same_types(frame) else None)
+            start += length
+        return frames
+
+    def _learn(self, header: bytes, df: pd.DataFrame) -> None:
+        with self._lock:
+            old = self._dtypes.get(header)
+            new = df.dtypes.to_dict()
+            if old is not None and list(old) == list(new):
+                new = {
+                    column: _widen(old[column], dtype) for column, dtype in new.items()
+                }
+            self._dtypes[header] = new
+
+
+def _header(raw: bytes) -> bytes:
+    return raw.split(b"\n", 1)[0].rstrip(b"\r")
+
+
+def _batchable(raw: bytes) -> bool:
+    # quoted fields may contain new lines, files without rows have no types
+    if b'"' in raw or b"\n" not in raw:
+        return False
+    return raw.split(b"\n", 1)[1].strip() != b""
+
+
+def _same_types(df: pd.DataFrame) -> bool:
+    """Whether a file parsed with others has the types it would have on its
+    own. Integer and boolean columns are only inferred if all the files agree,
+    a float column with only integers could have been integer, text columns
+    could have been numbers."""
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_float_dtype(values):
+            numbers = values.to_numpy()
+            if not np.isnan(numbers).any() and (np.floor(numbers) == numbers).all():
+                return False
+        elif not (
+            pd.api.types.is_integer_dtype(values) or pd.api.types.is_bool_dtype(values)
+        ):
+            return False
+    return True
+
+
+def _widen(old: object, new: object) -> object:
+    """Smallest dtype able to hold the values of two dtypes"""
+    if old == new:
+        return old
+    if pd.api.types.is_numeric_dtype(old) and pd.api.types.is_numeric_dtype(new):
+        if not (pd.api.types.is_bool_dtype(old) or pd.api.types.is_bool_dtype(new)):
+            return "float64"
+    return "str"
@@ -5,17 +5,65 @@ and their locations.
 
 from __future__ import annotations
 
+import json
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import Callable, NamedTuple
 
+import numpy as np
 import pandas as pd
 import requests
 
+from jadewa.archive import ResultsArchive
+from jadewa.catalog import Catalog, CatalogView
+from jadewa.federation import DEFAULT_SOURCES, Source, select_folders
+from jadewa.metadata import MetadataStore
+from jadewa.network import BACKGROUND, Transport, get_transport
+from jadewa.scanner import LocalScanner
+from jadewa.storage import (
+    ArchiveBackend,
+    HTTPBackend,
+    LocalBackend,
+    StorageBackend,
+    backend_for,
+)
+from jadewa.utils import CachePath
+
+GITHUB_API = "https://api.github.com"
+# parsed GitHub trees are stored here, keyed by the head commit of the branch
+SNAPSHOT_DIR = CachePath("status")
+SNAPSHOT_VERSION = 2
+GITHUB_WALK_WORKERS = 8
+METADATA_CONCURRENCY = 16
+METADATA_TIMEOUT = 5
+# prefix/_code_-_library_/benchmark
+DIR_PATTERN = re.compile(r"(?:^|/)(?P<folder>[^/]*)/(?P<benchmark>[^/]*)$")
+
+
+class StatusDelta(NamedTuple):
+    """Results added and removed after a revision of the status. A file name
+    appears once for every folder it was added to or removed from."""
+
+    # revision of the status the delta leads to
+    revision: int
+    # benchmark -> added file names
+    added: dict[str, list[str]]
+    # benchmark -> removed file names
+    removed: dict[str, list[str]]
+
 
 class Status:
     def __init__(
         self,
         status: dict[str, dict[str, dict[str, tuple[str, list[str]]]]],
         metadata_paths: pd.DataFrame = None,
+        blob_shas: dict[str, str] = None,
+        transport: Transport = None,
+        backend: StorageBackend = None,
+        metadata_store: MetadataStore = None,
     ) -> None:
         """Store information on what results are available and where.
 
@@ -27,53 +75,365 @@ class Status:
             the results and a list of all files available.
         metadata_df : pd.DataFrame, optional
             DataFrame with the metadata of the results, by default None.
+        blob_shas : dict[str, str], optional
+            git blob SHA of each results file, keyed by the file path
+            (results path + "/" + file name), and of each metadata file,
+            keyed by its metadata path, by default None.
+        transport : Transport, optional
+            transport used for the network requests, by default the one
+            shared by the application.
+        backend : StorageBackend, optional
+            storage holding the results, by default an HTTPBackend if the
+            paths are urls and a LocalBackend otherwise.
+        metadata_store : MetadataStore, optional
+            persisted table of the metadata already retrieved. By default the
+            metadata are only kept in memory.
 
         Attributes
         ----------
-        status : dict[str, dict[str, dict[str, tuple[str, list[str]]]]]
-            nested dictionary. First level is benchmark name, second level is
+        catalog : Catalog
+            compact catalog of the available results, with forward and
+            reverse indexes.
+        status : CatalogView
+            read-only view of the catalog behaving as the nested dictionary
+            given in input. First level is benchmark name, second level is
             library and third is code. The value is a tuple with the path to
             the results and a list of all files available.
         metadata_df : pd.DataFrame
             DataFrame containing the metadata of the available results. Since
             it is costly to build due to all the single requests to be made
             to the individual json files, it is initialized as None and built
-            only if needed.
+            only if needed. Only the metadata files that are not in the
+            metadata_store are requested.
+        metadata_errors : dict[str, str]
+            metadata files that could not be retrieved while building
+            metadata_df, with the reason of the failure.
+        source_errors : dict[str, str]
+            lazy sources that could not be loaded, with the reason of the
+            failure.
         """
-        self.status = status
+        self.catalog = Catalog.from_nested(status, blob_shas)
+        self.status = CatalogView(self.catalog)
         self.metadata_paths = metadata_paths
+        # files without a known SHA are always requested
+        blob_shas = blob_shas or {}
+        self.metadata_shas = {
+            path: blob_shas.get(path) for path in metadata_paths or []
+        }
+        if metadata_store is None:
+            metadata_store = MetadataStore(None)
+        self.metadata_store = metadata_store
         self.metadata_df = None
+        self.metadata_errors = {}
+        self.source_errors = {}
+        self._lazy_sources: list[tuple[Source, Callable]] = []
+        self._sources_lock = threading.Lock()
+        if transport is None:
+            transport = get_transport()
+        self.transport = transport
+        if backend is None:
+            first_path = next(
+                (
+                    path
+                    for libraries in status.values()
+                    for codes in libraries.values()
+                    for path, _ in codes.values()
+                ),
+                metadata_paths[0] if metadata_paths else "",
+            )
+            backend = backend_for(str(first_path), transport)
+        self.backend = backend
 
-    def get_metadata_df(self) -> None:
-        """Get the metadata from a list of paths
+    def get_metadata_df(
+        self,
+        max_concurrency: int = METADATA_CONCURRENCY,
+        timeout: float = METADATA_TIMEOUT,
+        progress_callback: Callable[[int, int], None] | None = None,
+    ) -> None:
+        """Get the metadata from a list of paths. Only the files that are not
+        already in the metadata_store are requested, concurrently; files that
+        cannot be retrieved are skipped and recorded in the metadata_errors
+        attribute.
 
         Parameters
         ----------
+        max_concurrency : int, optional
+            maximum number of simultaneous requests, by default
+            METADATA_CONCURRENCY
+        timeout : float, optional
+            connect and read timeout in seconds of each single request, by
+            default METADATA_TIMEOUT. The time a request is held by the rate
+            limit is not included.
+        progress_callback : Callable[[int, int], None] | None, optional
+            called with the number of completed and total requests every time
+            a request is completed, by default None.
+        """
+        paths = self.metadata_paths or []
+        to_fetch = self.metadata_store.missing(self.metadata_shas)
+        if not isinstance(self.backend, HTTPBackend):
+            rows, errors = self._read_backend_metadata(to_fetch, progress_callback)
+        else:
+            rows, errors = self._load_metadata(
+                self.transport,
+                to_fetch,
+                max_concurrency,
+                timeout,
+                progress_callback,
+            )
+        self.metadata_store.update(self.metadata_shas, rows)
+        self.metadata_errors = errors
+
+        stored = self.metadata_store.load(
+            {
+                path: sha
+                for path, sha in self.metadata_shas.items()
+                if path not in rows
+            }
+        )
+        df = pd.concat([stored, pd.DataFrame(list(rows.values()), index=list(rows))])
+        self.metadata_df = df.loc[
+            [path for path in paths if path in df.index]
+        ].reset_index(drop=True)
+
+    def metadata_cached(self) -> bool:
+        """Check whether all the metadata are in the metadata_store, i.e. if
+        the metadata table can be built without any request"""
+        return bool(self.metadata_paths) and not self.metadata_store.missing(
+            self.metadata_shas
+        )
+
+    def load_metadata_df(self) -> pd.DataFrame:
+        """Get the metadata DataFrame, building it on first access.
 
         Returns
         -------
         pd.DataFrame
-            DataFrame containing the metadata
+            metadata of the available results
         """
-        metadata_rows = []
-        for path in self.metadata_paths:
-            r = requests.get(path, timeout=5)
-            metadata_rows.append(r.json())
+        if self.metadata_df is None:
+            self.get_metadata_df()
+        return self.metadata_df
 
-        self.metadata_df = pd.DataFrame(metadata_rows)
+    def register_source(
+        self, source: Source, loader: Callable[[], tuple[dict, list, dict]]
+    ) -> None:
+        """Register a source that is loaded only when one of the benchmarks it
+        serves is first required.
+
+        Parameters
+        ----------
+        source : Source
+            the source, its merge rules are applied once it is loaded
+        loader : Callable[[], tuple[dict, list, dict]]
+            function returning the nested dictionary, metadata paths and blob
+            SHAs of the source (see _from_github)
+        """
+        with self._sources_lock:
+            self._lazy_sources.append((source, loader))
+
+    def require(self, benchmark: str) -> None:
+        """Load the lazy sources that may have results for a benchmark. The
+        sources are loaded only once and concurrently; a source that cannot
+        be loaded is recorded in source_errors.
+
+        Parameters
+        ----------
+        benchmark : str
+            Benchmark name
+        """
+        if not self._lazy_sources:
+            return
+        with self._sources_lock:
+            pending = [
+                (source, loader)
+                for source, loader in self._lazy_sources
+                if source.serves(benchmark)
+            ]
+            if not pending:
+                return
+            self._lazy_sources = [
+                item for item in self._lazy_sources if item not in pending
+            ]
+            with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+                futures = [
+                    (source, executor.submit(loader)) for source, loader in pending
+                ]
+            for source, future in futures:
+                try:
+                    status, _, blob_shas = future.result()
+                except Exception as exc:
+                    # the results of the other sources are still available
+                    self.source_errors[source.name] = repr(exc)
+                    continue
+                for folder in select_folders(
+                    status, blob_shas, source.rules, self.status
+                ):
+                    self.catalog.add_folder(*folder)
+
+    def _read_backend_metadata(
+        self,
+        paths: list[str],
+        progress_callback: Callable[[int, int], None] | None = None,
+    ) -> tuple[dict[str, dict], dict[str, str]]:
+        """Read a batch of metadata files from a local storage"""
+        contents = self.backend.read_many(paths)
+        rows = {}
+        errors = {}
+        for path in paths:
+            try:
+                rows[path] = json.loads(contents[path])
+            except Exception as exc:
+                errors[path] = repr(exc)
+        if progress_callback is not None:
+            progress_callback(len(paths), len(paths))
+        return rows, errors
 
     @staticmethod
-    def _github_walk(owner: str, repo: str, branch: str = "main"):
-        url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/{branch}?recursive=1"
-        r = requests.get(url, timeout=10)
+    def _load_metadata(
+        transport: Transport,
+        paths: list[str],
+        max_concurrency: int,
+        timeout: float,
+        progress_callback: Callable[[int, int], None] | None = None,
+    ) -> tuple[dict[str, dict], dict[str, str]]:
+        """Request all metadata files with bounded concurrency. Each request
+        is bounded by its own timeout, so all of them are finished (or
+        failed) when this returns.
+
+        Returns
+        -------
+        rows, errors : tuple[dict[str, dict], dict[str, str]]
+            content of the retrieved files (keyed by path, in the same order
+            as paths) and reason of failure of the others
+        """
+        total = len(paths)
+        fetched = {}
+        errors = {}
+
+        def fetch(path: str) -> dict:
+            # metadata are not needed to plot, leave way to the plots
+            r = transport.get(path, priority=BACKGROUND, timeout=timeout)
+            r.raise_for_status()
+            return r.json()
+
+        if paths:
+            with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+                futures = {executor.submit(fetch, path): path for path in paths}
+                for completed, future in enumerate(as_completed(futures), 1):
+                    path = futures[future]
+                    try:
+                        fetched[path] = future.result()
+                    except Exception as exc:
+                        # a single failure should not prevent the others
+                        errors[path] = repr(exc)
+                    if progress_callback is not None:
+                        progress_callback(completed, total)
+
+        return {path: fetched[path] for path in paths if path in fetched}, errors
+
+    @staticmethod
+    def _github_tree(
+        owner: str,
+        repo: str,
+        sha: str,
+        recursive: bool = True,
+        transport: Transport = None,
+    ) -> dict:
+        if transport is None:
+            transport = get_transport()
+        url = f"{GITHUB_API}/repos/{owner}/{repo}/git/trees/{sha}"
+        if recursive:
+            url = url + "?recursive=1"
+        r = transport.get(url)
         r.raise_for_status()
-        data = r.json()
+        return r.json()
 
-        return data["tree"]
+    @staticmethod
+    def _github_walk(
+        owner: str,
+        repo: str,
+        branch: str = "main",
+        max_workers: int = GITHUB_WALK_WORKERS,
+        transport: Transport = None,
+    ) -> list[dict]:
+        """Get all the entries of a GitHub repository tree.
+
+        The recursive listing of the GitHub API is truncated when the
+        repository is too large. In that case the subtrees (e.g. the
+        _code_-_library_ folders) are listed separately and in parallel, going
+        deeper only where the listing is still truncated.
+
+        Parameters
+        ----------
+        owner : str
+            Owner of the repository
+        repo : str
+            name of the repository
+        branch : str, optional
+            branch name (or any tree-ish), by default 'main'
+        max_workers : int, optional
+            maximum number of concurrent requests for truncated trees, by
+            default GITHUB_WALK_WORKERS
+        transport : Transport, optional
+            transport used for the requests, by default the shared one
+
+        Returns
+        -------
+        list[dict]
+            entries of the tree, with paths relative to the repository root
+        """
+        data = Status._github_tree(owner, repo, branch, transport=transport)
+        if not data.get("truncated", False):
+            return data["tree"]
+
+        entries = []
+        # (tree-ish, path prefix) of the trees whose listing was truncated
+        truncated = [(branch, "")]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while truncated:
+                # list the direct children of the truncated trees
+                listings = executor.map(
+                    lambda item: Status._github_tree(
+                        owner, repo, item[0], False, transport
+                    ),
+                    truncated,
+                )
+                subtrees = []
+                for (_, prefix), listing in zip(truncated, listings):
+                    for entry in listing["tree"]:
+                        entry = dict(entry, path=prefix + entry["path"])
+                        entries.append(entry)
+                        if entry["type"] == "tree":
+                            subtrees.append(entry)
+
+                # and then walk all the subtrees recursively
+                listings = executor.map(
+                    lambda entry: Status._github_tree(
+                        owner, repo, entry["sha"], True, transport
+                    ),
+                    subtrees,
+                )
+                truncated = []
+                for subtree, listing in zip(subtrees, listings):
+                    prefix = subtree["path"] + "/"
+                    if listing.get("truncated", False):
+                        truncated.append((subtree["sha"], prefix))
+                        continue
+                    for entry in listing["tree"]:
+                        entries.append(dict(entry, path=prefix + entry["path"]))
+
+        return entries
 
     @staticmethod
-    def _from_github(owner: str, repo: str, branch: str = "main") -> tuple[dict, list]:
-        """Create a Status object parsing all files contained in a GitHub repository
+    def _github_head(
+        owner: str,
+        repo: str,
+        branch: str = "main",
+        etag: str | None = None,
+        transport: Transport = None,
+    ) -> tuple[str | None, str | None]:
+        """Get the SHA of the head commit of a branch with a lightweight
+        request.
 
         Parameters
         ----------
@@ -83,85 +443,242 @@ class Status:
             name of the repository
         branch : str, optional
             branch name, by default 'main'
+        etag : str | None, optional
+            ETag of a previous answer. If provided, a conditional request is
+            made, by default None.
+        transport : Transport, optional
+            transport used for the request, by default the shared one
 
         Returns
         -------
-        status, metadata_paths : tuple[dict, list]
-            nested dictionary and list of metadata paths to build the Status object
+        sha, etag : tuple[str | None, str | None]
+            SHA of the head commit (None if it did not change since the
+            provided ETag) and ETag of the answer.
         """
-        # structure in the root directory goes _code_-_library_ -> benchmark ->
-        # -> results.
+        url = f"{GITHUB_API}/repos/{owner}/{repo}/commits/{branch}"
+        headers = {"Accept": "application/vnd.github.sha"}
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        if transport is None:
+            transport = get_transport()
+        r = transport.get(url, headers=headers)
+        if r.status_code == 304:
+            return None, etag
+        r.raise_for_status()
+        return r.text.strip(), r.headers.get("ETag")
 
-        # First get all last level directories
-        allfiles = []
-        for i in Status._github_walk(owner, repo, branch):
-            path = i["path"]
-            filename = os.path.basename(path)
-            if filename.endswith(".csv") or filename == "metadata.json":
-                allfiles.append(path)
+    @staticmethod
+    def _from_github(
+        owner: str,
+        repo: str,
+        branch: str = "main",
+        snapshot_dir: os.PathLike | None = SNAPSHOT_DIR,
+        transport: Transport = None,
+    ) -> tuple[dict, list, dict]:
+        """Create a Status object parsing all files contained in a GitHub repository.
+        The parsed tree is stored in a local snapshot, which is reused as long
+        as the head commit of the branch does not change.
 
-        # create the nested dict for the status
-        status = {}
-        metadata_paths = []
+        Parameters
+        ----------
+        owner : str
+            Owner of the repository
+        repo : str
+            name of the repository
+        branch : str, optional
+            branch name, by default 'main'
+        snapshot_dir : os.PathLike | None, optional
+            directory where the snapshots are stored, by default SNAPSHOT_DIR.
+            If None, the tree is always downloaded and parsed.
+        transport : Transport, optional
+            transport used for the requests, by default the shared one
+
+        Returns
+        -------
+        status, metadata_paths, blob_shas : tuple[dict, list, dict]
+            nested dictionary, list of metadata paths and git blob SHA of each
+            results file to build the Status object
+        """
+        if snapshot_dir is None:
+            return Status._parse_github_tree(
+                owner,
+                repo,
+                branch,
+                Status._github_walk(owner, repo, branch, transport=transport),
+            )
+
+        snapshot_file = os.path.join(snapshot_dir, f"{owner}_{repo}_{branch}.json")
+        snapshot = Status._load_snapshot(snapshot_file)
+        try:
+            head, etag = Status._github_head(
+                owner,
+                repo,
+                branch,
+                etag=snapshot["etag"] if snapshot is not None else None,
+                transport=transport,
+            )
+        except requests.RequestException:
+            # allow to start offline if a snapshot is available
+            if snapshot is None:
+                raise
+            head, etag = None, snapshot["etag"]
+
+        if snapshot is not None and head in (None, snapshot["sha"]):
+            return snapshot["status"], snapshot["metadata_paths"], snapshot["blob_shas"]
+
+        # walk the tree of the commit just checked, so that the snapshot is
+        # consistent with its key
+        tree = Status._github_walk(owner, repo, head, transport=transport)
+        status, metadata_paths, blob_shas = Status._parse_github_tree(
+            owner, repo, branch, tree
+        )
+        Status._save_snapshot(
+            snapshot_file,
+            {
+                "version": SNAPSHOT_VERSION,
+                "sha": head,
+                "etag": etag,
+                "status": status,
+                "metadata_paths": metadata_paths,
+                "blob_shas": blob_shas,
+            },
+        )
+        return status, metadata_paths, blob_shas
+
+    @staticmethod
+    def _load_snapshot(snapshot_file: os.PathLike) -> dict | None:
+        try:
+            with open(snapshot_file, "r", encoding="utf-8") as infile:
+                snapshot = json.load(infile)
+        except (OSError, ValueError):
+            return None
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            return None
+        # json does not preserve tuples
+        for libraries in snapshot["status"].values():
+            for codes in libraries.values():
+                for code, (path, files) in codes.items():
+                    codes[code] = (path, files)
+        return snapshot
+
+    @staticmethod
+    def _save_snapshot(snapshot_file: os.PathLike, snapshot: dict) -> None:
+        try:
+            os.makedirs(os.path.dirname(snapshot_file), exist_ok=True)
+            tmp_file = f"{snapshot_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as outfile:
+                json.dump(snapshot, outfile)
+            os.replace(tmp_file, snapshot_file)
+        except OSError:
+            # the snapshot is only an optimization
+            pass
+
+    @staticmethod
+    def _parse_github_tree(
+        owner: str, repo: str, branch: str, tree: list[dict]
+    ) -> tuple[dict, list, dict]:
+        """Parse the entries of a GitHub tree.
+
+        Parameters
+        ----------
+        owner : str
+            Owner of the repository
+        repo : str
+            name of the repository
+        branch : str
+            branch name
+        tree : list[dict]
+            entries of the tree as returned by the GitHub API
+
+        Returns
+        -------
+        status, metadata_paths, blob_shas : tuple[dict, list, dict]
+            nested dictionary, list of metadata paths and git blob SHA of each
+            results file to build the Status object
+        """
         start_url = f"https://github.com/{owner}/{repo}/raw/{branch}/"
-        for path in allfiles:
-            pieces = path.split("/")
-            # handle libraries with hyphens and spaces in the name differently
-            if len(pieces[-3].split("-")) > 2:
-                library = (
-                    pieces[-3].split("-")[-2] + "-" + pieces[-3].split("-")[-1]
-                ).replace("_", "")
-            else:
-                library = (
-                    pieces[-3]
-                    .split("-")[-1]
-                    .replace("_", "")
-                    .replace("%20", " ")
-                    .replace("%2B", "+")
-                )
-            benchmark = pieces[-2]
-            code = pieces[-3].split("-")[0].replace("_", "")
-            file = pieces[-1]
-            # store the .csv files
-            if file.endswith(".csv"):
-                if benchmark not in status:
-                    status[benchmark] = {}
-                if library not in status[benchmark]:
-                    status[benchmark][library] = {}
-                if code not in status[benchmark][library]:
-                    rel_path = start_url + os.path.dirname(path)
-                    status[benchmark][library][code] = (rel_path, [])
-                status[benchmark][library][code][1].append(file)
-            if file == "metadata.json":
-                json_path = (
-                    start_url + os.path.dirname(path) + r"/metadata.json?raw=true"
-                )
-                # r = requests.get(json_path, timeout=5)
-                # metadata_rows.append(r.json())
-                metadata_paths.append(json_path)
-        # df = pd.DataFrame(metadata_rows)
+        return _parse_paths(
+            [i["path"] for i in tree],
+            [i.get("sha") for i in tree],
+            start_url,
+            metadata_suffix=r"?raw=true",
+        )
 
-        return status, metadata_paths
-    
     @classmethod
-    def from_github(cls) -> Status:
+    def from_github(
+        cls,
+        snapshot_dir: os.PathLike | None = SNAPSHOT_DIR,
+        transport: Transport = None,
+        sources: tuple[Source, ...] = DEFAULT_SOURCES,
+        metadata_store: MetadataStore = None,
+    ) -> Status:
         """Create a Status object parsing all files contained in the various
         GitHub repositories
+
+        Parameters
+        ----------
+        snapshot_dir : os.PathLike | None, optional
+            directory where the parsed repositories are stored between
+            sessions, by default SNAPSHOT_DIR. If None, no snapshot is used.
+        transport : Transport, optional
+            transport used for all the requests, by default the one shared by
+            the application.
+        sources : tuple[Source, ...], optional
+            repositories providing the results and how they are merged, by
+            default DEFAULT_SOURCES. The sources that are not lazy are fetched
+            concurrently, the lazy ones when a benchmark is required.
+        metadata_store : MetadataStore, optional
+            persisted table of the metadata already retrieved. By default the
+            metadata are only kept in memory.
         """
-        status_dict, metadata_paths = cls._from_github("JADE-V-V", "JADE-RAW-RESULTS", branch="main")
-        additional_status, _ = cls._from_github("IAEA-NDS", "open-benchmarks", branch="main")
-        # Merge the two status dictionaries
-        for benchmark, libraries in additional_status.items():
-            if benchmark not in status_dict:
-                # there is no point in getting exp data if no computational is available
-                continue
-            additional_exp = libraries['expresults']['expresults']
-            status_dict[benchmark]['exp'] = {'exp': additional_exp}
-
-        return cls(status_dict, metadata_paths)
+
+        def load(source: Source) -> tuple[dict, list, dict]:
+            return cls._from_github(
+                source.owner,
+                source.repo,
+                branch=source.branch,
+                snapshot_dir=snapshot_dir,
+                transport=transport,
+            )
+
+        eager = [source for source in sources if not source.lazy]
+        with ThreadPoolExecutor(max_workers=max(len(eager), 1)) as executor:
+            loaded = list(zip(eager, executor.map(load, eager)))
+        # the sources taken as they are come first, the merge rules refer to
+        # their benchmarks
+        loaded.sort(key=lambda item: item[0].rules is not None)
+
+        status_dict, metadata_paths, blob_shas = {}, [], {}
+        for source, (source_status, source_metadata, source_shas) in loaded:
+            if source.rules is None:
+                metadata_paths.extend(source_metadata)
+                blob_shas.update(source_shas)
+            for benchmark, library, code, path, files, shas in select_folders(
+                source_status, source_shas, source.rules, status_dict
+            ):
+                status_dict.setdefault(benchmark, {}).setdefault(library, {})[
+                    code
+                ] = (path, files)
+                if source.rules is not None:
+                    blob_shas.update(
+                        (f"{path}/{file}", sha) for file, sha in zip(files, shas)
+                    )
+
+        status = cls(
+            status_dict,
+            metadata_paths,
+            blob_shas,
+            transport=transport,
+            backend=HTTPBackend(transport),
+            metadata_store=metadata_store,
+        )
+        for source in sources:
+            if source.lazy:
+                status.register_source(source, partial(load, source))
+        return status
 
     @classmethod
-    def from_root(cls, root: os.PathLike) -> Status:
+    def from_root(cls, root: os.PathLike, scanner: LocalScanner = None) -> Status:
         """Create a Status object parsing all files contained in a directory
         tree.
 
@@ -169,6 +686,11 @@ class Status:
         ----------
         root : os.PathLike
             Path to the root directory
+        scanner : LocalScanner, optional
+            scanner used to list the directory tree, by default a new one
+            that lists the directories in parallel. Give a scanner with a
+            cache_dir to reuse the listings of the unchanged directories
+            between sessions.
 
         Returns
         -------
@@ -177,33 +699,23 @@ class Status:
         """
         # structure in the root directory goes _code_-_library_ -> benchmark ->
         # -> results.
+        backend = LocalBackend(root, scanner)
+
+        # First get all last level directories, retaining only .csv files
+        allfiles = backend.list()
 
-        # First get all last level directories
-        allfiles = []
-        for i in os.walk(root):
-            if any(f.endswith(".csv") for f in i[2]):
-                allfiles.append(i)
+        # parse each distinct _code_-_library_ folder only once
+        pieces = [path.split(os.sep) for path, _ in allfiles]
+        parsed = {
+            folder: _parse_local_folder(folder)
+            for folder in dict.fromkeys(piece[-2] for piece in pieces)
+        }
 
         # build a flat dict
         status = {}
-        for path, _, files in allfiles:
-            path = os.path.normpath(path)
-            pieces = path.split(os.sep)
-            # Extract code and library from pieces[-2] which has format _code_-_library_
-            # Split on the first hyphen to separate code from library
-            code_library = pieces[-2]
-            # Find the position of the separator (hyphen between code and library)
-            # The format is _code_-_library_, so we split on "-" and take first as code, rest as library
-            parts = code_library.split("-", 1)  # Split on first hyphen only
-            code = parts[0].replace("_", "")
-            library = parts[1].replace("_", "").replace("%20", " ").replace("%2B", "+")
-
-            benchmark = pieces[-1]
-            # retain only .csv files
-            newfiles = []
-            for file in files:
-                if file.endswith(".csv"):
-                    newfiles.append(file)
+        for (path, newfiles), piece in zip(allfiles, pieces):
+            code, library = parsed[piece[-2]]
+            benchmark = piece[-1]
             status[benchmark, library, code] = (path, newfiles)
 
         # unflatten the dict
@@ -217,7 +729,43 @@ class Status:
 
             nested_status[benchmark][library][code] = value
 
-        return cls(nested_status)
+        return cls(nested_status, backend=backend)
+
+    @classmethod
+    def from_archive(
+        cls, archive: os.PathLike | str | ResultsArchive, transport: Transport = None
+    ) -> Status:
+        """Create a Status object indexing an archive (tar, compressed tar or
+        zip) of the results repository, such as the tarball GitHub provides
+        for each branch.
+
+        Parameters
+        ----------
+        archive : os.PathLike | str | ResultsArchive
+            path or url of the archive, or the archive itself. Archives given
+            by url are downloaded with a single request.
+        transport : Transport, optional
+            transport used for the download, by default the shared one
+
+        Returns
+        -------
+        Status
+            Status object reading the results from the archive
+        """
+        if not isinstance(archive, ResultsArchive):
+            if str(archive).startswith(("http://", "https://")):
+                archive = ResultsArchive.download(archive, transport=transport)
+            else:
+                archive = ResultsArchive(archive)
+        backend = ArchiveBackend(archive)
+        names = [f"{path}/{file}" for path, files in backend.list() for file in files]
+        status, metadata_paths, _ = _parse_paths(names, [None] * len(names))
+        return cls(
+            status,
+            metadata_paths=metadata_paths,
+            transport=transport,
+            backend=backend,
+        )
 
     def get_benchmarks(self) -> list[str]:
         """Get a list of all benchmarks available
@@ -227,7 +775,7 @@ class Status:
         list[str]
             List of all benchmarks available
         """
-        return list(self.status.keys())
+        return self.catalog.benchmarks()
 
     def get_libraries(self, benchmark: str) -> list[str]:
         """Get a list of all libraries available for a given benchmark
@@ -243,8 +791,8 @@ class Status:
             List of all libraries available
         """
         # Use the pretty names
-
-        return list(self.status[benchmark].keys())
+        self.require(benchmark)
+        return self.catalog.libraries(benchmark)
 
     def get_codes(self, benchmark: str, library: str) -> list[str]:
         """Get a list of all codes available for a given library and benchmark
@@ -261,7 +809,103 @@ class Status:
         list[str]
             List of all codes available
         """
-        return list(self.status[benchmark][library].keys())
+        self.require(benchmark)
+        return self.catalog.codes(benchmark, library)
+
+    def get_blob_sha(self, path: str, csv: str) -> str | None:
+        """Get the git blob SHA of a results file, if known
+
+        Parameters
+        ----------
+        path : str
+            path to the results, as returned by get_results
+        csv : str
+            name of the file
+
+        Returns
+        -------
+        str | None
+            git blob SHA of the file or None if it is not available (e.g. for
+            local results)
+        """
+        return self.catalog.blob_sha(path, csv)
+
+    def get_blob_shas(self, benchmark: str, library: str, code: str) -> list[str | None]:
+        """Get the git blob SHA of all the results files of a given benchmark,
+        library and code
+
+        Parameters
+        ----------
+        benchmark : str
+            Benchmark name
+        library : str
+            Library name
+        code : str
+            Code name
+
+        Returns
+        -------
+        list[str | None]
+            blob SHA of each file in the order given by get_results, None
+            where it is not available
+        """
+        self.require(benchmark)
+        return self.catalog.folder_shas(benchmark, library, code)
+
+    @property
+    def revision(self) -> int:
+        """Counter increased every time results are added or replaced, e.g.
+        when a lazy source is loaded"""
+        return self.catalog.revision
+
+    def get_delta(self, since: int, benchmark: str = None) -> StatusDelta:
+        """Get the results added and removed after a given revision.
+
+        Parameters
+        ----------
+        since : int
+            revision of the status, see Status.revision. With 0 all the
+            results are returned as added.
+        benchmark : str, optional
+            if given, only the changes of this benchmark are returned
+
+        Returns
+        -------
+        StatusDelta
+            changes of the results, computed only from the folders added or
+            replaced since the revision
+        """
+        revision = self.revision
+        added: dict[str, list[str]] = {}
+        removed: dict[str, list[str]] = {}
+        changes = self.catalog.changes(since, revision, benchmark)
+        for name, _, _, new, old in changes:
+            if new:
+                added.setdefault(name, []).extend(new)
+            if old:
+                removed.setdefault(name, []).extend(old)
+        return StatusDelta(revision, added, removed)
+
+    def get_folder_version(self, benchmark: str, library: str, code: str) -> int:
+        """Get a token of the current content of the results folder of a given
+        benchmark, library and code. The token changes when the folder is
+        replaced.
+
+        Parameters
+        ----------
+        benchmark : str
+            Benchmark name
+        library : str
+            Library name
+        code : str
+            Code name
+
+        Returns
+        -------
+        int
+            version of the folder
+        """
+        return self.catalog.folder_version(benchmark, library, code)
 
     def get_results(
         self, benchmark: str, library: str, code: str
@@ -283,4 +927,194 @@ class Status:
         tuple[str, list[str]]
             Path to the results and a list of all files available
         """
-        return self.status[benchmark][library][code]
+        self.require(benchmark)
+        return self.catalog.results(benchmark, library, code)
+
+    def get_benchmarks_with_library(self, library: str) -> list[str]:
+        """Get a list of all benchmarks for which a library is available
+
+        Parameters
+        ----------
+        library : str
+            Library name
+
+        Returns
+        -------
+        list[str]
+            List of benchmarks
+        """
+        return self.catalog.benchmarks_with_library(library)
+
+    def get_benchmarks_with_code(self, code: str) -> list[str]:
+        """Get a list of all benchmarks for which a code is available
+
+        Parameters
+        ----------
+        code : str
+            Code name
+
+        Returns
+        -------
+        list[str]
+            List of benchmarks
+        """
+        return self.catalog.benchmarks_with_code(code)
+
+
+def _parse_local_folder(folder: str) -> tuple[str, str]:
+    """Get code and library from a local _code_-_library_ folder"""
+    # The format is _code_-_library_, split on the first hyphen only
+    parts = folder.split("-", 1)
+    code = parts[0].replace("_", "")
+    library = parts[1].replace("_", "").replace("%20", " ").replace("%2B", "+")
+    return code, library
+
+
+def _parse_paths(
+    paths: list[str],
+    shas: list[str | None],
+    start_url: str = "",
+    metadata_suffix: str = "",
+) -> tuple[dict, list, dict]:
+    """Parse the paths of the files of a results repository.
+
+    Parameters
+    ----------
+    paths : list[str]
+        paths of the files, relative to the root of the repository
+    shas : list[str | None]
+        git blob SHA of each file
+    start_url : str, optional
+        prefix added to the paths, by default ""
+    metadata_suffix : str, optional
+        suffix added to the paths of the metadata files, by default ""
+
+    Returns
+    -------
+    status, metadata_paths, blob_shas : tuple[dict, list, dict]
+        nested dictionary, list of metadata paths and git blob SHA of each
+        results and metadata file to build the Status object
+    """
+    # structure in the root directory goes _code_-_library_ -> benchmark ->
+    # -> results. The strings are backed by arrow so that the paths are
+    # filtered and split in batch, the directory names are then decoded
+    # once each.
+    paths = pd.Series(paths, dtype="string[pyarrow]")
+    shas = pd.Series(shas, dtype=object)
+    is_csv = paths.str.endswith(".csv")
+    is_metadata = paths.str.endswith("/metadata.json")
+    keep = (is_csv | is_metadata) & paths.str.contains("/", regex=False)
+    paths, shas = paths[keep], shas[keep]
+    is_csv, is_metadata = is_csv[keep], is_metadata[keep]
+    dirnames = paths.str.replace(r"/[^/]*$", "", regex=True)
+    files = paths.str.replace(r"^.*/", "", regex=True)
+
+    metadata_paths = (
+        start_url + dirnames[is_metadata] + "/metadata.json" + metadata_suffix
+    ).tolist()
+
+    status, blob_shas = _build_nested_status(
+        start_url, dirnames[is_csv], files[is_csv], shas[is_csv]
+    )
+    # the metadata files are identified by their SHA in the MetadataStore
+    blob_shas.update(
+        (path, sha)
+        for path, sha in zip(metadata_paths, shas[is_metadata].tolist())
+        if sha is not None
+    )
+
+    return status, metadata_paths, blob_shas
+
+
+def _decode_github_dirs(dirs: pd.Series) -> pd.DataFrame:
+    """Get benchmark, library and code from the directories of a GitHub tree.
+
+    Parameters
+    ----------
+    dirs : pd.Series
+        directories in the form prefix/_code_-_library_/benchmark
+
+    Returns
+    -------
+    pd.DataFrame
+        benchmark, library and code columns, aligned with dirs
+    """
+    decoded = dirs.str.extract(DIR_PATTERN)
+    pieces = decoded["folder"].str.split("-")
+    last = pieces.str.get(-1)
+    # handle libraries with hyphens and spaces in the name differently
+    hyphenated = (pieces.str.get(-2).fillna("") + "-" + last).str.replace("_", "")
+    plain = (
+        last.str.replace("_", "").str.replace("%20", " ").str.replace("%2B", "+")
+    )
+    decoded["library"] = hyphenated.where(pieces.str.len() > 2, plain)
+    decoded["code"] = pieces.str.get(0).str.replace("_", "")
+    return decoded[["benchmark", "library", "code"]]
+
+
+def _build_nested_status(
+    start_url: str, dirnames: pd.Series, files: pd.Series, shas: pd.Series
+) -> tuple[dict, dict]:
+    """Group the .csv files of a results repository in the nested benchmark
+    -> library -> code dictionary.
+
+    Parameters
+    ----------
+    start_url : str
+        prefix added to the paths (e.g. url of the root of the repository)
+    dirnames : pd.Series
+        directory of each file
+    files : pd.Series
+        name of each file
+    shas : pd.Series
+        git blob SHA of each file
+
+    Returns
+    -------
+    status, blob_shas : tuple[dict, dict]
+        nested dictionary and git blob SHA of each file. Benchmarks, libraries,
+        codes and files are kept in order of first appearance and the path of
+        a benchmark/library/code is the directory of its first file.
+    """
+    status = {}
+    blob_shas = {}
+    if len(files) == 0:
+        return status, blob_shas
+
+    # decode each distinct directory only once
+    dir_ids, dirs = pd.factorize(dirnames)
+    decoded = _decode_github_dirs(pd.Series(dirs))
+    # directories mapping to the same benchmark/library/code are merged, the
+    # groups are numbered in order of first appearance
+    dir_groups = decoded.groupby(
+        ["benchmark", "library", "code"], sort=False
+    ).ngroup()
+    group_ids = dir_groups.to_numpy()[dir_ids]
+    # files that are not in a _code_-_library_/benchmark folder (no group)
+    # are skipped
+    valid = group_ids >= 0
+    if not valid.all():
+        group_ids, dir_ids = group_ids[valid].astype(np.intp), dir_ids[valid]
+        files, shas = files[valid], shas[valid]
+        if len(files) == 0:
+            return status, blob_shas
+    order = np.argsort(group_ids, kind="stable")
+    bounds = np.flatnonzero(np.diff(group_ids[order])) + 1
+    starts = np.concatenate([[0], bounds])
+    stops = np.concatenate([bounds, [len(order)]])
+
+    # the path of a group is the directory of its first file
+    first_dirs = dir_ids[order[starts]]
+    rows = decoded.to_numpy(dtype=object)
+    names = files.to_numpy(dtype=object)[order]
+    for first_dir, start, stop in zip(first_dirs, starts, stops):
+        benchmark, library, code = rows[first_dir]
+        status.setdefault(benchmark, {}).setdefault(library, {})[code] = (
+            start_url + dirs[first_dir],
+            names[start:stop].tolist(),
+        )
+
+    group_paths = pd.Series(dirs).take(first_dirs[group_ids])
+    keys = start_url + group_paths + "/" + files.set_axis(group_paths.index)
+    blob_shas = dict(zip(keys.tolist(), shas.tolist()))
+    return status, blob_shas
@@ -0,0 +1,287 @@
+"""Storage backends holding the raw results.
+
+Status and Processor never touch the files directly, they go through a
+StorageBackend that knows how to list the results, read them (one at a time
+or in batch) and tell when they changed. The locations handled by a backend
+are the folder paths stored in the Status joined with the file names through
+StorageBackend.join. Three backends are available:
+
+- LocalBackend: a local directory tree (e.g. a mirror of the results);
+- HTTPBackend: raw files served over HTTP (GitHub or any stand-in server);
+- ArchiveBackend: a tar or zip archive of the results repository.
+"""
+
+from __future__ import annotations
+
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from jadewa.archive import ResultsArchive
+from jadewa.network import INTERACTIVE, RateLimitError, Transport, get_transport
+from jadewa.scanner import LocalScanner
+
+DEFAULT_READ_WORKERS = 8
+
+
+class FileStat(NamedTuple):
+    """Size of a file and a token that changes when its content changes"""
+
+    size: int | None
+    version: str | None
+
+
+class StorageBackend(ABC):
+    """Interface of the storages of the raw results"""
+
+    @abstractmethod
+    def list(self) -> list[tuple[str, list[str]]]:
+        """Get all the folders containing results files.
+
+        Returns
+        -------
+        list[tuple[str, list[str]]]
+            path of each folder and names of the results files it contains
+        """
+
+    @abstractmethod
+    def join(self, path: str, name: str) -> str:
+        """Get the location of a file given its folder and name"""
+
+    @abstractmethod
+    def read(self, location: str) -> bytes:
+        """Read the content of a file.
+
+        Parameters
+        ----------
+        location : str
+            location of the file, see join
+
+        Returns
+        -------
+        bytes
+            content of the file
+        """
+
+    @abstractmethod
+    def stat(self, location: str) -> FileStat:
+        """Get size and version of a file"""
+
+    def read_many(
+        self,
+        locations: list[str],
+        max_workers: int = DEFAULT_READ_WORKERS,
+        priority: int = INTERACTIVE,
+    ) -> dict[str, bytes | None]:
+        """Read a batch of files. By default they are read concurrently,
+        backends override this when they can do better.
+
+        Parameters
+        ----------
+        locations : list[str]
+            locations of the files
+        max_workers : int, optional
+            maximum number of files read concurrently, by default
+            DEFAULT_READ_WORKERS
+        priority : int, optional
+            priority of the requests of remote storages, INTERACTIVE or
+            BACKGROUND, by default INTERACTIVE
+
+        Returns
+        -------
+        dict[str, bytes | None]
+            content of each file, None if it could not be read
+        """
+        locations = list(dict.fromkeys(locations))
+
+        def read(location: str) -> bytes | None:
+            try:
+                return self._read(location, priority)
+            except RateLimitError:
+                # it applies to the whole batch
+                raise
+            except Exception:
+                # a single failure should not prevent the others
+                return None
+
+        if max_workers <= 1 or len(locations) <= 1:
+            return {location: read(location) for location in locations}
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(locations))
+        ) as executor:
+            return dict(zip(locations, executor.map(read, locations)))
+
+    def _read(self, location: str, priority: int) -> bytes:
+        # only remote storages make use of the priority
+        return self.read(location)
+
+    def cache_key(self, location: str) -> str:
+        """Key identifying the current content of a file in a cache"""
+        version = self.stat(location).version
+        if version is None:
+            return location
+        return f"{location}:{version}"
+
+
+class LocalBackend(StorageBackend):
+    def __init__(
+        self, root: os.PathLike | None = None, scanner: LocalScanner = None
+    ) -> None:
+        """Results stored in a local directory tree.
+
+        Parameters
+        ----------
+        root : os.PathLike | None, optional
+            root of the tree, only needed to list the results, by default None
+        scanner : LocalScanner, optional
+            scanner used to list the tree, by default a new one that does
+            not cache the listings
+        """
+        self.root = root
+        if scanner is None:
+            scanner = LocalScanner()
+        self.scanner = scanner
+
+    def list(self) -> list[tuple[str, list[str]]]:
+        if self.root is None:
+            raise ValueError("the root of the local backend is not defined")
+        return self.scanner.scan(self.root)
+
+    def join(self, path: str, name: str) -> str:
+        return path + os.sep + name
+
+    def read(self, location: str) -> bytes:
+        with open(location, "rb") as infile:
+            return infile.read()
+
+    def stat(self, location: str) -> FileStat:
+        # local files may change, the mtime tracks the modifications
+        stat = os.stat(location)
+        return FileStat(stat.st_size, str(stat.st_mtime_ns))
+
+
+class HTTPBackend(StorageBackend):
+    def __init__(
+        self,
+        transport: Transport = None,
+        listing: list[tuple[str, list[str]]] = None,
+    ) -> None:
+        """Raw results served over HTTP, e.g. by GitHub.
+
+        Parameters
+        ----------
+        transport : Transport, optional
+            transport used for the requests, by default the shared one
+        listing : list[tuple[str, list[str]]], optional
+            folders (urls) and results files, if known. A plain HTTP server
+            cannot be listed, the GitHub trees are listed by the Status.
+        """
+        if transport is None:
+            transport = get_transport()
+        self.transport = transport
+        self.listing = listing
+
+    def list(self) -> list[tuple[str, list[str]]]:
+        if self.listing is None:
+            raise NotImplementedError("the HTTP backend has no listing")
+        return self.listing
+
+    def join(self, path: str, name: str) -> str:
+        return (
+            f"{path}/{name}".replace(" ", "%20")
+            .replace("[", "%5B")
+            .replace("]", "%5D")
+        )
+
+    def read(self, location: str) -> bytes:
+        return self._read(location, INTERACTIVE)
+
+    def _read(self, location: str, priority: int) -> bytes:
+        r = self.transport.get(location, priority=priority)
+        r.raise_for_status()
+        return r.content
+
+    def read_many(
+        self,
+        locations: list[str],
+        max_workers: int = DEFAULT_READ_WORKERS,
+        priority: int = INTERACTIVE,
+    ) -> dict[str, bytes | None]:
+        # the transport keeps a bounded number of connections per host
+        max_workers = min(max_workers, self.transport.pool_size)
+        return super().read_many(locations, max_workers, priority)
+
+    def stat(self, location: str) -> FileStat:
+        # only the headers are read
+        with self.transport.get(location, stream=True) as r:
+            r.raise_for_status()
+            size = r.headers.get("Content-Length")
+            return FileStat(
+                int(size) if size is not None else None, r.headers.get("ETag")
+            )
+
+    def cache_key(self, location: str) -> str:
+        # a request per file just to validate the cache would defeat it, the
+        # files are identified by their blob SHA when it is known
+        return location
+
+
+class ArchiveBackend(StorageBackend):
+    def __init__(self, archive: ResultsArchive) -> None:
+        """Results read from an archive of the results repository.
+
+        Parameters
+        ----------
+        archive : ResultsArchive
+            indexed archive
+        """
+        self.archive = archive
+
+    def list(self) -> list[tuple[str, list[str]]]:
+        # the metadata.json files are listed together with the results
+        folders = {}
+        for name in self.archive.names():
+            path, _, file = name.rpartition("/")
+            folders.setdefault(path, []).append(file)
+        return list(folders.items())
+
+    def join(self, path: str, name: str) -> str:
+        return f"{path}/{name}"
+
+    def read(self, location: str) -> bytes:
+        return self.archive.read(location)
+
+    def read_many(
+        self,
+        locations: list[str],
+        max_workers: int = DEFAULT_READ_WORKERS,
+        priority: int = INTERACTIVE,
+    ) -> dict[str, bytes | None]:
+        # members are read in the order they are stored in the archive
+        return self.archive.read_many(locations)
+
+    def stat(self, location: str) -> FileStat:
+        # the archive is immutable
+        return FileStat(self.archive.size(location), self.archive.path)
+
+
+def backend_for(path: str, transport: Transport = None) -> StorageBackend:
+    """Get the backend suited to a results path: HTTPBackend for urls and
+    LocalBackend otherwise.
+
+    Parameters
+    ----------
+    path : str
+        path of a results folder
+    transport : Transport, optional
+        transport of the HTTPBackend, by default the shared one
+
+    Returns
+    -------
+    StorageBackend
+        backend able to read the results in path
+    """
+    if path.startswith(("http://", "https://")):
+        return HTTPBackend(transport)
+    return LocalBackend()
@@ -5,7 +5,9 @@ from __future__ import annotations
 import json
 import os
 import re
+from typing import Callable
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 from f4enix.input.libmanager import LibManager
@@ -52,6 +54,37 @@ except FileNotFoundError:
 GITHUB_HEADERS = {"Authorization": f"token {github_token}"}
 
 
+class CachePath(os.PathLike):
+    def __init__(self, *parts: str) -> None:
+        """Path in the local directory where downloaded results can be stored
+        between sessions. The directory is JADEWA_CACHE_DIR if set,
+        ~/.cache/jadewa otherwise, and it is read every time the path is
+        used rather than at import.
+
+        Parameters
+        ----------
+        *parts : str
+            path relative to the cache directory
+        """
+        self.parts = parts
+
+    def __fspath__(self) -> str:
+        root = os.environ.get("JADEWA_CACHE_DIR") or os.path.join(
+            os.path.expanduser("~"), ".cache", "jadewa"
+        )
+        return os.path.join(root, *self.parts)
+
+    def __str__(self) -> str:
+        return self.__fspath__()
+
+    def __repr__(self) -> str:
+        return f"CachePath({self.__fspath__()!r})"
+
+
+# local directory where downloaded results can be stored between sessions
+CACHE_DIR = CachePath()
+
+
 def sorting_func(option: str) -> int:
     """sorting function for the pretty names of materials and isotopes"""
     # extract the isotope/material number from the pretty name
@@ -81,30 +114,33 @@ def string_ints_converter(df: pd.DataFrame, column: str) -> pd.DataFrame:
     pd.DataFrame
         DataFrame with the selected columns converted to string
     """
+    values = df[column]
+    if pd.api.types.is_numeric_dtype(values):
+        # typed at parse time, nothing to convert
+        return df
     try:
-        df[column].astype(float)
+        values.astype(float)
         return df
     except ValueError:
-        values = df[column].values
-        new_values = []
-        for value in values:
-            try:
-                new_values.append(str(int(float(value))))
-            except ValueError:
-                new_values.append(value)
-        df[column] = new_values
+        numbers = pd.to_numeric(values, errors="coerce")
+        # truncated as int() would do, non numeric values are left untouched
+        integers = numbers.notna() & np.isfinite(numbers)
+        new_values = values.astype(object)
+        new_values[integers] = numbers[integers].astype(np.int64).astype(str)
+        df[column] = new_values.tolist()
         return df
 
 
 def get_info_dfs(
-    metadata_df: pd.DataFrame,
+    metadata_df: pd.DataFrame | Callable[[], pd.DataFrame],
 ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """Get the metadata DataFrames to be displayed in the app.
 
     Parameters
     ----------
-    metadata_df : pd.DataFrame
-        metadata DataFrame
+    metadata_df : pd.DataFrame | Callable[[], pd.DataFrame]
+        metadata DataFrame, or a function loading it (e.g.
+        Status.load_metadata_df) that is called only now
 
     Returns
     -------
@@ -113,6 +149,8 @@ def get_info_dfs(
         third are the pivot tables showing all the available raw data divided
         by activation and non-activation benchmarks.
     """
+    if callable(metadata_df):
+        metadata_df = metadata_df()
     df = metadata_df
     sorted_df = df.set_index(["benchmark_name", "library", "code"])
 
@@ -0,0 +1,106 @@
+"""Test the archive module"""
+
+import os
+import tarfile
+import zipfile
+from importlib.resources import files
+
+import pandas as pd
+import pytest
+
+import tests.resources.status as res
+from jadewa.archive import ResultsArchive
+from jadewa.cache import CSVCache
+from jadewa.network import Transport
+from jadewa.processor import Processor
+from jadewa.status import Status
+
+# GitHub tarballs wrap the repository in a top level folder
+PREFIX = "JADE-V-V-JADE-RAW-RESULTS-0123abc"
+
+
+def make_archive(root, archive_path: str, kind: str) -> None:
+    """Archive a results root as GitHub does"""
+    if kind == "zip":
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            for path, _, filenames in os.walk(root):
+                for file in filenames:
+                    full_path = os.path.join(path, file)
+                    name = os.path.relpath(full_path, root).replace(os.sep, "/")
+                    archive.write(full_path, f"{PREFIX}/{name}")
+        return
+    mode = {"tar": "w", "tar.gz": "w:gz"}[kind]
+    with tarfile.open(archive_path, mode) as archive:
+        archive.add(root, arcname=PREFIX)
+
+
+def flatten(status: Status) -> dict:
+    """benchmark, library, code -> files of a status, regardless of the order
+    in which the files were listed"""
+    return {
+        (benchmark, library, code): sorted(files)
+        for benchmark, libraries in status.status.items()
+        for library, codes in libraries.items()
+        for code, (_, files) in codes.items()
+    }
+
+
+class TestResultsArchive:
+    """Test ResultsArchive class and the archive-backed Status"""
+
+    @pytest.fixture
+    def root(self):
+        return str(files(res).joinpath("root"))
+
+    @pytest.mark.parametrize("kind", ["tar", "tar.gz", "zip"])
+    def test_from_archive(self, tmp_path, root, kind):
+        """The archive gives the same results of the extracted folder"""
+        archive_path = str(tmp_path / f"results.{kind}")
+        make_archive(root, archive_path, kind)
+        status = Status.from_archive(archive_path)
+        expected = Status.from_root(root)
+        assert flatten(status) == flatten(expected)
+
+        path, csvs = status.get_results("Sphere", "FENDL 3.2b", "mcnp")
+        assert path == f"{PREFIX}/_mcnp_-_FENDL 3.2b_/Sphere"
+        processor = Processor(status, cache=CSVCache(cache_dir=None))
+        local_processor = Processor(expected, cache=CSVCache(cache_dir=None))
+        local_path, _ = expected.get_results("Sphere", "FENDL 3.2b", "mcnp")
+        for csv in csvs[:5]:
+            df = processor._get_csv(path, csv)
+            pd.testing.assert_frame_equal(df, local_processor._get_csv(local_path, csv))
+
+    def test_metadata(self, tmp_path):
+        """Metadata are read from the archive"""
+        root = tmp_path / "root" / "_mcnp_-_FENDL 3.2b_" / "Sphere"
+        root.mkdir(parents=True)
+        (root / "a.csv").write_text("x,y\n1,2\n")
+        (root / "metadata.json").write_text('{"code": "mcnp"}')
+        archive_path = str(tmp_path / "results.tar.gz")
+        make_archive(tmp_path / "root", archive_path, "tar.gz")
+
+        with ResultsArchive(archive_path) as archive:
+            assert archive.kind == "compressed tar"
+            status = Status.from_archive(archive)
+            assert status.metadata_paths == [
+                f"{PREFIX}/_mcnp_-_FENDL 3.2b_/Sphere/metadata.json"
+            ]
+            status.get_metadata_df()
+            assert status.metadata_df["code"].to_list() == ["mcnp"]
+            assert status.metadata_errors == {}
+
+    def test_download(self, tmp_path, fake_server, root):
+        """An archive given by url is downloaded with a single request"""
+        archive_path = str(tmp_path / "results.tar.gz")
+        make_archive(root, archive_path, "tar.gz")
+        with open(archive_path, "rb") as infile:
+            fake_server.add("/results.tar.gz", infile.read())
+
+        archive = ResultsArchive.download(
+            fake_server.url + "/results.tar.gz",
+            archive_dir=tmp_path / "archives",
+            transport=Transport(),
+        )
+        status = Status.from_archive(archive)
+        assert flatten(status) == flatten(Status.from_root(root))
+        assert fake_server.count("/results.tar.gz") == 1
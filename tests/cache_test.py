@@ -0,0 +1,151 @@
+"""Test the cache module"""
+
+import os
+from io import BytesIO
+
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+from jadewa.cache import CSVCache, FigureCache
+
+CSV_CONTENT = b"Energy,Value,Error\n1,2.0,0.1\n2,3.0,0.2\n"
+
+
+class TestCSVCache:
+    """Test CSVCache class"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """Fixture for a cache with a temporary disk store"""
+        return CSVCache(cache_dir=tmp_path)
+
+    def test_memory_hit(self, cache: CSVCache):
+        """A second request for the same key is served from memory"""
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return CSV_CONTENT
+
+        df = cache.get_or_load("key", loader)
+        assert isinstance(df, pd.DataFrame)
+        # modifying the returned df should not alter the cache
+        df["Value"] = 0
+        df = cache.get_or_load("key", loader)
+        assert df["Value"].to_list() == [2.0, 3.0]
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_disk_hit(self, tmp_path, cache: CSVCache):
+        """Files with a sha are stored on disk and reused by a new cache"""
+        cache.get_or_load("abcdef", lambda: CSV_CONTENT, sha="abcdef")
+        assert os.path.exists(os.path.join(tmp_path, "ab", "abcdef"))
+
+        new_cache = CSVCache(cache_dir=tmp_path)
+
+        def loader():
+            raise AssertionError("the file should not be downloaded again")
+
+        df = new_cache.get_or_load("abcdef", loader, sha="abcdef")
+        assert len(df) == 2
+        assert new_cache.stats()["disk_hits"] == 1
+        assert new_cache.stats()["misses"] == 0
+
+    def test_lru_eviction(self, cache: CSVCache):
+        """The least recently used entries are evicted when the size limit is
+        exceeded"""
+        cache.get_or_load("a", lambda: CSV_CONTENT)
+        cache.max_bytes = cache.nbytes * 2
+        cache.get_or_load("b", lambda: CSV_CONTENT)
+        # refresh a, so that b becomes the least recently used
+        cache.get_or_load("a", lambda: CSV_CONTENT)
+        cache.get_or_load("c", lambda: CSV_CONTENT)
+        assert cache.stats()["entries"] == 2
+        assert cache.nbytes <= cache.max_bytes
+        cache.get_or_load("a", lambda: CSV_CONTENT)
+        assert cache.stats()["hits"] == 2
+        cache.get_or_load("b", lambda: CSV_CONTENT)
+        assert cache.stats()["misses"] == 4
+
+    def test_loader_error(self, cache: CSVCache):
+        """Errors of the loader are propagated and nothing is cached"""
+
+        def loader():
+            raise FileNotFoundError
+
+        with pytest.raises(FileNotFoundError):
+            cache.get_or_load("a", loader)
+        assert cache.stats()["entries"] == 0
+
+    def test_get_many(self, tmp_path, cache: CSVCache):
+        """Missing files are loaded in a single call and parsed together"""
+        cache.get_or_load("a", lambda: CSV_CONTENT)
+        calls = []
+
+        def loader(keys):
+            calls.append(keys)
+            return {"b": CSV_CONTENT, "c": None}
+
+        def parser(raws):
+            calls.append(sorted(raws))
+            return {key: pd.read_csv(BytesIO(raw)) for key, raw in raws.items()}
+
+        dfs = cache.get_many({"a": None, "b": "sha1", "c": None}, loader, parser)
+        assert list(dfs) == ["a", "b", "c"]
+        assert dfs["b"]["Value"].to_list() == [2.0, 3.0]
+        assert dfs["c"] is None
+        assert calls == [["b", "c"], ["b"]]
+        assert cache.stats()["hits"] == 1
+        # b was stored on disk by its sha
+        other = CSVCache(cache_dir=tmp_path)
+        dfs = other.get_many({"b": "sha1"}, loader)
+        assert dfs["b"]["Error"].to_list() == [0.1, 0.2]
+        assert other.stats()["disk_hits"] == 1
+
+    def test_variant(self, cache: CSVCache):
+        """DataFrames prepared by different parsers are kept apart"""
+        cache.get_or_load("a", lambda: CSV_CONTENT, sha="sha1")
+
+        def parser(raws):
+            return {key: pd.read_csv(BytesIO(raw)).head(1) for key, raw in raws.items()}
+
+        dfs = cache.get_many({"a": "sha1"}, dict, parser, variant="head")
+        assert len(dfs["a"]) == 1
+        assert cache.stats()["disk_hits"] == 1
+        dfs = cache.get_many({"a": "sha1"}, dict, parser, variant="head")
+        assert len(dfs["a"]) == 1
+        assert len(cache.get_many({"a": "sha1"}, dict)["a"]) == 2
+        assert cache.stats()["hits"] == 2
+
+
+class TestFigureCache:
+    """Test FigureCache class"""
+
+    @pytest.fixture
+    def figure(self):
+        return go.Figure(go.Scatter(x=[1, 2], y=[3, 4], name="lib-code"))
+
+    def test_copy(self, figure):
+        """Cached figures are returned as independent copies"""
+        cache = FigureCache()
+        assert cache.get(("a",)) is None
+        cache.put(("a",), figure)
+        figure.data[0].name = "changed"
+        copy = cache.get(("a",))
+        assert copy.data[0].name == "lib-code"
+        copy.data[0].visible = "legendonly"
+        assert cache.get(("a",)).data[0].visible is None
+        assert cache.stats() == {"hits": 2, "misses": 1, "entries": 1}
+
+    def test_lru_eviction(self, figure):
+        """The least recently used figures are evicted"""
+        cache = FigureCache(max_entries=2)
+        cache.put(("a",), figure)
+        cache.put(("b",), figure)
+        cache.get(("a",))
+        cache.put(("c",), figure)
+        assert cache.get(("b",)) is None
+        assert cache.get(("a",)) is not None
+        assert cache.get(("c",)) is not None
@@ -0,0 +1,111 @@
+"""Test the catalog module"""
+
+import pytest
+
+from jadewa.catalog import Catalog, CatalogView
+
+PREFIX = "https://github.com/o/r/raw/main/"
+STATUS = {
+    "Sphere": {
+        "FENDL 3.2b": {
+            "mcnp": (PREFIX + "_mcnp_-_FENDL 3.2b_/Sphere", ["a.csv", "b.csv"]),
+            "openmc": (PREFIX + "_openmc_-_FENDL 3.2b_/Sphere", ["a.csv"]),
+        },
+        "ENDFB-VIII.0": {
+            "mcnp": (PREFIX + "_mcnp_-_ENDFB-VIII.0_/Sphere", ["b.csv", "a.csv"]),
+        },
+    },
+    "ITER_1D": {
+        "ENDFB-VIII.0": {
+            "d1s": (PREFIX + "_d1s_-_ENDFB-VIII.0_/ITER_1D", ["c.csv"]),
+        },
+    },
+}
+SHA = "0123456789abcdef0123456789abcdef01234567"
+
+
+class TestCatalog:
+    """Test Catalog class"""
+
+    @pytest.fixture
+    def catalog(self):
+        """Fixture for the catalog of STATUS"""
+        blob_shas = {
+            PREFIX + "_mcnp_-_FENDL 3.2b_/Sphere/a.csv": SHA,
+            PREFIX + "_mcnp_-_FENDL 3.2b_/Sphere/b.csv": "b1",
+        }
+        return Catalog.from_nested(STATUS, blob_shas)
+
+    def test_view(self, catalog: Catalog):
+        """The view behaves as the original nested dictionary"""
+        view = CatalogView(catalog)
+        assert view == STATUS
+        assert list(view) == list(STATUS)
+        assert list(view["Sphere"]) == ["FENDL 3.2b", "ENDFB-VIII.0"]
+        assert list(view["Sphere"]["ENDFB-VIII.0"].items()) == list(
+            STATUS["Sphere"]["ENDFB-VIII.0"].items()
+        )
+        assert "Sphere" in view
+        assert "FENDL 3.2b" not in view["ITER_1D"]
+        assert "random" not in view
+        with pytest.raises(KeyError):
+            view["random"]
+        assert len(catalog) == 6
+
+    def test_accessors(self, catalog: Catalog):
+        """Test the forward indexes"""
+        assert catalog.benchmarks() == ["Sphere", "ITER_1D"]
+        assert catalog.libraries("Sphere") == ["FENDL 3.2b", "ENDFB-VIII.0"]
+        assert catalog.codes("Sphere", "FENDL 3.2b") == ["mcnp", "openmc"]
+        assert catalog.results("ITER_1D", "ENDFB-VIII.0", "d1s") == (
+            PREFIX + "_d1s_-_ENDFB-VIII.0_/ITER_1D",
+            ["c.csv"],
+        )
+
+    def test_reverse_indexes(self, catalog: Catalog):
+        """Test the reverse indexes"""
+        assert catalog.benchmarks_with_library("ENDFB-VIII.0") == ["Sphere", "ITER_1D"]
+        assert catalog.benchmarks_with_library("FENDL 3.2b") == ["Sphere"]
+        assert catalog.benchmarks_with_library("random") == []
+        assert catalog.benchmarks_with_code("d1s") == ["ITER_1D"]
+
+    def test_blob_sha(self, catalog: Catalog):
+        """Test the storage of the blob shas"""
+        path = PREFIX + "_mcnp_-_FENDL 3.2b_/Sphere"
+        assert catalog.blob_sha(path, "a.csv") == SHA
+        assert catalog.blob_sha(path, "b.csv") == "b1"
+        assert catalog.blob_sha(PREFIX + "_openmc_-_FENDL 3.2b_/Sphere", "a.csv") is None
+        assert catalog.blob_sha(path, "random.csv") is None
+        assert catalog.blob_sha(PREFIX + "random/Sphere", "a.csv") is None
+        assert catalog.folder_shas("Sphere", "FENDL 3.2b", "mcnp") == [SHA, "b1"]
+        assert catalog.folder_shas("Sphere", "FENDL 3.2b", "openmc") == [None]
+
+    def test_blob_sha_replaced(self, catalog: Catalog):
+        """The shas of a replaced folder are not looked up in the old one"""
+        path = PREFIX + "_mcnp_-_FENDL 3.2b_/Sphere"
+        assert catalog.blob_sha(path, "b.csv") == "b1"
+        catalog.add_folder(
+            "Sphere", "FENDL 3.2b", "mcnp", path, ["b.csv", "c.csv"], ["b2", SHA]
+        )
+        assert catalog.blob_sha(path, "b.csv") == "b2"
+        assert catalog.blob_sha(path, "c.csv") == SHA
+        assert catalog.blob_sha(path, "a.csv") is None
+
+    def test_replace_folder(self, catalog: Catalog):
+        """A folder added twice is replaced"""
+        path = PREFIX + "_d1s_-_ENDFB-VIII.0_/ITER_1D"
+        revision = catalog.revision
+        version = catalog.folder_version("ITER_1D", "ENDFB-VIII.0", "d1s")
+        sphere = catalog.folder_version("Sphere", "FENDL 3.2b", "mcnp")
+        catalog.add_folder("ITER_1D", "ENDFB-VIII.0", "d1s", path, ["c.csv", "d.csv"])
+        assert catalog.revision > revision
+        assert catalog.folder_version("ITER_1D", "ENDFB-VIII.0", "d1s") != version
+        assert catalog.folder_version("Sphere", "FENDL 3.2b", "mcnp") == sphere
+        assert list(catalog.changes(revision)) == [
+            ("ITER_1D", "ENDFB-VIII.0", "d1s", ["d.csv"], [])
+        ]
+        assert catalog.results("ITER_1D", "ENDFB-VIII.0", "d1s") == (
+            path,
+            ["c.csv", "d.csv"],
+        )
+        assert len(catalog) == 7
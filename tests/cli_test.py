@@ -0,0 +1,36 @@
+"""Test the cli module"""
+
+import os
+from importlib.resources import files
+
+import pandas as pd
+
+import tests.resources.status as res
+from jadewa.cli import main
+
+
+class TestCli:
+    """Test the command line interface"""
+
+    def test_export(self, tmp_path, capsys):
+        """The tallies of a benchmark are exported from a local folder"""
+        path = tmp_path / "oktavian.parquet"
+        root = str(files(res).joinpath("root"))
+        assert main(["--root", root, "export", "Oktavian", "-o", str(path)]) == 0
+        df = pd.read_parquet(path)
+        assert df["tally"].nunique() == 21
+        assert f"{len(df)} rows" in capsys.readouterr().out
+
+    def test_render(self, tmp_path, capsys):
+        """The figures of a shard are rendered in html"""
+        root = str(files(res).joinpath("root"))
+        output = tmp_path / "figures"
+        args = ["--root", root, "render", "-o", str(output), "--workers", "1"]
+        args += ["--plot-types", "absolute", "--shard-index", "1", "--shard-count", "2"]
+        assert main(args) == 0
+        out = capsys.readouterr().out
+        assert "0 failed" in out
+        written = [file for _, _, names in os.walk(output) for file in names]
+        assert written and all(file.endswith(".html") for file in written)
+        # Oktavian is rendered by the other shard
+        assert "Oktavian" not in os.listdir(output)
@@ -0,0 +1,111 @@
+"""Shared fixtures for the tests"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep the persistent caches of every test in its temporary directory"""
+    directory = tmp_path / "jadewa-cache"
+    monkeypatch.setenv("JADEWA_CACHE_DIR", os.fspath(directory))
+    return directory
+
+
+class FakeServer(ThreadingHTTPServer):
+    """Local HTTP server answering with pre-registered responses. It stands in
+    for GitHub in the tests."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _FakeHandler)
+        self.routes = {}
+        self.requests = []
+        self.connections = set()
+        # paths being answered and couples of paths answered at the same time
+        self.in_flight = []
+        self.overlaps = set()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def add(
+        self,
+        path: str,
+        body: bytes | str | Callable[[dict], tuple[int, bytes | str, dict]],
+        status: int = 200,
+        headers: dict[str, str] = None,
+        delay: float = 0,
+    ) -> None:
+        """Register the response for a path (query string included). The body
+        can also be a function receiving the request headers and returning
+        status, body and headers of the answer."""
+        self.routes[path] = (status, body, headers or {}, delay)
+
+    def count(self, path: str) -> int:
+        """Number of requests received for a path"""
+        return sum(1 for request_path, _ in self.requests if request_path == path)
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    # allow keep-alive connections
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # noqa: N802
+        server = self.server
+        with server.lock:
+            for other in server.in_flight:
+                server.overlaps.add(frozenset([self.path, other]))
+            server.in_flight.append(self.path)
+        try:
+            self._answer()
+        finally:
+            with server.lock:
+                server.in_flight.remove(self.path)
+
+    def _answer(self) -> None:
+        self.server.requests.append((self.path, dict(self.headers)))
+        self.server.connections.add(self.client_address)
+        try:
+            status, body, headers, delay = self.server.routes[self.path]
+        except KeyError:
+            status, body, headers, delay = 404, b"Not Found", {}, 0
+        time.sleep(delay)
+        if callable(body):
+            status, body, headers = body(dict(self.headers))
+        if isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_server():
+    """Local HTTP server, routes are registered through its add method"""
+    server = FakeServer()
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
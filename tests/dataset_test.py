@@ -0,0 +1,68 @@
+"""Test the dataset module"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from jadewa.dataset import BenchmarkDataset, DatasetStore
+
+FRAMES = {
+    ("FENDL 3.2b", "mcnp", "a.csv"): pd.DataFrame(
+        {"Energy": [1.0, 2.0], "Value": [1, 2], "Error": [0.1, 0.2]}
+    ),
+    # same column names with different types
+    ("FENDL 3.2b", "mcnp", "b.csv"): pd.DataFrame(
+        {
+            "Cells": ["a", "total"],
+            "Energy": ["x", "y"],
+            "Value": [1.5, 2.5],
+            "Error": [0.1, 0.2],
+        }
+    ),
+    # a column named as an identifier and a missing value
+    ("exp", "exp", "a.csv"): pd.DataFrame({"code": [1, 2], "Value": [1.0, None]}),
+}
+
+
+class TestDatasetStore:
+    """Test DatasetStore and BenchmarkDataset classes"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return DatasetStore(tmp_path / "datasets")
+
+    def test_read(self, store):
+        """Each file is read back as it was given"""
+        dataset = store.build("Sphere", "v1", FRAMES)
+        assert len(dataset) == 3
+        for key, df in FRAMES.items():
+            assert key in dataset
+            pd.testing.assert_frame_equal(dataset.read(*key), df)
+        assert dataset.read("FENDL 3.2b", "mcnp", "c.csv") is None
+        assert dataset.table.column("benchmark").unique().to_pylist() == ["Sphere"]
+
+    def test_mixed_types(self, store):
+        """Columns mixing types are stored as strings, keeping the missing
+        values"""
+        frames = {
+            ("exp", "exp", "c.csv"): pd.DataFrame(
+                {"Cells": [1, "total", None], "Value": [1.0, 2.0, None]}
+            )
+        }
+        df = store.build("Sphere", "v1", frames).read("exp", "exp", "c.csv")
+        assert df["Cells"].tolist()[:2] == ["1", "total"]
+        assert df["Cells"].isna().tolist() == [False, False, True]
+        assert df["Value"].isna().tolist() == [False, False, True]
+
+    def test_versions(self, store):
+        """Datasets are found on disk by data version, old ones are dropped"""
+        store.build("Sphere", "v1", FRAMES)
+        other = DatasetStore(store.directory)
+        assert isinstance(other.get("Sphere", "v1"), BenchmarkDataset)
+        assert other.get("Sphere", "v2") is None
+        assert other.get("Oktavian", "v1") is None
+
+        store.build("Sphere", "v2", {})
+        assert len(os.listdir(store.directory)) == 1
+        assert len(DatasetStore(store.directory).get("Sphere", "v2")) == 0
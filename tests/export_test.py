@@ -0,0 +1,78 @@
+"""Test the export module"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from jadewa.export import LongFormatWriter
+
+IDS = {
+    "benchmark": "Sphere",
+    "library": "FENDL 3.2b",
+    "code": "mcnp",
+    "quantity": "Flux",
+}
+CHUNKS = [
+    pd.DataFrame(
+        {**IDS, "tally": "a", "Energy": [1.0, 2.0], "Value": [1, 2], "Error": 0.1}
+    ),
+    # different x columns, Cells is an int here and a string below
+    pd.DataFrame({**IDS, "tally": "b", "Cells": [1, 2], "Value": [3.0, 4.0]}),
+    pd.DataFrame({**IDS, "tally": "c", "Cells": ["x"], "Value": [5.0], "Error": 0.3}),
+    # same columns as the first chunk
+    pd.DataFrame({**IDS, "tally": "d", "Energy": [3.0], "Value": [6], "Error": 0.4}),
+]
+
+
+class TestLongFormatWriter:
+    """Test LongFormatWriter class"""
+
+    @pytest.mark.parametrize("suffix", ["parquet", "csv"])
+    def test_write(self, tmp_path, suffix):
+        """The chunks are written in order with the union of their columns"""
+        path = tmp_path / f"out.{suffix}"
+        with LongFormatWriter(path, chunk_rows=2, spill_dir=tmp_path) as writer:
+            for chunk in CHUNKS:
+                writer.write(chunk)
+            writer.write(CHUNKS[0].iloc[:0])
+        assert writer.rows == 6
+        assert sorted(os.listdir(tmp_path)) == [f"out.{suffix}"]
+
+        if suffix == "parquet":
+            df = pd.read_parquet(path)
+        else:
+            df = pd.read_csv(path, dtype={"Cells": str})
+        assert list(df.columns) == [
+            "benchmark",
+            "library",
+            "code",
+            "tally",
+            "quantity",
+            "Energy",
+            "Cells",
+            "Value",
+            "Error",
+        ]
+        assert df["tally"].tolist() == ["a", "a", "b", "b", "c", "d"]
+        assert df["Value"].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+        assert df["Cells"].dropna().tolist() == ["1", "2", "x"]
+        assert df["Energy"].isna().tolist() == [False, False, True, True, True, False]
+        assert df["Error"].isna().sum() == 2
+
+    def test_abort(self, tmp_path):
+        """Nothing is written if the export fails"""
+        path = tmp_path / "out.parquet"
+        with pytest.raises(RuntimeError):
+            with LongFormatWriter(path, spill_dir=tmp_path) as writer:
+                writer.write(CHUNKS[0])
+                raise RuntimeError
+        assert os.listdir(tmp_path) == []
+
+    def test_format(self, tmp_path):
+        """The format is guessed from the extension"""
+        with pytest.raises(ValueError):
+            LongFormatWriter(tmp_path / "out.xlsx")
+        writer = LongFormatWriter(tmp_path / "out.xlsx", fmt="csv")
+        assert writer.close() == 0
+        assert pd.read_csv(tmp_path / "out.xlsx").empty
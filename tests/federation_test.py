@@ -0,0 +1,105 @@
+"""Test the federation module"""
+
+import pytest
+
+import jadewa.status
+from jadewa.federation import MergeRule, Source, select_folders
+from jadewa.network import Transport
+from jadewa.status import Status
+from tests.status_test import serve_fake_tree
+
+JADE_FILES = {
+    "_mcnp_-_FENDL 3.2b_/Sphere/Sphere tally 1.csv": "j1",
+    "_mcnp_-_FENDL 3.2b_/Sphere/metadata.json": "j2",
+    "_mcnp_-_FENDL 3.2b_/Oktavian/Oktavian tally 1.csv": "j3",
+}
+EXP_FILES = {
+    "_expresults_-_expresults_/Oktavian/Oktavian tally 1.csv": "e1",
+    "_expresults_-_expresults_/Tiara-BC/Tiara-BC tally 1.csv": "e2",
+    "_other_-_other_/Oktavian/Oktavian tally 1.csv": "e3",
+}
+EXP_RULES = (MergeRule("expresults", "expresults", "exp", "exp"),)
+
+
+def slow_down(server, owner: str, repo: str, delay: float) -> str:
+    """Delay the recursive listing of a repository, returns its path"""
+    path = f"/repos/{owner}/{repo}/git/trees/main?recursive=1"
+    status, body, headers, _ = server.routes[path]
+    server.routes[path] = (status, body, headers, delay)
+    return path
+
+
+class TestFederation:
+    """Test the federation of several sources in the Status"""
+
+    @pytest.fixture
+    def server(self, fake_server, monkeypatch):
+        monkeypatch.setattr(jadewa.status, "GITHUB_API", fake_server.url)
+        serve_fake_tree(fake_server, "jade", "raw", "main", JADE_FILES, limit=1000)
+        serve_fake_tree(fake_server, "iaea", "exp", "main", EXP_FILES, limit=1000)
+        return fake_server
+
+    def test_select_folders(self):
+        """The first matching rule renames the folder"""
+        status = {
+            "Oktavian": {
+                "expresults": {"expresults": ("p", ["a.csv"])},
+                "other": {"other": ("q", ["b.csv"])},
+            },
+            "Tiara-BC": {"expresults": {"expresults": ("r", ["c.csv"])}},
+        }
+        folders = list(
+            select_folders(status, {"p/a.csv": "s1"}, EXP_RULES, {"Oktavian"})
+        )
+        assert folders == [("Oktavian", "exp", "exp", "p", ["a.csv"], ["s1"])]
+        rules = (MergeRule(code="other", new_benchmarks=True),)
+        assert [folder[:3] for folder in select_folders(status, {}, rules, set())] == [
+            ("Oktavian", "other", "other")
+        ]
+        assert len(list(select_folders(status, {}, None, set()))) == 3
+
+    def test_concurrent(self, server):
+        """The sources are fetched concurrently and merged by the rules"""
+        listings = frozenset(
+            slow_down(server, owner, repo, 0.5)
+            for owner, repo in [("jade", "raw"), ("iaea", "exp")]
+        )
+        sources = (Source("jade", "raw"), Source("iaea", "exp", rules=EXP_RULES))
+        status = Status.from_github(
+            snapshot_dir=None, transport=Transport(), sources=sources
+        )
+        # one listing was requested while the other was being answered
+        assert listings in server.overlaps
+        assert status.get_benchmarks() == ["Sphere", "Oktavian"]
+        assert status.get_libraries("Oktavian") == ["FENDL 3.2b", "exp"]
+        path, files = status.get_results("Oktavian", "exp", "exp")
+        assert files == ["Oktavian tally 1.csv"]
+        assert status.get_blob_sha(path, files[0]) == "e1"
+        assert len(status.metadata_paths) == 1
+
+    def test_lazy(self, server):
+        """A lazy source is fetched when a benchmark it serves is required"""
+        sources = (
+            Source("jade", "raw"),
+            Source("iaea", "exp", rules=EXP_RULES, lazy=True, benchmarks=("Oktavian",)),
+        )
+        status = Status.from_github(
+            snapshot_dir=None, transport=Transport(), sources=sources
+        )
+        tree = "/repos/iaea/exp/git/trees/main?recursive=1"
+        assert server.count(tree) == 0
+        assert status.get_libraries("Sphere") == ["FENDL 3.2b"]
+        assert server.count(tree) == 0
+        assert status.get_libraries("Oktavian") == ["FENDL 3.2b", "exp"]
+        status.get_codes("Oktavian", "exp")
+        assert server.count(tree) == 1
+        assert "Tiara-BC" not in status.get_benchmarks()
+
+    def test_lazy_failure(self, server):
+        """A lazy source that cannot be loaded does not break the others"""
+        sources = (Source("jade", "raw"), Source("nobody", "none", lazy=True))
+        status = Status.from_github(
+            snapshot_dir=None, transport=Transport(), sources=sources
+        )
+        assert status.get_libraries("Oktavian") == ["FENDL 3.2b"]
+        assert list(status.source_errors) == ["nobody/none@main"]
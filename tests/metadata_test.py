@@ -0,0 +1,87 @@
+"""Test the metadata module"""
+
+import pytest
+
+from jadewa.metadata import MetadataStore
+from jadewa.network import Transport
+from jadewa.status import Status
+from jadewa.storage import HTTPBackend
+from jadewa.utils import get_info_dfs
+
+
+class TestMetadataStore:
+    """Test MetadataStore class and its use in the Status"""
+
+    @pytest.fixture
+    def store_file(self, tmp_path):
+        return str(tmp_path / "metadata" / "metadata.parquet")
+
+    def _status(self, fake_server, store_file, shas: dict) -> Status:
+        paths = [f"{fake_server.url}/{i}/metadata.json" for i in shas]
+        return Status(
+            {},
+            paths,
+            dict(zip(paths, shas.values())),
+            backend=HTTPBackend(Transport()),
+            metadata_store=MetadataStore(store_file),
+        )
+
+    def test_default(self):
+        """The metadata are persisted only if a store is given"""
+        assert Status({}, []).metadata_store.path is None
+
+    def test_incremental(self, fake_server, store_file):
+        """Only new or modified metadata files are requested"""
+        for i, code in enumerate(["mcnp", "openmc", "d1s"]):
+            fake_server.add(
+                f"/{i}/metadata.json",
+                f'{{"benchmark_name": "B{i}", "library": "L", "code": "{code}"}}',
+            )
+        shas = {0: "a", 1: "b", 2: "c"}
+        status = self._status(fake_server, store_file, shas)
+        assert not status.metadata_cached()
+        status.get_metadata_df()
+        assert status.metadata_df["code"].to_list() == ["mcnp", "openmc", "d1s"]
+        assert len(fake_server.requests) == 3
+
+        # a new session finds the table on disk
+        status = self._status(fake_server, store_file, shas)
+        assert status.metadata_cached()
+        sorted_df, _, _ = get_info_dfs(status.load_metadata_df)
+        assert len(sorted_df) == 3
+        assert status.metadata_df["benchmark_name"].to_list() == ["B0", "B1", "B2"]
+        assert len(fake_server.requests) == 3
+
+        # a modified file is requested again, a removed one is dropped
+        fake_server.add(
+            "/1/metadata.json",
+            '{"benchmark_name": "B1", "library": "L", "code": "serpent"}',
+        )
+        status = self._status(fake_server, store_file, {0: "a", 1: "b2"})
+        assert not status.metadata_cached()
+        status.get_metadata_df()
+        assert status.metadata_df["code"].to_list() == ["mcnp", "serpent"]
+        assert fake_server.count("/1/metadata.json") == 2
+        assert MetadataStore(store_file).shas() == {"a", "b2"}
+
+    def test_without_sha(self, fake_server, store_file):
+        """Files without a known SHA are always requested and never stored"""
+        fake_server.add("/0/metadata.json", '{"code": "mcnp"}')
+        for _ in range(2):
+            status = self._status(fake_server, store_file, {0: None})
+            status.get_metadata_df()
+            assert status.metadata_df["code"].to_list() == ["mcnp"]
+        assert fake_server.count("/0/metadata.json") == 2
+        assert MetadataStore(store_file).shas() == set()
+
+    def test_mixed_types(self, store_file):
+        """Free-form values that Parquet cannot store as they are are kept as
+        strings"""
+        shas = {"p1": "a", "p2": "b"}
+        MetadataStore(store_file).update(
+            shas, {"p1": {"version": 1, "extra": {"a": 1}}, "p2": {"version": "2.0"}}
+        )
+        df = MetadataStore(store_file).load(shas)
+        assert list(df.index) == ["p1", "p2"]
+        assert df["version"].to_list() == ["1", "2.0"]
+        assert df.loc["p1", "extra"] == '{"a": 1}'
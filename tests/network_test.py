@@ -0,0 +1,219 @@
+"""Test the network module"""
+
+import threading
+import time
+
+import pytest
+import requests
+
+from jadewa import network
+from jadewa.network import (
+    BACKGROUND,
+    INTERACTIVE,
+    RateLimitError,
+    RequestScheduler,
+    Transport,
+)
+
+
+class FakeClock:
+    """Replacement of the time module, the time only advances when sleeping"""
+
+    def __init__(self, now: float) -> None:
+        self.now = now
+        self.sleeps = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRequestScheduler:
+    """Test RequestScheduler class"""
+
+    @pytest.fixture
+    def scheduler(self):
+        """Fixture for a scheduler authenticating on the local server"""
+        return RequestScheduler(
+            headers={"Authorization": "token secret"},
+            auth_hosts=frozenset(["127.0.0.1"]),
+        )
+
+    def test_credentials(self, fake_server, scheduler: RequestScheduler):
+        """Credentials are sent only to the authenticated hosts"""
+        fake_server.add("/file", "content")
+        assert scheduler.get(f"{fake_server.url}/file").text == "content"
+        assert fake_server.requests[-1][1]["Authorization"] == "token secret"
+
+        scheduler.auth_hosts = frozenset(["api.github.com"])
+        scheduler.get(f"{fake_server.url}/file")
+        assert "Authorization" not in fake_server.requests[-1][1]
+
+    def test_rate_limit_tracking(self, fake_server, scheduler: RequestScheduler):
+        """The rate limit headers are tracked"""
+        fake_server.add(
+            "/file",
+            "content",
+            headers={"X-RateLimit-Remaining": "42", "X-RateLimit-Reset": "1000"},
+        )
+        scheduler.get(f"{fake_server.url}/file")
+        assert scheduler.limits["127.0.0.1"] == (42, 1000.0)
+
+    def test_retry_after(self, fake_server, scheduler: RequestScheduler):
+        """Requests rejected because of the rate limit are retried instead of
+        failing"""
+        calls = []
+
+        def answer(_):
+            calls.append(1)
+            if len(calls) == 1:
+                return 429, "slow down", {"Retry-After": "0.3"}
+            return 200, "content", {}
+
+        fake_server.add("/file", answer)
+        start = time.time()
+        r = scheduler.get(f"{fake_server.url}/file")
+        assert r.status_code == 200
+        assert time.time() - start >= 0.3
+        assert len(calls) == 2
+
+    def test_reserve(self, fake_server, scheduler: RequestScheduler):
+        """Background requests wait for the reset when the remaining requests
+        are reserved to interactive ones"""
+        fake_server.add("/file", "content")
+        scheduler.reserve = 20
+
+        scheduler.limits["127.0.0.1"] = (10, time.time() + 0.5)
+        start = time.time()
+        scheduler.get(f"{fake_server.url}/file", priority=INTERACTIVE)
+        assert time.time() - start < 0.4
+
+        scheduler.limits["127.0.0.1"] = (10, time.time() + 0.5)
+        start = time.time()
+        scheduler.get(f"{fake_server.url}/file", priority=BACKGROUND)
+        assert time.time() - start >= 0.4
+
+    def test_local_count(self, fake_server, scheduler: RequestScheduler):
+        """The requests sent are counted before the responses come back"""
+        fake_server.add("/file", "content")
+        scheduler.limits["127.0.0.1"] = (2, time.time() + 0.5)
+        start = time.time()
+        for _ in range(2):
+            scheduler.get(f"{fake_server.url}/file")
+        assert scheduler.limits["127.0.0.1"][0] == 0
+        assert time.time() - start < 0.4
+        scheduler.get(f"{fake_server.url}/file")
+        assert time.time() - start >= 0.4
+
+    def test_resync(self, fake_server, scheduler: RequestScheduler, monkeypatch):
+        """The count is synchronized with the responses"""
+        monkeypatch.setattr(network, "time", FakeClock(500.0))
+        fake_server.add(
+            "/file",
+            "content",
+            headers={"X-RateLimit-Remaining": "42", "X-RateLimit-Reset": "1000"},
+        )
+        # responses of the same window do not count back up
+        scheduler.limits["127.0.0.1"] = (30, 1000.0)
+        scheduler.get(f"{fake_server.url}/file")
+        assert scheduler.limits["127.0.0.1"] == (29, 1000.0)
+        # a new window is taken from the server
+        scheduler.limits["127.0.0.1"] = (30, 900.0)
+        scheduler.get(f"{fake_server.url}/file")
+        assert scheduler.limits["127.0.0.1"] == (42, 1000.0)
+
+    def test_fail_fast(self, fake_server, scheduler: RequestScheduler, monkeypatch):
+        """Interactive requests fail if the reset is too far, background ones
+        wait for it max_wait at a time, keeping the count meanwhile"""
+        clock = FakeClock(1000.0)
+        monkeypatch.setattr(network, "time", clock)
+        fake_server.add("/file", "content")
+        scheduler.max_wait = 10
+        scheduler.limits["127.0.0.1"] = (0, 1025.0)
+        with pytest.raises(RateLimitError):
+            scheduler.get(f"{fake_server.url}/file")
+        assert clock.sleeps == []
+        assert fake_server.count("/file") == 0
+
+        scheduler.get(f"{fake_server.url}/file", priority=BACKGROUND)
+        assert clock.sleeps == [10, 10, 5]
+        assert fake_server.count("/file") == 1
+        # the window is over
+        assert "127.0.0.1" not in scheduler.limits
+
+    def test_exhausted(self, fake_server, scheduler: RequestScheduler):
+        """A request rejected because no request is left is not retried"""
+        reset = str(int(time.time()) + 1000)
+        fake_server.add(
+            "/file",
+            "limit exceeded",
+            status=403,
+            headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset},
+        )
+        assert scheduler.get(f"{fake_server.url}/file").status_code == 403
+        assert fake_server.count("/file") == 1
+        with pytest.raises(RateLimitError):
+            scheduler.get(f"{fake_server.url}/file")
+
+    def test_priority(self, fake_server, scheduler: RequestScheduler):
+        """Interactive requests are served before queued background ones"""
+        fake_server.add("/slow", "content", delay=0.3)
+        fake_server.add("/background", "content")
+        fake_server.add("/interactive", "content")
+        scheduler.max_concurrency = 1
+
+        threads = [
+            threading.Thread(target=scheduler.get, args=(f"{fake_server.url}/slow",))
+        ]
+        threads[0].start()
+        time.sleep(0.1)
+        for path, priority in [("/background", BACKGROUND)] * 3 + [
+            ("/interactive", INTERACTIVE)
+        ]:
+            thread = threading.Thread(
+                target=scheduler.get,
+                args=(f"{fake_server.url}{path}",),
+                kwargs={"priority": priority},
+            )
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.02)
+        for thread in threads:
+            thread.join()
+
+        paths = [path for path, _ in fake_server.requests]
+        assert paths == ["/slow", "/interactive"] + ["/background"] * 3
+
+
+class TestTransport:
+    """Test Transport class"""
+
+    def test_keep_alive(self, fake_server):
+        """Connections are reused across requests, also concurrent ones"""
+        fake_server.add("/file", "content")
+        transport = Transport(pool_size=4)
+        for _ in range(10):
+            assert transport.get(f"{fake_server.url}/file").text == "content"
+        assert len(fake_server.connections) == 1
+        assert "gzip" in fake_server.requests[-1][1]["Accept-Encoding"]
+
+        threads = [
+            threading.Thread(target=transport.get, args=(f"{fake_server.url}/file",))
+            for _ in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(fake_server.connections) <= 4
+        transport.close()
+
+    def test_timeout(self, fake_server):
+        """The default timeout of the transport is applied"""
+        fake_server.add("/slow", "content", delay=1)
+        transport = Transport(timeout=0.2)
+        with pytest.raises(requests.exceptions.Timeout):
+            transport.get(f"{fake_server.url}/slow")
@@ -1,9 +1,13 @@
+import time
 from importlib.resources import files
 
+import pandas as pd
 import pytest
 
 import tests.resources.status as res
-from jadewa.processor import Processor
+from jadewa.cache import CSVCache
+from jadewa.dataset import DatasetStore
+from jadewa.processor import Processor, get_ratio
 from jadewa.status import Status
 
 
@@ -42,6 +46,17 @@ class TestProcessor:
             == "Radial position [cm]"
         )
 
+    def test_lazy_params(self, status: Status):
+        """Configurations are loaded on first access"""
+        processor = Processor(status)
+        assert processor.params.loaded() == []
+        assert "Sphere" in processor.get_available_benchmarks()
+        assert processor.params.loaded() == []
+        assert "Be - 5 cm - 24.9°" in processor.params["FNS-TOF"]
+        assert processor.params.loaded() == ["FNS-TOF"]
+        with pytest.raises(KeyError):
+            processor.params["random"]
+
     def test_init_SphereSDDR(self, status: Status):
         """Test the __init__ method for the SphereSDDR benchmark"""
         processor = Processor(status)
@@ -76,6 +91,121 @@ class TestProcessor:
         with pytest.raises((NotImplementedError, KeyError)):
             processor._get_graph_data("Oktavian", "exp", "NonExistentTally")
 
+    def test_get_graph_data_cache(self, processor: Processor):
+        """Test that the csv files are read only once"""
+        args = ("Oktavian", "exp", "Ti - Photon leakage spectrum")
+        data = processor._get_graph_data(*args)
+        misses = processor.cache.stats()["misses"]
+        assert misses > 0
+        assert processor.cache.stats()["hits"] == 0
+
+        new_data = processor._get_graph_data(*args)
+        assert processor.cache.stats()["misses"] == misses
+        assert processor.cache.stats()["hits"] == misses
+        assert data.equals(new_data)
+
+    def test_get_graph_data_dataset(self, status: Status, tmp_path):
+        """Test that the csv files of a benchmark are compiled once into a
+        dataset that is then read instead of the csv files"""
+        args = ("Oktavian", "exp", "Ti - Photon leakage spectrum")
+        processor = Processor(
+            status, cache=CSVCache(cache_dir=None), datasets=DatasetStore(tmp_path)
+        )
+        data = processor._get_graph_data(*args)
+        version = processor.get_data_version("Oktavian")
+        assert len(processor._compilations[version].result()) > 0
+
+        stats = processor.cache.stats()
+        pd.testing.assert_frame_equal(processor._get_graph_data(*args), data)
+        assert processor.cache.stats() == stats
+
+        # a new session finds the dataset on disk
+        processor = Processor(
+            status, cache=CSVCache(cache_dir=None), datasets=DatasetStore(tmp_path)
+        )
+        pd.testing.assert_frame_equal(processor._get_graph_data(*args), data)
+        assert processor.cache.stats()["misses"] == 0
+        assert processor._compilations == {}
+
+    def test_get_graph_data_dataset_missing(self, status: Status, tmp_path):
+        """A dataset is not compiled while some files cannot be read, they
+        are read from the .csv files meanwhile and the compilation is tried
+        again"""
+        benchmark, tally = "Oktavian", "Ti - Photon leakage spectrum"
+        processor = Processor(
+            status, cache=CSVCache(cache_dir=None), datasets=DatasetStore(tmp_path)
+        )
+        resolved = processor._resolve_csvs(benchmark, tally)
+        (lib, code), (path, csvs) = next(
+            (key, value) for key, value in resolved.items() if value[1]
+        )
+        failing = processor.backend.join(path, csvs[0])
+        read_many = processor.backend.read_many
+
+        def flaky(locations, *args, **kwargs):
+            contents = read_many(locations, *args, **kwargs)
+            if failing in contents:
+                contents[failing] = None
+            return contents
+
+        processor.backend.read_many = flaky
+        processor._read_tally(benchmark, tally)
+        version = processor.get_data_version(benchmark)
+        with pytest.raises(ValueError):
+            processor._compilations[version].result()
+        assert version not in processor._compilations
+        assert processor.datasets.get(benchmark, version) is None
+
+        processor.backend.read_many = read_many
+        processor._read_tally(benchmark, tally)
+        assert len(processor._compilations[version].result()) > 0
+        dataset = processor.datasets.get(benchmark, version)
+        assert dataset.read(lib, code, csvs[0]) is not None
+        read = {(lib, code) for lib, code, _ in processor._read_tally(benchmark, tally)}
+        assert (lib, code) in read
+
+        # the entries missing from a dataset are read from the .csv files
+        dataset._entries.pop((lib, code, csvs[0]))
+        assert dataset.read(lib, code, csvs[0]) is None
+        assert {
+            (lib, code) for lib, code, _ in processor._read_tally(benchmark, tally)
+        } == read
+
+    def test_prefetch(self, status: Status):
+        """Test that a prefetched benchmark is plotted from the cache"""
+        processor = Processor(status, cache=CSVCache(cache_dir=None))
+        prefetch = processor.prefetch("Oktavian", batch_size=3)
+        assert prefetch.result(timeout=30) > 0
+        assert prefetch.done() and not prefetch.cancelled()
+        misses = processor.cache.stats()["misses"]
+        processor._get_graph_data("Oktavian", "exp", "Ti - Photon leakage spectrum")
+        assert processor.cache.stats()["misses"] == misses
+
+    def test_prefetch_cancel(self, fake_server):
+        """Test that a cancelled prefetch stops after the current batch"""
+        files = [f"Sphere {i}.csv" for i in range(20)]
+        for file in files:
+            fake_server.add(
+                f"/mcnp/{file.replace(' ', '%20')}", "x,Value\n1,2\n", delay=0.2
+            )
+        path = fake_server.url + "/mcnp"
+        status = Status({"Sphere": {"FENDL 3.2b": {"mcnp": (path, files)}}})
+        processor = Processor(status, cache=CSVCache(cache_dir=None), max_workers=2)
+        prefetch = processor.prefetch("Sphere", batch_size=2)
+        time.sleep(0.1)
+        prefetch.cancel()
+        assert prefetch.result(timeout=5) == 2
+        assert len(fake_server.requests) == 2
+
+    def test_get_graph_data_concurrent(self, status: Status):
+        """Test that concurrent fetching keeps the order of the plot"""
+        args = ("Oktavian", "FENDL 3.2b", "Ti - Photon leakage spectrum")
+        serial = Processor(status, max_workers=1)._get_graph_data(*args)
+        concurrent = Processor(status, max_workers=4)._get_graph_data(*args)
+        assert serial.equals(concurrent)
+        # experimental data always comes first
+        assert concurrent["label"].iloc[0] == "exp-exp"
+
     def test_get_graph_data_ratio(self, processor: Processor):
         """Test the get_graph_data method with ratio"""
         # Use FENDL 3.2b as reference since we have that data for Oktavian
@@ -149,6 +279,91 @@ class TestProcessor:
         )
         assert len(data.columns) == 6
 
+    def test_resolve_csvs(self, processor: Processor):
+        """The tally to .csv files index follows the changes of the status"""
+        tally = "Ti - Photon leakage spectrum"
+        resolved = processor._resolve_csvs("Oktavian", tally)
+        assert list(resolved) == [("exp", "exp"), ("FENDL 3.2b", "mcnp")]
+        path, csvs = resolved["FENDL 3.2b", "mcnp"]
+        assert csvs == ["Oktavian_Ti Gamma flux.csv"]
+
+        # a replaced folder and a new one are indexed again
+        catalog = processor.status.catalog
+        catalog.add_folder("Oktavian", "FENDL 3.2b", "mcnp", path, ["other.csv"])
+        catalog.add_folder("Oktavian", "JEFF", "mcnp", path, csvs)
+        resolved = processor._resolve_csvs("Oktavian", tally)
+        assert resolved["FENDL 3.2b", "mcnp"] == (path, [])
+        assert resolved["JEFF", "mcnp"] == (path, csvs)
+
+    def test_refresh(self, processor: Processor):
+        """Generic tallies are expanded again only for the changed files"""
+        catalog = processor.status.catalog
+        assert processor.params["FNS-TOF"]
+        path, csvs = processor.status.get_results("FNS-TOF", "ENDFB-VIII.0", "mcnp")
+        new = "FNS-TOF_W-10 Neutron leakage flux at 0 deg.csv"
+        catalog.add_folder("FNS-TOF", "FENDL 3.2b", "mcnp", path, csvs + [new])
+        delta = processor.refresh()
+        assert delta.added == {"FNS-TOF": csvs + [new]}
+        assert processor.params["FNS-TOF"]["W - 10 cm - 0°"]["csv"] == [new]
+        resolved = processor._resolve_csvs("FNS-TOF", "W - 10 cm - 0°")
+        assert resolved["FENDL 3.2b", "mcnp"] == (path, [new])
+        assert processor.refresh().added == {}
+
+        # the file is removed from the only folder that had it
+        catalog.add_folder("FNS-TOF", "FENDL 3.2b", "mcnp", path, csvs)
+        delta = processor.refresh()
+        assert delta.removed == {"FNS-TOF": [new]}
+        assert "W - 10 cm - 0°" not in processor.params["FNS-TOF"]
+        assert processor._resolve_csvs("FNS-TOF", "W - 10 cm - 0°") == {}
+        assert processor.params["FNS-TOF"]["Be - 5 cm - 24.9°"]["csv"] == csvs
+
+    def test_get_data_version(self, processor: Processor, monkeypatch):
+        """The data version is computed again only when a folder changes"""
+        status = processor.status
+        calls = []
+        get_blob_shas = status.get_blob_shas
+
+        def spy(*args):
+            calls.append(args)
+            return get_blob_shas(*args)
+
+        monkeypatch.setattr(status, "get_blob_shas", spy)
+        version = processor.get_data_version("Oktavian")
+        assert calls
+        calls.clear()
+        assert processor.get_data_version("Oktavian") == version
+        # a change of another benchmark does not affect it
+        path, csvs = status.get_results("FNS-TOF", "ENDFB-VIII.0", "mcnp")
+        status.catalog.add_folder("FNS-TOF", "ENDFB-VIII.0", "mcnp", path, csvs)
+        assert processor.get_data_version("Oktavian") == version
+        assert calls == []
+
+        path, csvs = status.get_results("Oktavian", "FENDL 3.2b", "mcnp")
+        status.catalog.add_folder("Oktavian", "FENDL 3.2b", "mcnp", path, csvs[1:])
+        assert processor.get_data_version("Oktavian") != version
+        assert calls
+
+    def test_get_ratio(self):
+        """Points are aligned to the reference on the x values"""
+        data = pd.DataFrame(
+            {
+                "Energy": [1.0, 2.0, 3.0, "1", "3", "4", 2.0, 1.0],
+                "Value": [2.0, 4.0, 8.0, 1.0, 4.0, 5.0, 2.0, 4.0],
+                "Error": [0.3, 0.4, 0.0, 0.4, 0.0, 0.1, 0.3, 0.4],
+                "label": ["ref"] * 3 + ["lib"] * 3 + ["exp"] * 2,
+            }
+        )
+        ratio = get_ratio(data, "ref")
+        assert ratio["label"].to_list() == ["ref"] * 3 + ["lib"] * 2 + ["exp"] * 2
+        assert ratio["Energy"].to_list() == [1.0, 2.0, 3.0, "1", "3", 2.0, 1.0]
+        assert ratio["Value"].to_list() == [1, 1, 1, 0.5, 0.5, 0.5, 2]
+        assert ratio["Error"].to_list() == pytest.approx(
+            [0.3 * 2**0.5, 0.4 * 2**0.5, 0, 0.5, 0, 0.5, 0.5]
+        )
+        assert ratio.attrs["unmatched"] == {"lib": 1}
+        with pytest.raises(NotImplementedError):
+            get_ratio(data, "other")
+
     def test_get_plot(self, processor: Processor):
         """Test the get_plot method"""
         # Test with Oktavian which has actual data
@@ -171,6 +386,24 @@ class TestProcessor:
         )
         assert fig is not None
 
+    def test_get_plot_cached(self, processor: Processor):
+        """Figures are built once per arguments and data version"""
+        args = ("Oktavian", "exp", "exp", "Ti - Photon leakage spectrum")
+        fig = processor.get_plot(*args)
+        y_title = fig.layout.yaxis.title.text
+        fig.data[0].visible = "legendonly"
+        processor.get_plot(*args, ratio=True)
+        cached = processor.get_plot(*args)
+        assert processor.figures.stats()["hits"] == 1
+        assert cached.data[0].visible != "legendonly"
+
+        # a change of the data makes the figure outdated
+        processor.get_data_version = lambda benchmark: "new"
+        rebuilt = processor.get_plot(*args)
+        assert processor.figures.stats()["hits"] == 1
+        # the ratio plot did not change the configuration of the tally
+        assert rebuilt.layout.yaxis.title.text == y_title
+
     def test_get_plot_subset(self, processor: Processor):
         """Test the get_plot method with C-Model which has subset configuration"""
         fig = processor.get_plot(
@@ -181,6 +414,59 @@ class TestProcessor:
         )
         assert fig is not None
 
+    def test_iter_long_format(self, processor: Processor):
+        """The tallies are read as for the plots, one chunk per lib-code"""
+        tally = "Neutron current on plasma boundary - Collided"
+        assert len(list(processor.iter_long_format("C-Model"))) == 2
+        chunks = list(processor.iter_long_format("C-Model", [tally]))
+        assert len(chunks) == 1
+        df = chunks[0]
+        # the subset of the configuration is applied as in the plots
+        assert len(df) == 18
+        assert list(df.columns[:5]) == [
+            "benchmark",
+            "library",
+            "code",
+            "tally",
+            "quantity",
+        ]
+        assert list(df.columns[-2:]) == ["Value", "Error"]
+        assert (df["library"] == "ENDFB-VIII.0").all()
+        data = processor._get_graph_data(
+            "C-Model",
+            "ENDFB-VIII.0",
+            tally,
+            subset=processor._get_optional_config("subset", "C-Model", tally),
+        )
+        quantity = df["quantity"].iloc[0]
+        assert data[quantity].tolist() == df["Value"].tolist()
+
+        chunks = list(
+            processor.iter_long_format("Oktavian", ["Al - Neutron leakage spectrum"])
+        )
+        assert sorted(chunk["library"].iloc[0] for chunk in chunks) == [
+            "FENDL 3.2b",
+            "exp",
+        ]
+        assert "Energy [MeV]" in chunks[0]
+
+    @pytest.mark.parametrize("suffix", ["parquet", "csv"])
+    def test_export(self, processor: Processor, tmp_path, suffix):
+        """All the tallies of the benchmarks are exported in a single file"""
+        path = tmp_path / f"export.{suffix}"
+        rows = processor.export(["Oktavian", "TUD-Fe"], path, chunk_rows=100)
+        if suffix == "parquet":
+            df = pd.read_parquet(path)
+        else:
+            df = pd.read_csv(path)
+        assert len(df) == rows
+        assert sorted(df["benchmark"].unique()) == ["Oktavian", "TUD-Fe"]
+        assert df["tally"].nunique() == 21 + len(
+            processor.get_available_tallies("TUD-Fe", "ENDFB-VIII.0", "mcnp")
+        )
+        # x columns of the other tallies are empty
+        assert df.loc[df["benchmark"] == "Oktavian", "Time [shakes]"].isna().all()
+
     def test_get_available_benchmarks(self, processor: Processor):
         """Test the get_available_benchmarks method"""
         benchmarks = processor.get_available_benchmarks()
@@ -195,6 +481,11 @@ class TestProcessor:
         tallies = processor.get_available_tallies("Oktavian", "exp", "exp")
         assert len(tallies) == 21
         assert "Ti - Photon leakage spectrum" in tallies
+        # results with the same sorting key keep the order of the configuration
+        assert tallies[:2] == [
+            "Al - Neutron leakage spectrum",
+            "Co - Neutron leakage spectrum",
+        ]
 
     def test_get_available_sddr_tallies(self, processor: Processor):
         """Test the get_available_tallies method for SDDR benchmarks"""
@@ -209,6 +500,15 @@ class TestProcessor:
         assert len(tallies) > 0
         assert "Be - 5 cm - 24.9°" in tallies
 
+        # the index of the results follows the generated tallies
+        path, csvs = processor.status.get_results("FNS-TOF", "ENDFB-VIII.0", "mcnp")
+        new = "FNS-TOF_W-10 Neutron leakage flux at 0 deg.csv"
+        processor.status.catalog.add_folder(
+            "FNS-TOF", "ENDFB-VIII.0", "mcnp", path, csvs + [new]
+        )
+        tallies = processor.get_available_tallies("FNS-TOF", "ENDFB-VIII.0", "mcnp")
+        assert sorted(tallies) == ["Be - 5 cm - 24.9°", "W - 10 cm - 0°"]
+
     def test_get_available_tallies_github(self, processor_github: Processor):
         """Test the get_available_tallies method"""
         assert (
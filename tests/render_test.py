@@ -0,0 +1,74 @@
+"""Test the render module"""
+
+import json
+import os
+from functools import partial
+from importlib.resources import files
+
+import pytest
+
+import tests.resources.status as res
+from jadewa.processor import Processor
+from jadewa.render import FigureJob, list_figures, render_figures, shard
+from jadewa.status import Status
+
+ROOT = str(files(res).joinpath("root"))
+
+
+class TestRender:
+    """Test the rendering of the figures"""
+
+    @pytest.fixture
+    def processor(self):
+        return Processor(Status.from_root(ROOT))
+
+    def test_list_figures(self, processor: Processor):
+        """The figures are listed as the options of the app"""
+        jobs = list_figures(processor, benchmarks=["Oktavian"])
+        # 21 tallies for each of the two references, absolute and ratio
+        assert len(jobs) == 21 * 2 * 2
+        tally = "Ti - Photon leakage spectrum"
+        assert FigureJob("Oktavian", "exp", "exp", tally, True) in jobs
+        assert len(list_figures(processor, ["Oktavian"], ratios=[False])) == 42
+
+    def test_filename(self):
+        """The names are valid file names"""
+        job = FigureJob("a/b", "FENDL 3.2b", "mcnp", 'Cu - "1" <2>', True)
+        assert job.filename("json") == os.path.join(
+            "a_b", "FENDL 3.2b_mcnp", "Cu - _1_ _2_ - ratio.json"
+        )
+
+    def test_shard(self, processor: Processor):
+        """The shards split the benchmarks without overlapping"""
+        jobs = list_figures(processor)
+        shards = [shard(jobs, index, 3) for index in range(3)]
+        assert sorted(job for part in shards for job in part) == sorted(jobs)
+        benchmarks = [{job.benchmark for job in part} for part in shards]
+        assert not benchmarks[0] & benchmarks[1]
+        assert not benchmarks[1] & benchmarks[2]
+        # Oktavian is the largest benchmark and takes a shard alone
+        assert benchmarks[0] == {"Oktavian"}
+        assert shard(jobs, 0, 1) == jobs
+        with pytest.raises(ValueError):
+            shard(jobs, 3, 3)
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_render_figures(self, processor: Processor, tmp_path, max_workers):
+        """The figures are written by benchmark, the errors are collected"""
+        jobs = list_figures(processor, benchmarks=["C-Model", "TUD-Fe"])
+        jobs.append(FigureJob("TUD-Fe", "ENDFB-VIII.0", "mcnp", "missing", False))
+        progress = []
+        errors = render_figures(
+            partial(Status.from_root, ROOT),
+            jobs,
+            tmp_path,
+            fmt="json",
+            max_workers=max_workers,
+            progress_callback=lambda done, total: progress.append((done, total)),
+        )
+        assert list(errors) == jobs
+        assert errors[jobs[-1]].startswith("NotImplementedError")
+        assert all(error is None for error in list(errors.values())[:-1])
+        assert progress[-1] == (len(jobs), len(jobs))
+        with open(tmp_path / jobs[0].filename("json"), encoding="utf-8") as infile:
+            assert json.load(infile)["data"]
@@ -0,0 +1,98 @@
+"""Test the scanner module"""
+
+import os
+import time
+from importlib.resources import files
+
+import pytest
+
+import tests.resources.status as res
+from jadewa.scanner import LocalScanner
+
+
+def walk_csvs(root) -> list[tuple[str, list[str]]]:
+    """Reference listing obtained with os.walk"""
+    allfiles = []
+    for path, _, filenames in os.walk(root):
+        csvs = [file for file in filenames if file.endswith(".csv")]
+        if csvs:
+            allfiles.append((os.path.normpath(path), csvs))
+    return allfiles
+
+
+OLD_MTIME = 1_700_000_000
+
+
+def make_old(root) -> None:
+    """Move the mtime of all the directories out of the racy window"""
+    for path, _, _ in os.walk(root):
+        os.utime(path, (OLD_MTIME, OLD_MTIME))
+
+
+class TestLocalScanner:
+    """Test LocalScanner class"""
+
+    @pytest.fixture
+    def tree(self, tmp_path):
+        """Fixture for a small _code_-_library_/benchmark tree"""
+        root = tmp_path / "root"
+        for folder in ["_mcnp_-_FENDL 3.2b_", "_openmc_-_JEFF-3.3_"]:
+            for benchmark in ["Sphere", "Oktavian"]:
+                directory = root / folder / benchmark
+                directory.mkdir(parents=True)
+                for i in range(3):
+                    (directory / f"{benchmark} {i}.csv").write_text("x,y\n")
+                (directory / "metadata.json").write_text("{}")
+        make_old(root)
+        return root
+
+    def test_scan(self, tmp_path, tree):
+        """The scan returns the same directories and files of os.walk"""
+        scanner = LocalScanner(max_workers=4, cache_dir=tmp_path / "cache")
+        assert scanner.scan(tree) == walk_csvs(tree)
+        resources = files(res).joinpath("root")
+        assert scanner.scan(resources) == walk_csvs(resources)
+
+    def test_mtime_cache(self, tmp_path, tree):
+        """Unchanged directories are not listed again"""
+        cache_dir = tmp_path / "cache"
+        scanner = LocalScanner(cache_dir=cache_dir)
+        expected = scanner.scan(tree)
+        # root, 2 _code_-_library_ folders and 4 benchmark folders
+        assert scanner.listed == 7
+        assert scanner.reused == 0
+
+        scanner = LocalScanner(cache_dir=cache_dir)
+        assert scanner.scan(tree) == expected
+        assert scanner.listed == 0
+        assert scanner.reused == 7
+
+        # a new file changes the mtime of its directory only
+        directory = tree / "_mcnp_-_FENDL 3.2b_" / "Sphere"
+        (directory / "new.csv").write_text("x,y\n")
+        make_old(tree)
+        os.utime(directory, (OLD_MTIME + 60, OLD_MTIME + 60))
+        result = scanner.scan(tree)
+        assert scanner.listed == 1
+        assert scanner.reused == 6
+        assert result == walk_csvs(tree)
+
+    def test_racy_window(self, tmp_path, tree):
+        """Directories modified just before the scan are not cached"""
+        cache_dir = tmp_path / "cache"
+        directory = tree / "_openmc_-_JEFF-3.3_" / "Oktavian"
+        os.utime(directory)
+        LocalScanner(cache_dir=cache_dir).scan(tree)
+        scanner = LocalScanner(cache_dir=cache_dir)
+        scanner.scan(tree)
+        assert scanner.listed == 1
+        assert scanner.reused == 6
+
+    def test_no_cache(self, tree):
+        """Without a cache directory all directories are always listed"""
+        scanner = LocalScanner()
+        assert scanner.cache_dir is None
+        scanner.scan(tree)
+        scanner.scan(tree)
+        assert scanner.listed == 7
+        assert scanner.reused == 0
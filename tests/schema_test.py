@@ -0,0 +1,92 @@
+"""Test the schema module"""
+
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from jadewa.schema import Coercion, TallySchema
+
+HEADER = b"Energy,Cells,Value,Error\n"
+
+
+class TestTallySchema:
+    """Test TallySchema class"""
+
+    @pytest.fixture
+    def schema(self):
+        return TallySchema()
+
+    def test_batch(self, schema: TallySchema):
+        """Files with the same header are parsed with the learned dtypes and
+        split back as if they were parsed one by one"""
+        raws = {
+            "a": HEADER + b"1,1,2.0,0.1\n2,2,3.0,0.2\n",
+            "b": HEADER + b"1,3,4.0,0.1\n\n2,4,5.0,0.2",
+            "c": HEADER + b"3,5,6.0,0.3\r\n",
+            "d": HEADER,
+            "e": b"Time,Value,Error\n1.5,2.0,0.1\n",
+        }
+        parsed = schema.parse_many(raws)
+        assert list(parsed) == list(raws)
+        assert parsed["b"]["Cells"].to_list() == [3, 4]
+        assert parsed["c"]["Error"].to_list() == [0.3]
+        assert len(parsed["d"]) == 0
+        assert parsed["e"]["Time"].to_list() == [1.5]
+        for key, df in parsed.items():
+            pd.testing.assert_frame_equal(df, pd.read_csv(BytesIO(raws[key])))
+        assert schema.dtypes(HEADER.strip())["Cells"] == "int64"
+
+    def test_widen(self, schema: TallySchema):
+        """A file that does not fit the learned dtypes widens them"""
+        schema.parse(HEADER + b"1,1,2.0,0.1\n")
+        parsed = schema.parse_many(
+            {
+                "float": HEADER + b"1,1.5,2.0,0.1\n",
+                "text": HEADER + b"1,1,2.0,0.1\n2,total,3.0,0.2\n",
+            }
+        )
+        assert parsed["float"]["Cells"].to_list() == [1.5]
+        assert parsed["text"]["Cells"].to_list() == ["1", "total"]
+        assert pd.api.types.is_string_dtype(schema.dtypes(HEADER.strip())["Cells"])
+        # the types of the next files are still their own
+        df = schema.parse(HEADER + b"1,2,2.0,0.1\n")
+        assert df["Cells"].to_list() == [2]
+
+    def test_own_types(self, schema: TallySchema):
+        """Files parsed together have the types they would have on their own"""
+        schema.parse(HEADER + b"1,1,2.5,0.1\n")
+        raws = {
+            "float": HEADER + b"1,1,2.5,0.1\n",
+            "ints": HEADER + b"1,1,2,0\n",
+            "integral": HEADER + b"1,1,2.0,0.0\n",
+            "missing": HEADER + b"1,1,,0.1\n",
+        }
+        parsed = schema.parse_many(raws)
+        # a boolean column does not fit with the integers of the others
+        raws["bool"] = HEADER + b"1,True,2.5,0.1\n"
+        parsed.update(schema.parse_many({"bool": raws["bool"], "float": raws["float"]}))
+        for key, df in parsed.items():
+            pd.testing.assert_frame_equal(df, pd.read_csv(BytesIO(raws[key])))
+        assert parsed["ints"]["Value"].dtype == "int64"
+
+    def test_coercion(self, schema: TallySchema):
+        """The x columns are prepared when the files are parsed"""
+        raws = {
+            "a": HEADER + b"1,1,2.0,0.1\n2,5,3.0,0.2\ntotal,0,5.0,0.1\n",
+            "b": b"Energy,Cells,Value,Error\n1,x,2.0,0.1\n2.5,5,3.0,0.2\n",
+        }
+        coercion = Coercion.from_options(["Cells", [["5", "x"]]], "Energy")
+        assert coercion.subset == ("Cells", ("5", "x"))
+        parsed = schema.parse_many(raws, coercion)
+        assert parsed["a"]["Cells"].to_list() == ["5"]
+        assert parsed["a"]["Energy"].to_list() == ["2"]
+        assert parsed["b"]["Energy"].to_list() == [1.0, 2.5]
+        assert schema.parse_many(raws, Coercion(subset=("Time", ("1",))))["a"] is None
+        # without options only the total row is dropped
+        df = Coercion.from_options().apply(pd.read_csv(BytesIO(raws["a"])))
+        assert df["Energy"].to_list() == ["1", "2"]
+
+    def test_unparsable(self, schema: TallySchema):
+        """Files that cannot be parsed are None"""
+        assert schema.parse_many({"a": b"\xff\xfe\x00"})["a"] is None
@@ -1,14 +1,85 @@
 """Test the status module"""
 
+import json
 import os
 from importlib.resources import files
 
 import pandas as pd
 import pytest
 
+import jadewa.status
 import tests.resources.status as res
 from jadewa.status import Status
 
+FAKE_TREE = [
+    {"path": "_mcnp_-_FENDL 3.2b_", "type": "tree", "sha": "t1"},
+    {"path": "_mcnp_-_FENDL 3.2b_/Sphere", "type": "tree", "sha": "t2"},
+    {
+        "path": "_mcnp_-_FENDL 3.2b_/Sphere/Sphere_1001_H-1 Leakage neutron flux.csv",
+        "type": "blob",
+        "sha": "b1",
+    },
+    {
+        "path": "_mcnp_-_FENDL 3.2b_/Sphere/metadata.json",
+        "type": "blob",
+        "sha": "b2",
+    },
+    {"path": "_mcnp_-_ENDFB-VIII.0_", "type": "tree", "sha": "t3"},
+    {"path": "_mcnp_-_ENDFB-VIII.0_/Sphere", "type": "tree", "sha": "t4"},
+    {
+        "path": "_mcnp_-_ENDFB-VIII.0_/Sphere/Sphere_1001_H-1 Leakage neutron flux.csv",
+        "type": "blob",
+        "sha": "b3",
+    },
+]
+
+
+def serve_fake_tree(
+    server, owner: str, repo: str, ref: str, files: dict[str, str], limit: int
+) -> None:
+    """Register on a fake server the GitHub tree endpoints for a repository
+    containing the given files (path: blob sha). Recursive listings with more
+    than limit entries are truncated, as the real API does."""
+    # build all directories
+    children = {"": []}
+    for path in files:
+        pieces = path.split("/")
+        for i in range(1, len(pieces)):
+            parent, directory = "/".join(pieces[: i - 1]), "/".join(pieces[:i])
+            if directory not in children:
+                children[directory] = []
+                children[parent].append(directory)
+        children["/".join(pieces[:-1])].append(path)
+
+    def sha(path: str) -> str:
+        return files[path] if path in files else f"tree{abs(hash(path))}"
+
+    def entry(path: str, prefix: str) -> dict:
+        return {
+            "path": path[len(prefix) :],
+            "type": "blob" if path in files else "tree",
+            "sha": sha(path),
+        }
+
+    def walk(directory: str) -> list[str]:
+        paths = []
+        for child in children[directory]:
+            paths.append(child)
+            if child not in files:
+                paths.extend(walk(child))
+        return paths
+
+    for directory in children:
+        prefix = directory + "/" if directory else ""
+        base = f"/repos/{owner}/{repo}/git/trees/{ref if directory == '' else sha(directory)}"
+        flat = [entry(path, prefix) for path in children[directory]]
+        server.add(base, json.dumps({"tree": flat, "truncated": False}))
+        full = [entry(path, prefix) for path in walk(directory)]
+        server.add(
+            base + "?recursive=1",
+            json.dumps({"tree": full[:limit], "truncated": len(full) > limit}),
+        )
+
 
 class StatusMockup(Status):
     def __init__(
@@ -51,6 +122,148 @@ class TestStatus:
         assert os.path.exists(os.path.join(path, files_res[0]))
         assert len(files_res) == 6
 
+    def test_get_metadata_df(self, fake_server):
+        """Test that metadata are retrieved concurrently and that failures
+        do not prevent partial results"""
+        paths = []
+        for i in range(10):
+            fake_server.add(
+                f"/{i}/metadata.json", f'{{"benchmark_name": "B{i}", "code": "mcnp"}}'
+            )
+            paths.append(f"{fake_server.url}/{i}/metadata.json")
+        # a missing file and a slow one
+        paths.append(f"{fake_server.url}/missing/metadata.json")
+        fake_server.add("/slow/metadata.json", "{}", delay=2)
+        paths.append(f"{fake_server.url}/slow/metadata.json")
+
+        progress = []
+        status = Status({}, paths)
+        status.get_metadata_df(
+            max_concurrency=4,
+            timeout=0.5,
+            progress_callback=lambda done, total: progress.append((done, total)),
+        )
+        assert status.metadata_df["benchmark_name"].to_list() == [
+            f"B{i}" for i in range(10)
+        ]
+        assert set(status.metadata_errors) == set(paths[-2:])
+        assert progress[-1] == (12, 12)
+        assert len(progress) == 12
+        # the slow request is failed by its own timeout, not abandoned
+        assert "ReadTimeout" in status.metadata_errors[paths[-1]]
+
+    def test_from_github_snapshot(self, fake_server, monkeypatch, tmp_path):
+        """Test that the parsed tree is reused while the head does not change"""
+        monkeypatch.setattr(jadewa.status, "GITHUB_API", fake_server.url)
+        head = {"sha": "c1"}
+
+        def commits(headers):
+            etag = f'"{head["sha"]}"'
+            if headers.get("If-None-Match") == etag:
+                return 304, b"", {"ETag": etag}
+            return 200, head["sha"], {"ETag": etag}
+
+        fake_server.add("/repos/o/r/commits/main", commits)
+        for sha in ["c1", "c2"]:
+            fake_server.add(
+                f"/repos/o/r/git/trees/{sha}?recursive=1",
+                json.dumps({"sha": sha, "tree": FAKE_TREE, "truncated": False}),
+            )
+
+        status, metadata_paths, blob_shas = Status._from_github(
+            "o", "r", snapshot_dir=tmp_path
+        )
+        assert set(status["Sphere"]) == {"FENDL 3.2b", "ENDFB-VIII.0"}
+        assert len(metadata_paths) == 1
+        assert fake_server.count("/repos/o/r/git/trees/c1?recursive=1") == 1
+
+        # unchanged repository: a single conditional request
+        n_requests = len(fake_server.requests)
+        snap_status, snap_metadata, snap_shas = Status._from_github(
+            "o", "r", snapshot_dir=tmp_path
+        )
+        assert len(fake_server.requests) == n_requests + 1
+        assert fake_server.requests[-1][1]["If-None-Match"] == '"c1"'
+        assert snap_status == status
+        assert snap_metadata == metadata_paths
+        assert snap_shas == blob_shas
+
+        # new commit: the tree is walked again
+        head["sha"] = "c2"
+        Status._from_github("o", "r", snapshot_dir=tmp_path)
+        assert fake_server.count("/repos/o/r/git/trees/c2?recursive=1") == 1
+
+    def test_github_walk_truncated(self, fake_server, monkeypatch):
+        """Test that truncated trees are completed walking the subtrees"""
+        monkeypatch.setattr(jadewa.status, "GITHUB_API", fake_server.url)
+        files = {}
+        for i, folder in enumerate(
+            ["_mcnp_-_FENDL 3.2b_", "_mcnp_-_ENDFB-VIII.0_", "_d1s_-_D1SUNED_"]
+        ):
+            for benchmark in ["Sphere", "ITER_1D", "Oktavian"]:
+                for j in range(5):
+                    files[f"{folder}/{benchmark}/{benchmark} tally {j}.csv"] = (
+                        f"b{i}{benchmark}{j}"
+                    )
+                files[f"{folder}/{benchmark}/metadata.json"] = f"m{i}{benchmark}"
+
+        serve_fake_tree(fake_server, "o", "r", "main", files, limit=1000)
+        expected = Status._from_github("o", "r", snapshot_dir=None)
+
+        # now the root listing and the listing of each _code_-_library_
+        # folder are truncated, only the benchmark folders fit the limit
+        fake_server.routes.clear()
+        serve_fake_tree(fake_server, "o", "r", "main", files, limit=10)
+        entries = Status._github_walk("o", "r", max_workers=4)
+        blobs = {entry["path"] for entry in entries if entry["type"] == "blob"}
+        assert blobs == set(files)
+        assert len(entries) == len({entry["path"] for entry in entries})
+        assert Status._from_github("o", "r", snapshot_dir=None) == expected
+
+    def test_parse_github_tree(self):
+        """Test the batch parsing of the paths of a GitHub tree"""
+        tree = FAKE_TREE + [
+            {"path": "README.md", "type": "blob", "sha": "r"},
+            {"path": "_mcnp_-_FENDL 3.2b_/summary.csv", "type": "blob", "sha": "s"},
+            {"path": "raw/_d1s_-_JEFF%203.3_/ITER_1D/a.csv", "sha": "c1"},
+            {"path": "raw/_d1s_-_JEFF%203.3_/ITER_1D/b.csv", "sha": "c2"},
+            {"path": "_openmc_-_FENDL%2B_/ITER_1D/a.csv", "sha": "c3"},
+            {"path": "_openmc_-_FENDL%2B_/ITER_1D/notes.txt", "sha": "c4"},
+        ]
+        status, metadata_paths, blob_shas = Status._parse_github_tree(
+            "o", "r", "main", tree
+        )
+        url = "https://github.com/o/r/raw/main/"
+        assert status == {
+            "Sphere": {
+                "FENDL 3.2b": {
+                    "mcnp": (
+                        url + "_mcnp_-_FENDL 3.2b_/Sphere",
+                        ["Sphere_1001_H-1 Leakage neutron flux.csv"],
+                    )
+                },
+                "ENDFB-VIII.0": {
+                    "mcnp": (
+                        url + "_mcnp_-_ENDFB-VIII.0_/Sphere",
+                        ["Sphere_1001_H-1 Leakage neutron flux.csv"],
+                    )
+                },
+            },
+            "ITER_1D": {
+                "JEFF 3.3": {
+                    "d1s": (url + "raw/_d1s_-_JEFF%203.3_/ITER_1D", ["a.csv", "b.csv"])
+                },
+                "FENDL+": {"openmc": (url + "_openmc_-_FENDL%2B_/ITER_1D", ["a.csv"])},
+            },
+        }
+        assert metadata_paths == [
+            url + "_mcnp_-_FENDL 3.2b_/Sphere/metadata.json?raw=true"
+        ]
+        assert blob_shas[url + "raw/_d1s_-_JEFF%203.3_/ITER_1D/b.csv"] == "c2"
+        assert blob_shas[metadata_paths[0]] == "b2"
+        assert len(blob_shas) == 6
+        assert Status._parse_github_tree("o", "r", "main", []) == ({}, [], {})
+
     def test_from_github(self):
         """Test the from_github method"""
         status = Status.from_github()
@@ -65,5 +278,5 @@ class TestStatus:
         assert len(status.metadata_df) > 1
     
     def test_github_iaea(self):
-        status, metadata_paths = Status._from_github("IAEA-NDS", "open-benchmarks", branch="main")
+        status, metadata_paths, _ = Status._from_github("IAEA-NDS", "open-benchmarks", branch="main")
         assert 'Tiara-BC' in status
@@ -0,0 +1,137 @@
+"""Test the storage module"""
+
+import os
+import tarfile
+import time
+
+import pytest
+
+from jadewa.archive import ResultsArchive
+from jadewa.cache import CSVCache
+from jadewa.network import RateLimitError, Transport
+from jadewa.processor import Processor
+from jadewa.scanner import LocalScanner
+from jadewa.status import Status
+from jadewa.storage import (
+    ArchiveBackend,
+    HTTPBackend,
+    LocalBackend,
+    backend_for,
+)
+
+CSV_CONTENT = "Energy,Value,Error\n1,2.0,0.1\n2,3.0,0.2\n"
+
+
+class TestLocalBackend:
+    """Test LocalBackend class"""
+
+    @pytest.fixture
+    def root(self, tmp_path):
+        directory = tmp_path / "root" / "_mcnp_-_FENDL 3.2b_" / "Sphere"
+        directory.mkdir(parents=True)
+        (directory / "a.csv").write_text(CSV_CONTENT)
+        (directory / "b.csv").write_text(CSV_CONTENT)
+        return tmp_path / "root"
+
+    def test_list_read(self, root):
+        """Folders are listed and files read in batch"""
+        backend = LocalBackend(root, LocalScanner(cache_dir=None))
+        [(path, files)] = backend.list()
+        assert sorted(files) == ["a.csv", "b.csv"]
+        locations = [backend.join(path, file) for file in files]
+        contents = backend.read_many(locations + [backend.join(path, "c.csv")])
+        assert contents[locations[0]] == CSV_CONTENT.encode()
+        assert contents[backend.join(path, "c.csv")] is None
+
+    def test_stat(self, root):
+        """The cache key changes when a file is modified"""
+        backend = LocalBackend()
+        location = str(root / "_mcnp_-_FENDL 3.2b_" / "Sphere" / "a.csv")
+        key = backend.cache_key(location)
+        assert backend.stat(location).size == len(CSV_CONTENT)
+        os.utime(location, ns=(0, 10**9))
+        assert backend.cache_key(location) != key
+
+
+class TestHTTPBackend:
+    """Test HTTPBackend class"""
+
+    def test_read_many(self, fake_server):
+        """Files are read concurrently, failures do not stop the others"""
+        for i in range(8):
+            fake_server.add(f"/folder/file%20{i}.csv", CSV_CONTENT, delay=0.2)
+        backend = HTTPBackend(Transport())
+        locations = [
+            backend.join(f"{fake_server.url}/folder", f"file {i}.csv")
+            for i in range(9)
+        ]
+        contents = backend.read_many(locations, max_workers=8)
+        for location in locations[:8]:
+            assert contents[location] == CSV_CONTENT.encode()
+        assert contents[locations[8]] is None
+        # the cache key does not require a request
+        assert backend.cache_key(locations[0]) == locations[0]
+        assert len(fake_server.requests) == 9
+
+    def test_rate_limit(self, fake_server):
+        """An exhausted rate limit fails the whole batch"""
+        backend = HTTPBackend(Transport())
+        backend.transport.scheduler.limits["127.0.0.1"] = (0, time.time() + 1000)
+        locations = [f"{fake_server.url}/{i}.csv" for i in range(2)]
+        with pytest.raises(RateLimitError):
+            backend.read_many(locations)
+        assert fake_server.requests == []
+
+    def test_stat(self, fake_server):
+        """The version of a file is its ETag"""
+        fake_server.add("/a.csv", CSV_CONTENT, headers={"ETag": '"v1"'})
+        backend = HTTPBackend(Transport())
+        stat = backend.stat(f"{fake_server.url}/a.csv")
+        assert stat.size == len(CSV_CONTENT)
+        assert stat.version == '"v1"'
+
+    def test_processor(self, fake_server):
+        """A local HTTP server stands in for GitHub"""
+        files = [f"Sphere {i}.csv" for i in range(4)]
+        for file in files:
+            fake_server.add(f"/mcnp/{file.replace(' ', '%20')}", CSV_CONTENT)
+        path = fake_server.url + "/mcnp"
+        status = Status({"Sphere": {"FENDL 3.2b": {"mcnp": (path, files)}}})
+        assert isinstance(status.backend, HTTPBackend)
+
+        processor = Processor(status, cache=CSVCache(cache_dir=None))
+        dfs = processor._fetch_csvs([(path, file) for file in files])
+        assert all(len(df) == 2 for df in dfs.values())
+        # cached files are not requested again
+        processor._fetch_csvs([(path, file) for file in files])
+        assert len(fake_server.requests) == len(files)
+
+
+class TestArchiveBackend:
+    """Test ArchiveBackend class"""
+
+    def test_read_many(self, tmp_path):
+        """Members are read in a batch, missing ones are None"""
+        root = tmp_path / "root" / "_mcnp_-_FENDL 3.2b_" / "Sphere"
+        root.mkdir(parents=True)
+        for i in range(5):
+            (root / f"{i}.csv").write_text(f"x\n{i}\n")
+        archive_path = tmp_path / "results.tar"
+        with tarfile.open(archive_path, "w") as tar:
+            tar.add(tmp_path / "root", arcname="results")
+
+        backend = ArchiveBackend(ResultsArchive(archive_path))
+        [(path, files)] = backend.list()
+        assert path == "results/_mcnp_-_FENDL 3.2b_/Sphere"
+        locations = [backend.join(path, file) for file in reversed(sorted(files))]
+        contents = backend.read_many(locations + ["missing.csv"])
+        assert list(contents) == locations + ["missing.csv"]
+        assert contents[backend.join(path, "3.csv")] == b"x\n3\n"
+        assert contents["missing.csv"] is None
+        assert backend.stat(locations[0]).size == 4
+
+
+def test_backend_for():
+    """The default backend depends on the path"""
+    assert isinstance(backend_for("https://github.com/o/r/raw/main/a"), HTTPBackend)
+    assert isinstance(backend_for("/results/a"), LocalBackend)
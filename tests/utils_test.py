@@ -1,7 +1,10 @@
+import os
+
 import pandas as pd
 import pytest
 
 from jadewa.utils import (
+    CachePath,
     find_dict_depth,
     get_info_dfs,
     safe_add_ctg_to_dict,
@@ -13,6 +16,13 @@ from jadewa.utils import (
 class TestUtils:
     """Test the utility functions"""
 
+    def test_cache_path(self, tmp_path, monkeypatch):
+        """The cache directory is read when the path is used"""
+        path = CachePath("scan")
+        monkeypatch.setenv("JADEWA_CACHE_DIR", str(tmp_path))
+        assert os.fspath(path) == os.path.join(tmp_path, "scan")
+        assert os.path.join(path, "a.json") == str(tmp_path / "scan" / "a.json")
+
     def test_sorting_func(self):
         """Test the sorting_func function with only material strings"""
         options = [